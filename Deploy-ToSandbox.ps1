@@ -31,7 +31,7 @@ if ($LASTEXITCODE -ne 0) {
     Write-Host "The VM may have hung Docker processes from a previous deployment." -ForegroundColor Yellow
     Write-Host "`nManual recovery steps:" -ForegroundColor Yellow
     Write-Host "1. Access VM via Proxmox console (https://192.168.0.100:8006)" -ForegroundColor White
-    Write-Host "2. Login as mycosoft / REDACTED_VM_SSH_PASSWORD" -ForegroundColor White
+    Write-Host "2. Login as mycosoft (password: VM_SSH_PASSWORD in .credentials.local)" -ForegroundColor White
     Write-Host "3. Run: sudo killall -9 dockerd docker" -ForegroundColor White
     Write-Host "4. Run: sudo systemctl restart docker" -ForegroundColor White
     Write-Host "5. Run: sudo systemctl restart sshd" -ForegroundColor White
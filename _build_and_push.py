@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Build the website image once on this machine and push it, so the VMs pull it instead of building.
+
+    docker login ghcr.io                 # once
+    python _build_and_push.py            # -> ghcr.io/mycosoftlabs/website:production-latest
+    python _build_and_push.py --tag ghcr.io/mycosoftlabs/website:sandbox --site-url https://sandbox.mycosoft.com
+
+Then `python _rebuild_sandbox.py` (or _temp_deploy.py) pulls only the changed layers.
+The build cache lives in the registry (<repo>:buildcache, mode=max), so the deps stage and its
+`npm ci` are reused by whichever machine pushes next until package files change. Exporting it needs
+a docker-container buildx builder; the script creates one (BUILDER) on first run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Optional, Sequence
+
+from _creds import CREDENTIALS_FILE, ENV_FILE, REPO_DIR, load_credentials
+from _docker_build import REGISTRY_IMAGE
+
+PLATFORM = "linux/amd64"
+# buildx's default `docker` driver cannot export a registry cache (--cache-to)
+BUILDER = "mycosoft"
+SUPABASE_ARGS = ("NEXT_PUBLIC_SUPABASE_URL", "NEXT_PUBLIC_SUPABASE_ANON_KEY")
+
+
+def cache_ref(tag: str) -> str:
+    """Registry cache ref next to tag: ghcr.io/org/img:latest -> ghcr.io/org/img:buildcache."""
+    repo = tag.rsplit(":", 1)[0] if ":" in tag.rsplit("/", 1)[-1] else tag
+    return f"{repo}:buildcache"
+
+
+def ensure_builder(name: str = BUILDER) -> bool:
+    """Create the docker-container buildx builder name unless it exists; False if that fails.
+    Builds select it with --builder, so the user's default builder is left alone."""
+    if subprocess.call(["docker", "buildx", "inspect", name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) == 0:
+        return True
+    print(f"Creating buildx builder {name} (docker-container driver, needed for the registry cache)...", flush=True)
+    return subprocess.call(["docker", "buildx", "create", "--name", name, "--driver", "docker-container"]) == 0
+
+
+def buildx_command(
+    tag: str, site_url: str, platform: str = PLATFORM, no_cache: bool = False, builder: str = BUILDER
+) -> List[str]:
+    """`docker buildx build --push` argv for tag on builder, with NEXT_PUBLIC_* build args from the environment."""
+    cache = cache_ref(tag)
+    argv = [
+        "docker", "buildx", "build",
+        "--builder", builder,
+        "--platform", platform,
+        "--cache-from", f"type=registry,ref={cache}",
+        "--cache-to", f"type=registry,ref={cache},mode=max",
+        "--build-arg", f"NEXT_PUBLIC_SITE_URL={site_url}",
+        "--build-arg", f"NEXT_PUBLIC_BASE_URL={site_url}",
+    ]
+    for name in SUPABASE_ARGS:
+        if os.environ.get(name):
+            argv += ["--build-arg", f"{name}={os.environ[name]}"]
+    if no_cache:
+        argv.append("--no-cache")
+    return argv + ["--push", "-t", tag, str(REPO_DIR)]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the website image locally and push it to the registry")
+    parser.add_argument("--tag", default=REGISTRY_IMAGE, help=f"Image to push (default: {REGISTRY_IMAGE})")
+    parser.add_argument("--site-url", default="https://mycosoft.com", help="NEXT_PUBLIC_SITE_URL/BASE_URL baked into the build")
+    parser.add_argument("--platform", default=PLATFORM, help=f"Target platform of the VMs (default: {PLATFORM})")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the registry build cache")
+    args = parser.parse_args(argv)
+
+    # .env.local carries the Supabase build args
+    load_credentials((CREDENTIALS_FILE, ENV_FILE), override=False)
+    if not ensure_builder():
+        print(f"\n[ERROR] Could not create the buildx builder {BUILDER}. Is buildx installed (`docker buildx version`)?")
+        return 1
+    command = buildx_command(args.tag, args.site_url, args.platform, args.no_cache)
+    print(f"Building and pushing {args.tag} ({args.platform})...", flush=True)
+    code = subprocess.call(command)
+    if code != 0:
+        print(f"\n[ERROR] Build/push failed (exit {code}). Is `docker login ghcr.io` done and buildx installed?")
+        return code
+    print(f"\n[SUCCESS] Pushed {args.tag}; deploy with: python _rebuild_sandbox.py --image {args.tag}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
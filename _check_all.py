@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""Run every check-script probe in one process: one SSH connection per VM"""
+
+from _check_docker import VM_HOST, VM_USER as SANDBOX_USER, check_docker
+from _check_mindex_data import VM_IP as MINDEX_HOST, VM_USER as MINDEX_USER, check_mindex_data
+from _check_mindex_logs import check_mindex_logs
+from _check_search_func import check_search_func
+from _check_taxon_columns import check_taxon_columns
+from _remote import utf8_stdout
+
+
+def main():
+    utf8_stdout()
+
+    print(f"##### Sandbox VM ({VM_HOST}) #####\n")
+    check_docker(VM_HOST, SANDBOX_USER)
+
+    # All MINDEX probes share the ControlMaster connection opened by the first one
+    print(f"\n##### MINDEX VM ({MINDEX_HOST}) #####\n")
+    for check in (check_mindex_data, check_taxon_columns, check_search_func, check_mindex_logs):
+        check(MINDEX_HOST, MINDEX_USER)
+        print()
+
+
+if __name__ == "__main__":
+    main()
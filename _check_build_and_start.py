@@ -2,82 +2,60 @@
 """Check build status and start container - Feb 5, 2026"""
 
 import os
-import paramiko
 import sys
-import time
 from _cloudflare_cache import purge_everything
+from _docker_build import RUN_COMMAND
+from _docker_events import wait_for_container_start
+from _ssh_broker import run_sections
 
 sys.stdout.reconfigure(encoding='utf-8')
 
-# Load credentials from environment - NEVER hardcode passwords
+# Key/agent auth; VM_PASSWORD is only an optional fallback - NEVER hardcode passwords
 VM_HOST = os.environ.get("SANDBOX_VM_HOST", "192.168.0.187")
 VM_USER = os.environ.get("VM_USER", "mycosoft")
-VM_PASS = os.environ.get("VM_PASSWORD")
 
-if not VM_PASS:
-    print("ERROR: Set VM_PASSWORD environment variable. Never hardcode passwords!")
-    sys.exit(1)
-
-ssh = paramiko.SSHClient()
-ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-ssh.connect(VM_HOST, username=VM_USER, password=VM_PASS, timeout=30)
+# All six probes run in one remote shell; the start-if-missing decision stays inline in bash.
+# Goes through the local SSH broker (_ssh_broker), so parallel runs share one held connection.
+build_out, images_out, log_out, container_out, start_out, http_code = run_sections(VM_HOST, [
+    "ps aux | grep 'docker build' | grep -v grep",
+    "docker images | grep mycosoft-always-on",
+    "tail -10 /tmp/docker_build.log 2>/dev/null || echo 'No log file'",
+    "docker ps -a --filter name=mycosoft-website --format '{{.Names}}: {{.Status}}'",
+    f"""
+if ! docker ps --format '{{{{.Names}}}}' | grep -q mycosoft-website; then
+    echo 'Starting container...'
+    since=$(date +%s)
+    {RUN_COMMAND}
+    echo "Started at: $({wait_for_container_start()})"
+else
+    echo 'Container already running'
+fi
+""",
+    # Returns as soon as Next.js accepts connections instead of after a fixed sleep.
+    "curl -s -o /dev/null -w '%{http_code}' --retry 10 --retry-connrefused --retry-delay 1 http://localhost:3000 || echo 'Failed'",
+], user=VM_USER)
 
-# Check if build is still running
 print("1. Checking if Docker build is still running...")
-stdin, stdout, stderr = ssh.exec_command("ps aux | grep 'docker build' | grep -v grep", timeout=30)
-out = stdout.read().decode().strip()
-if out:
-    print(f"   Build still running: {out[:80]}...")
+if build_out:
+    print(f"   Build still running: {build_out[:80]}...")
 else:
     print("   Build not running")
 
-# Check if image exists
 print("\n2. Checking if image was built...")
-stdin, stdout, stderr = ssh.exec_command("docker images | grep mycosoft-always-on", timeout=30)
-out = stdout.read().decode().strip()
-print(f"   Images:\n{out if out else '   No mycosoft-always-on images found'}")
+print(f"   Images:\n{images_out if images_out else '   No mycosoft-always-on images found'}")
 
-# Check Docker build log
 print("\n3. Last 10 lines of build log...")
-stdin, stdout, stderr = ssh.exec_command("tail -10 /tmp/docker_build.log 2>/dev/null || echo 'No log file'", timeout=30)
-out = stdout.read().decode().strip()
-print(f"   {out}")
+print(f"   {log_out}")
 
-# Check container status
 print("\n4. Container status...")
-stdin, stdout, stderr = ssh.exec_command("docker ps -a --filter name=mycosoft-website --format '{{.Names}}: {{.Status}}'", timeout=30)
-out = stdout.read().decode().strip()
-print(f"   {out if out else 'Container not found'}")
+print(f"   {container_out if container_out else 'Container not found'}")
 
-# If container doesn't exist but image does, start it
 print("\n5. Starting container if needed...")
-stdin, stdout, stderr = ssh.exec_command("""
-if ! docker ps --format '{{.Names}}' | grep -q mycosoft-website; then
-    echo 'Starting container...'
-    docker run -d --name mycosoft-website -p 3000:3000 \
-        -v /opt/mycosoft/media/website/assets:/app/public/assets:ro \
-        --restart unless-stopped mycosoft-always-on-mycosoft-website:latest 2>&1
-else
-    echo 'Container already running'
-fi
-""", timeout=60)
-out = stdout.read().decode().strip()
-err = stderr.read().decode().strip()
-print(f"   {out}")
-if err:
-    print(f"   Error: {err}")
+print(f"   {start_out}")
 
-# Wait and check
-time.sleep(5)
-
-# Test site
 print("\n6. Testing site...")
-stdin, stdout, stderr = ssh.exec_command("curl -s -o /dev/null -w '%{http_code}' http://localhost:3000 || echo 'Failed'", timeout=30)
-http_code = stdout.read().decode().strip()
 print(f"   HTTP status: {http_code}")
 
-ssh.close()
-
 if http_code == "200":
     print("\n✅ Site is up at sandbox.mycosoft.com")
     purge_everything()
@@ -1,41 +1,51 @@
 #!/usr/bin/env python3
 """Check Docker on sandbox VM"""
 
+import json
 import os
-import paramiko
-import sys
 
-sys.stdout.reconfigure(encoding='utf-8')
+from _remote import run_many, utf8_stdout
 
-# Load credentials from environment variables
 VM_HOST = os.environ.get("SANDBOX_VM_HOST", "192.168.0.187")
 VM_USER = os.environ.get("SANDBOX_VM_USER", "mycosoft")
-VM_PASS = os.environ.get("VM_PASSWORD")
-
-if not VM_PASS:
-    print("ERROR: VM_PASSWORD environment variable is not set.")
-    print("Please set it with: $env:VM_PASSWORD = 'your-password'")
-    sys.exit(1)
-
-ssh = paramiko.SSHClient()
-ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-ssh.connect(VM_HOST, username=VM_USER, password=VM_PASS, timeout=30)
-
-# Check running containers
-print('Running containers:')
-stdin, stdout, stderr = ssh.exec_command('docker ps --format "{{.Names}}: {{.Image}}"', timeout=30)
-print(stdout.read().decode())
-
-# Check docker compose projects
-print('\nDocker compose projects:')
-stdin, stdout, stderr = ssh.exec_command('docker compose ls', timeout=30)
-print(stdout.read().decode())
-
-# Check website container specifically
-print('\nWebsite container details:')
-stdin, stdout, stderr = ssh.exec_command('docker inspect mycosoft-website --format "Image: {{.Config.Image}}\nCreated: {{.Created}}"', timeout=30)
-out = stdout.read().decode()
-err = stderr.read().decode()
-print(out if out else err)
-
-ssh.close()
+
+
+def check_docker(host=VM_HOST, user=VM_USER):
+    """Print containers, compose projects and the website container image from one JSON round-trip."""
+    ps_out, inspect_out = run_many(host, [
+        "docker ps -a --format '{{json .}}'",
+        "docker inspect mycosoft-website 2>/dev/null || echo '[]'",
+    ], timeout=30, user=user)
+    containers = [json.loads(line) for line in ps_out.splitlines() if line.startswith("{")]
+
+    # Check containers
+    print('Containers:')
+    for container in containers:
+        print(f"{container['Names']}: {container['Image']} ({container['State']})")
+
+    # Compose projects come from container labels - no separate `docker compose ls`
+    projects = sorted({
+        label.split("=", 1)[1]
+        for container in containers
+        for label in container.get("Labels", "").split(",")
+        if label.startswith("com.docker.compose.project=")
+    })
+    print('\nDocker compose projects:')
+    print("\n".join(projects) if projects else "None")
+
+    # Check website container specifically
+    print('\nWebsite container details:')
+    try:
+        details = json.loads(inspect_out or "[]")
+    except ValueError:
+        print(inspect_out)
+        return
+    if details:
+        print(f"Image: {details[0]['Config']['Image']}\nCreated: {details[0]['Created']}")
+    else:
+        print("mycosoft-website container not found")
+
+
+if __name__ == "__main__":
+    utf8_stdout()
+    check_docker()
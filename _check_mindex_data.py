@@ -1,42 +1,52 @@
 #!/usr/bin/env python3
 """Check MINDEX database for data and test direct SQL"""
-import paramiko
+import asyncio
+
+from _remote import utf8_stdout
+from _ssh_cli import SECTION_DELIMITER, gather_runs, split_sections
 
 VM_IP = "${MINDEX_VM_HOST}"
 VM_USER = "mycosoft"
-VM_PASS = "REDACTED_VM_SSH_PASSWORD"
-
-def run_ssh(cmd):
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    try:
-        client.connect(VM_IP, username=VM_USER, password=VM_PASS, timeout=30)
-        stdin, stdout, stderr = client.exec_command(cmd, timeout=60)
-        return stdout.read().decode(), stderr.read().decode()
-    finally:
-        client.close()
-
-# Check taxon table count
-print("=== Taxa Count ===")
-out, err = run_ssh("""docker exec mindex-postgres psql -U mycosoft -d mindex -c "SELECT COUNT(*) FROM core.taxon;" """)
-print(out or err)
-
-# Check if taxa contain 'Amanita'
-print("\n=== Taxa matching 'Amanita' (limit 3) ===")
-out, err = run_ssh("""docker exec mindex-postgres psql -U mycosoft -d mindex -c "SELECT id, scientific_name, common_name FROM core.taxon WHERE scientific_name ILIKE '%Amanita%' OR common_name ILIKE '%Amanita%' LIMIT 3;" """)
-print(out or err)
-
-# Check compounds table
-print("\n=== Compounds Count ===")
-out, err = run_ssh("""docker exec mindex-postgres psql -U mycosoft -d mindex -c "SELECT COUNT(*) FROM core.compounds;" """)
-print(out or err)
-
-# Check genetics table
-print("\n=== DNA Sequences Count ===")
-out, err = run_ssh("""docker exec mindex-postgres psql -U mycosoft -d mindex -c "SELECT COUNT(*) FROM core.dna_sequences;" """)
-print(out or err)
+
+# One psql session for every query: a single docker exec + Postgres connection, sections split in Python
+PSQL = 'docker exec -i mindex-postgres psql -U mycosoft -d mindex -v ON_ERROR_STOP=0'
+
+SQL_PROBES = [
+    ("=== Taxa Count ===",
+     "SELECT COUNT(*) FROM core.taxon;"),
+    ("\n=== Taxa matching 'Amanita' (limit 3) ===",
+     "SELECT id, scientific_name, common_name FROM core.taxon WHERE scientific_name ILIKE '%Amanita%' OR common_name ILIKE '%Amanita%' LIMIT 3;"),
+    ("\n=== Compounds Count ===",
+     "SELECT COUNT(*) FROM core.compounds;"),
+    ("\n=== DNA Sequences Count ===",
+     "SELECT COUNT(*) FROM core.dna_sequences;"),
+]
 
 # Check unified_search.py in container - see if it has logging
-print("\n=== Check unified_search.py in container ===")
-out, err = run_ssh("""docker exec mindex-api head -50 /app/mindex_api/routers/unified_search.py | tail -30""")
-print(out or err)
+ROUTER_TITLE = "\n=== Check unified_search.py in container ==="
+ROUTER_CMD = "docker exec mindex-api head -50 /app/mindex_api/routers/unified_search.py | tail -30"
+
+
+def _psql_batch(statements):
+    """psql heredoc running statements in order with a SECTION_DELIMITER line between their outputs."""
+    script = f"\n\\echo '{SECTION_DELIMITER}'\n".join(statements)
+    return f"{PSQL} 2>&1 <<'SQL'\n{script}\nSQL"
+
+
+def check_mindex_data(host=VM_IP, user=VM_USER):
+    """Print row counts and the unified_search router head; both commands run concurrently."""
+    # The psql batch and the router check run concurrently over one multiplexed connection
+    (_, sql_out, sql_err), (_, router_out, router_err) = asyncio.run(gather_runs(
+        host, [_psql_batch([sql for _, sql in SQL_PROBES]), ROUTER_CMD], timeout=60, user=user,
+    ))
+    sections = split_sections(sql_out, len(SQL_PROBES))
+    for (title, _), out in zip(SQL_PROBES, sections):
+        print(title)
+        print(out or sql_err)
+    print(ROUTER_TITLE)
+    print(router_out or router_err)
+
+
+if __name__ == "__main__":
+    utf8_stdout()
+    check_mindex_data()
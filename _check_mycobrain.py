@@ -1,21 +1,19 @@
 #!/usr/bin/env python3
 """Check MycoBrain status on Sandbox."""
 import os, paramiko
-from pathlib import Path
-creds = Path(__file__).parent / ".credentials.local"
-if creds.exists():
-    for line in creds.read_text().splitlines():
-        if "=" in line and not line.startswith("#"):
-            k, v = line.split("=", 1)
-            os.environ[k.strip()] = v.strip()
+from _ssh_session import auth_kwargs, read_all, tune_transport
+from _creds import load_credentials
+load_credentials()
 p = os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD")
 ssh = paramiko.SSHClient()
 ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-ssh.connect("192.168.0.187", username="mycosoft", password=p, timeout=30)
+ssh.connect("192.168.0.187", username="mycosoft", timeout=30, **auth_kwargs(p))
+tune_transport(ssh)
 def run(c, t=60):
     stdin, stdout, stderr = ssh.exec_command(c, t)
+    out = read_all(stdout, t)
     code = stdout.channel.recv_exit_status()
-    return code, stdout.read().decode(errors="replace"), stderr.read().decode(errors="replace")
+    return code, out, stderr.read().decode(errors="replace")
 def sudo(cmd):
     esc = p.replace("'", "'\"'\"'").replace("\\", "\\\\").replace("\n", " ").replace("\r", "")
     return run(f"echo '{esc}' | sudo -S sh -c {repr(cmd)}")
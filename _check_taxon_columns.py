@@ -1,32 +1,42 @@
 #!/usr/bin/env python3
 """Check actual column names in core.taxon table"""
-import paramiko
+import argparse
+
+from _remote import docker_exec, utf8_stdout
+from _schema_cache import get_columns
 
 VM_IP = "${MINDEX_VM_HOST}"
 VM_USER = "mycosoft"
-VM_PASS = "REDACTED_VM_SSH_PASSWORD"
 
-def run_ssh(cmd):
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
+def check_taxon_columns(host=VM_IP, user=VM_USER, bypass_cache=False):
+    """Print core.taxon columns (cached for an hour, see _schema_cache) and test both
+    name columns the search query could use; the search queries always run live."""
+    def psql(sql):
+        return docker_exec(host, "mindex-postgres", f'psql -U mycosoft -d mindex -c "{sql}"', user=user)
+
+    # Check taxon table columns
+    print("=== core.taxon columns ===")
     try:
-        client.connect(VM_IP, username=VM_USER, password=VM_PASS, timeout=30)
-        stdin, stdout, stderr = client.exec_command(cmd, timeout=60)
-        return stdout.read().decode(), stderr.read().decode()
-    finally:
-        client.close()
-
-# Check taxon table columns
-print("=== core.taxon columns ===")
-out, err = run_ssh("""docker exec mindex-postgres psql -U mycosoft -d mindex -c "SELECT column_name, data_type FROM information_schema.columns WHERE table_schema = 'core' AND table_name = 'taxon' ORDER BY ordinal_position;" """)
-print(out or err)
-
-# Test the exact query that search_taxa would run
-print("\n=== Test search query with canonical_name ===")
-out, err = run_ssh("""docker exec mindex-postgres psql -U mycosoft -d mindex -c "SELECT id, canonical_name, common_name FROM core.taxon WHERE canonical_name ILIKE '%Amanita%' LIMIT 3;" 2>&1""")
-print(out or err)
-
-# Test with scientific_name
-print("\n=== Test search query with scientific_name ===")
-out, err = run_ssh("""docker exec mindex-postgres psql -U mycosoft -d mindex -c "SELECT id, scientific_name, common_name FROM core.taxon WHERE scientific_name ILIKE '%Amanita%' LIMIT 3;" 2>&1""")
-print(out or err)
+        columns = get_columns(host, "core", "taxon", user=user, bypass_cache=bypass_cache)
+    except RuntimeError as e:
+        print(e)
+    else:
+        for name, data_type in columns:
+            print(f" {name:<30} | {data_type}")
+
+    # Test the exact query that search_taxa would run
+    print("\n=== Test search query with canonical_name ===")
+    print(psql("SELECT id, canonical_name, common_name FROM core.taxon WHERE canonical_name ILIKE '%Amanita%' LIMIT 3;"))
+
+    # Test with scientific_name
+    print("\n=== Test search query with scientific_name ===")
+    print(psql("SELECT id, scientific_name, common_name FROM core.taxon WHERE scientific_name ILIKE '%Amanita%' LIMIT 3;"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bypass-cache", action="store_true", help="Re-query information_schema instead of using the cached columns")
+    args = parser.parse_args()
+    utf8_stdout()
+    check_taxon_columns(bypass_cache=args.bypass_cache)
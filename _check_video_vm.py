@@ -2,24 +2,17 @@
 """Check VM 187 for NAS assets path and hero video file."""
 import os
 import paramiko
-from pathlib import Path
+from _ssh_session import auth_kwargs, read_all, tune_transport
+from _creds import CREDENTIALS_FILE, ENV_FILE, load_credentials
 
-for f in (".credentials.local", ".env.local"):
-    p = Path(__file__).parent / f
-    if p.exists():
-        for line in p.read_text().splitlines():
-            if line and not line.startswith("#") and "=" in line:
-                k, v = line.split("=", 1)
-                os.environ[k.strip()] = v.strip().strip("'\"")
+load_credentials((CREDENTIALS_FILE, ENV_FILE))
 host = "192.168.0.187"
 user = os.environ.get("VM_SSH_USER", "mycosoft")
 pw = os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD")
-if not pw:
-    print("No VM_PASSWORD")
-    exit(1)
 c = paramiko.SSHClient()
 c.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-c.connect(host, username=user, password=pw, timeout=15)
+c.connect(host, username=user, timeout=15, **auth_kwargs(pw))
+tune_transport(c)
 for label, cmd in [
     ("assets dir", "ls -la /opt/mycosoft/media/website/assets 2>&1 | head -25"),
     ("homepage", "ls -la /opt/mycosoft/media/website/assets/homepage 2>&1"),
@@ -27,6 +20,6 @@ for label, cmd in [
     ("container mounts", "docker inspect mycosoft-website --format '{{range .Mounts}}{{.Source}} -> {{.Destination}}; {{end}}' 2>&1"),
 ]:
     _, out, err = c.exec_command(cmd, timeout=10)
-    t = (out.read() + err.read()).decode().strip()
+    t = (read_all(out, 10) + err.read().decode(errors="replace")).strip()
     print(f"--- {label} ---\n{t}\n")
 c.close()
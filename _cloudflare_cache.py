@@ -3,11 +3,52 @@
 
 from __future__ import annotations
 
+import functools
 import os
+import re
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Iterator, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_session: Optional[requests.Session] = None
+
+# KEY=VALUE per line; value may be "double" or 'single' quoted. Comment lines never match.
+_ENV_RE = re.compile(
+    r"""^(?![ \t]*#)[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(?:"([^"\n]*)"|'([^'\n]*)'|([^\n]*))[ \t\r]*$""",
+    re.MULTILINE,
+)
+
+
+def _get_session(token: str) -> requests.Session:
+    """Shared keep-alive session for api.cloudflare.com; transient 5xx are retried instead of failing the deploy."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        # purge_everything is idempotent, so POST is safe to retry.
+        retry = Retry(
+            total=2,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+            raise_on_status=False,
+        )
+        _session.mount("https://", HTTPAdapter(max_retries=retry))
+        _session.headers.update({"Content-Type": "application/json"})
+    _session.headers["Authorization"] = f"Bearer {token}"
+    return _session
+
+
+def _iter_env_file(path: Path) -> Iterator[Tuple[str, str]]:
+    """(key, value) pairs from a dotenv-style file in one regex pass; nothing if it can't be read."""
+    try:
+        text = path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return
+    for m in _ENV_RE.finditer(text):
+        yield m.group(1), m.group(2) or m.group(3) or (m.group(4) or "").strip()
 
 
 def _load_dotenv_into_os(dir_path: Path, filenames: tuple[str, ...] = (".env.local", ".env")) -> None:
@@ -20,47 +61,17 @@ def _load_dotenv_into_os(dir_path: Path, filenames: tuple[str, ...] = (".env.loc
         "CLOUDFLARE_ACCOUNT_ID",
     }
     for name in filenames:
-        fpath = dir_path / name
-        if not fpath.is_file():
-            continue
-        try:
-            with open(fpath, encoding="utf-8", errors="replace") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith("#") or "=" not in line:
-                        continue
-                    key, _, value = line.partition("=")
-                    key = key.strip()
-                    if key in skip_keys:
-                        continue
-                    value = value.strip().strip('"').strip("'")
-                    if key and key not in os.environ:
-                        os.environ[key] = value
-        except OSError:
-            pass
+        for key, value in _iter_env_file(dir_path / name):
+            if key not in skip_keys:
+                os.environ.setdefault(key, value)
 
 
 def _override_cloudflare_from_credentials(script_dir: Path, cwd: Path) -> None:
     """Apply CLOUDFLARE_* from .credentials.local last — .env.local may hold stale tokens (401 on purge)."""
     for base in (script_dir, cwd, script_dir.parent.parent / "MAS" / "mycosoft-mas"):
-        fpath = base / ".credentials.local"
-        if not fpath.is_file():
-            continue
-        try:
-            with open(fpath, encoding="utf-8", errors="replace") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith("#") or "=" not in line:
-                        continue
-                    key, _, value = line.partition("=")
-                    key = key.strip()
-                    if not key.startswith("CLOUDFLARE"):
-                        continue
-                    value = value.strip().strip('"').strip("'")
-                    if value:
-                        os.environ[key] = value
-        except OSError:
-            pass
+        for key, value in _iter_env_file(base / ".credentials.local"):
+            if key.startswith("CLOUDFLARE") and value:
+                os.environ[key] = value
 
 
 def _resolve_cloudflare_api_token() -> Optional[str]:
@@ -73,11 +84,17 @@ def _resolve_cloudflare_api_token() -> Optional[str]:
 
 
 def _get_cloudflare_config() -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    return _config_cached(str(Path(__file__).resolve().parent), str(Path.cwd()))
+
+
+@functools.lru_cache(maxsize=8)
+def _config_cached(script_dir_str: str, cwd_str: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Load env files once per (script_dir, cwd); repeated purge_everything() calls are O(1)."""
     # Try loading from .env in the same directory as this script (website repo root when run from website/)
-    script_dir = Path(__file__).resolve().parent
+    script_dir = Path(script_dir_str)
     _load_dotenv_into_os(script_dir)
     # Also try cwd (e.g. when run from website repo)
-    cwd = Path.cwd()
+    cwd = Path(cwd_str)
     if cwd != script_dir:
         _load_dotenv_into_os(cwd)
     # Also try .credentials.local (MAS and website repos)
@@ -102,14 +119,10 @@ def purge_everything(timeout_seconds: int = 20, zone_id_override: Optional[str]
         return False
 
     url = f"https://api.cloudflare.com/client/v4/zones/{zone_id}/purge_cache"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-    }
     payload = {"purge_everything": True}
 
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=timeout_seconds)
+        response = _get_session(token).post(url, json=payload, timeout=timeout_seconds)
         data = response.json()
         if response.ok and data.get("success") is True:
             print("Cloudflare purge succeeded (purge_everything=true).")
@@ -6,26 +6,21 @@ Includes automatic Cloudflare cache purge after successful deploy.
 import os
 import paramiko
 import sys
-import time
-from pathlib import Path
 
 from _cloudflare_cache import purge_everything
+from _creds import MAS_CREDENTIALS_FILE, load_credentials
+from _docker_build import SERVICE_ENV, build_command, run_command, sync_command
+from _docker_events import bash, wait_for_container_start
+from _ssh_session import connect, stream_lines
 
-# Load credentials
-creds_file = Path(__file__).parent.parent.parent / "MAS" / "mycosoft-mas" / ".credentials.local"
-if not creds_file.exists():
-    creds_file = Path(__file__).parent / ".credentials.local"
+# Credentials: the MAS repo's file when present, else this repo's
+creds = load_credentials((MAS_CREDENTIALS_FILE,)) or load_credentials()
+password = (
+    creds.get("VM_SSH_PASSWORD") or creds.get("VM_PASSWORD")
+    or os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD") or ""
+)
 
-password = os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD") or ""
-if creds_file.exists():
-    for line in creds_file.read_text().splitlines():
-        if line and not line.startswith("#") and "=" in line:
-            key, value = line.split("=", 1)
-            if key.strip() in ["VM_SSH_PASSWORD", "VM_PASSWORD"]:
-                password = value.strip()
-                break
-
-mas_vm = "${MAS_VM_HOST}"
+mas_vm = os.environ.get("MAS_VM_HOST", "192.168.0.188")
 sandbox_vm = "192.168.0.187"
 username = "mycosoft"
 
@@ -33,22 +28,14 @@ print(f">> Deploying website to Sandbox VM ({sandbox_vm})")
 print("=" * 80)
 
 def connect_sandbox():
-    """Try direct SSH to Sandbox first, then jump via MAS."""
-    sandbox_client = paramiko.SSHClient()
-    sandbox_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    """Try direct SSH to Sandbox first, then jump via MAS.
+    connect() retries refused connections with backoff, so a VM that is still booting is waited out."""
     try:
-        sandbox_client.connect(sandbox_vm, username=username, password=password, timeout=10)
-        return sandbox_client, None
+        return connect(sandbox_vm, username, password), None
     except Exception:
-        sandbox_client.close()
-    mas_client = paramiko.SSHClient()
-    mas_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    mas_client.connect(mas_vm, username=username, password=password, timeout=10)
-    channel = mas_client.get_transport().open_channel("direct-tcpip", (sandbox_vm, 22), (mas_vm, 22))
-    sandbox_client = paramiko.SSHClient()
-    sandbox_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    sandbox_client.connect(sandbox_vm, username=username, password=password, sock=channel, timeout=10)
-    return sandbox_client, mas_client
+        pass
+    mas_client = connect(mas_vm, username, password)
+    return connect(sandbox_vm, username, password, jump=mas_client), mas_client
 
 try:
     print(f"\n>> Connecting to Sandbox VM ({sandbox_vm})...")
@@ -57,9 +44,7 @@ try:
     
     # Step 2b: Pull latest code from GitHub
     print(f"\n>> Pulling latest code from GitHub...")
-    stdin, stdout, stderr = sandbox_client.exec_command(
-        "cd /opt/mycosoft/website && git fetch origin && git reset --hard origin/main"
-    )
+    stdin, stdout, stderr = sandbox_client.exec_command(sync_command())
     exit_status = stdout.channel.recv_exit_status()
     pull_output = stdout.read().decode().strip()
     pull_err = stderr.read().decode().strip()
@@ -73,7 +58,7 @@ try:
     # Step 3: Stop and remove existing container (force)
     print(f"\n>> Stopping and removing existing container (forced)...")
     stdin, stdout, stderr = sandbox_client.exec_command(
-        "docker stop -t 2 mycosoft-website 2>&1 || true"
+        "docker stop -t 2 mycosoft-website 2>&1 && docker wait mycosoft-website >/dev/null 2>&1 || true"
     )
     stdout.channel.recv_exit_status()
     stop_output = stdout.read().decode().strip()
@@ -88,8 +73,7 @@ try:
     if rm_output and "No such container" not in rm_output:
         print(f"    Remove: {rm_output}")
     
-    # Wait for cleanup
-    time.sleep(2)
+    # docker wait / rm -f only return once the container is gone - no settle sleep needed
     print("    Container cleanup complete")
     
     # Step 4: Build Docker image
@@ -97,29 +81,18 @@ try:
     print("    Location: /opt/mycosoft/website")
     print("    Image: mycosoft-always-on-mycosoft-website:latest")
     
-    stdin, stdout, stderr = sandbox_client.exec_command(
-        "cd /opt/mycosoft/website && "
-        "docker build -t mycosoft-always-on-mycosoft-website:latest . 2>&1",
-        get_pty=True
-    )
-    
+    # No PTY: --progress=plain output is already line-oriented, and stream_lines reads stderr too
+    stdin, stdout, stderr = sandbox_client.exec_command(build_command())
+    stdin.channel.shutdown_write()
+
     # Stream output (safe for Windows cp1252 - replace Unicode)
     def safe_print(s: str) -> None:
         out = s.encode("ascii", errors="replace").decode("ascii")
         print(out)
 
-    while True:
-        line = stdout.readline()
-        if not line:
-            break
-        safe_print(f"    {line.rstrip()}")
-    
-    exit_status = stdout.channel.recv_exit_status()
+    exit_status, _ = stream_lines(stdout.channel, lambda line: safe_print(f"    {line}"))
     if exit_status != 0:
         print(f"ERROR: Docker build failed with exit code {exit_status}")
-        error = stderr.read().decode()
-        if error:
-            print(f"Error: {error}")
         if exit_status == 137:
             print(
                 "    Hint: 137 often means the build was OOM-killed. "
@@ -143,22 +116,17 @@ try:
         "true'"
     )
     stdout.channel.recv_exit_status()
-    time.sleep(1)
 
     print(f"\n>> Starting new container...")
-    start_cmd = (
-        "docker run -d --name mycosoft-website -p 3000:3000 "
-        "-v /opt/mycosoft/media/website/assets:/app/public/assets:ro "
-        "-e MAS_API_URL=http://${MAS_VM_HOST:-localhost}:8001 "
-        "-e MINDEX_API_URL=http://${MINDEX_VM_HOST:-localhost}:8000 "
-        "-e OLLAMA_BASE_URL=http://${MAS_VM_HOST:-localhost}:11434 "
-        "-e OLLAMA_MODEL=llama3.2:3b "
-        "-e N8N_URL=http://${MAS_VM_HOST:-localhost}:5678 "
-        "-e NEXT_PUBLIC_BASE_URL=https://sandbox.mycosoft.com "
-        "--restart unless-stopped "
-        "mycosoft-always-on-mycosoft-website:latest"
+    start_cmd = run_command(
+        *SERVICE_ENV,
+        "-e OLLAMA_MODEL=llama3.2:3b",
+        "-e NEXT_PUBLIC_BASE_URL=https://sandbox.mycosoft.com",
     )
     
+    # Remote clock, taken before docker run, so the start event is replayed rather than missed
+    stdin, stdout, stderr = sandbox_client.exec_command("date +%s")
+    since = stdout.read().decode().strip()
     stdin, stdout, stderr = sandbox_client.exec_command(start_cmd)
     exit_status = stdout.channel.recv_exit_status()
     output = stdout.read().decode()
@@ -174,7 +142,11 @@ try:
     
     # Step 6: Verify container is running
     print(f"\n>> Verifying container status...")
-    time.sleep(2)
+    stdin, stdout, stderr = sandbox_client.exec_command(
+        bash(wait_for_container_start(since=since, timeout=10)), timeout=20
+    )
+    if not stdout.read().decode().strip():
+        print("    No start event within 10s")
     
     stdin, stdout, stderr = sandbox_client.exec_command(
         "docker ps --filter name=mycosoft-website --format '{{.ID}} {{.Status}} {{.Ports}}'"
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""`.credentials.local` / `.env.local` loading shared by the deploy and check scripts."""
+
+from __future__ import annotations
+
+import functools
+import os
+import re
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Sequence
+
+REPO_DIR = Path(__file__).resolve().parent
+CREDENTIALS_FILE = REPO_DIR / ".credentials.local"
+ENV_FILE = REPO_DIR / ".env.local"
+MAS_CREDENTIALS_FILE = REPO_DIR.parent.parent / "MAS" / "mycosoft-mas" / ".credentials.local"
+
+# KEY=value per line; blank and # comment lines never match. Whitespace around key/value is trimmed.
+_LINE_RE = re.compile(r"^[ \t]*([^#=\s][^=\n]*?)[ \t]*=[ \t]*(.*?)[ \t]*\r?$", re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=None)
+def load_credentials(files: Sequence[Path] = (CREDENTIALS_FILE,), override: bool = True) -> Mapping[str, str]:
+    """Export KEY=value pairs from files into os.environ (once per process) and return them read-only.
+
+    Files are applied in order and missing ones are skipped; surrounding quotes are stripped from
+    values. override=False keeps variables that are already set (environment or an earlier file).
+    """
+    values: Dict[str, str] = {}
+    for path in files:
+        try:
+            text = path.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            continue
+        for key, value in _LINE_RE.findall(text):
+            value = value.strip("\"'")
+            if override:
+                os.environ[key] = value
+            else:
+                os.environ.setdefault(key, value)
+            values[key] = os.environ[key]
+    return MappingProxyType(values)
+
+
+def vm_password() -> Optional[str]:
+    """SSH password fallback for the VMs: VM_PASSWORD, else VM_SSH_PASSWORD; None when neither is set.
+    Call after load_credentials, which is what usually puts them in the environment."""
+    return os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD") or None
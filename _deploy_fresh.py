@@ -3,23 +3,21 @@
 Ultra-robust deployment with fresh SSH connections per step
 Handles docker stop timeouts by using separate connections
 """
-import os
 import sys
-import time
-from pathlib import Path
 import paramiko
 
-# Load credentials
-creds_file = Path(__file__).parent / ".credentials.local"
-if creds_file.exists():
-    for line in creds_file.read_text().splitlines():
-        if "=" in line and not line.startswith("#"):
-            k, v = line.split("=", 1)
-            os.environ[k.strip()] = v.strip()
+from _creds import load_credentials
+from _docker_build import MAS_ENV, build_command, force_rebuild_requested, run_command
+from _docker_events import bash, wait_for_container_start, wait_for_healthy
+from _docker_ps import find, is_running, parse_ps, ps_command
+from _ssh_session import auth_kwargs, run, tune_transport
+
+load_credentials()
 
 VM_IP = "192.168.0.187"
 VM_USER = "mycosoft"
-VM_PASSWORD = os.environ.get("VM_SSH_PASSWORD")
+# Key auth: VM_SSH_KEY (or agent/~/.ssh); password only if VM_SSH_PASSWORD is set
+START_COMMAND = run_command(*MAS_ENV)
 
 def ssh_exec_simple(command, timeout=30):
     """Execute single command with fresh SSH connection"""
@@ -27,12 +25,11 @@ def ssh_exec_simple(command, timeout=30):
     ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
     
     try:
-        ssh.connect(VM_IP, username=VM_USER, password=VM_PASSWORD, timeout=10)
+        ssh.connect(VM_IP, username=VM_USER, timeout=10, **auth_kwargs())
+        tune_transport(ssh)
         print(f"[EXEC] {command}")
-        stdin, stdout, stderr = ssh.exec_command(command, timeout=timeout)
-        exit_code = stdout.channel.recv_exit_status()
-        output = stdout.read().decode('utf-8').strip()
-        error = stderr.read().decode('utf-8').strip()
+        exit_code, output, error = run(ssh, command, timeout=timeout)
+        output, error = output.strip(), error.strip()
         ssh.close()
         
         if output:
@@ -67,15 +64,14 @@ def main():
     print("\n[STEP 2] Remove old container")
     print("Forcing immediate kill (no graceful stop)...")
     ssh_exec_simple("docker kill mycosoft-website 2>/dev/null || true", timeout=10)
-    ssh_exec_simple("docker rm -f mycosoft-website 2>/dev/null || true", timeout=10)
-    time.sleep(2)
+    ssh_exec_simple("docker rm -f mycosoft-website 2>/dev/null || true", timeout=10)  # returns once removed
     print("[OK] Old container removed")
     
     # Step 3: Build image (long timeout)
     print("\n[STEP 3] Build Docker image (this will take 5-10 minutes)")
-    print("Building with --no-cache...")
+    print("Building with --no-cache (FORCE_REBUILD=1)..." if force_rebuild_requested() else "Building with layer cache...")
     exit_code, output, error = ssh_exec_simple(
-        "cd /opt/mycosoft/website && docker build --no-cache -t mycosoft-always-on-mycosoft-website:latest .",
+        build_command(),
         timeout=900  # 15 minutes
     )
     
@@ -88,13 +84,8 @@ def main():
     
     # Step 4: Start container
     print("\n[STEP 4] Start new container")
-    start_cmd = """docker run -d --name mycosoft-website -p 3000:3000 \
--v /opt/mycosoft/media/website/assets:/app/public/assets:ro \
--e MAS_API_URL=http://${MAS_VM_HOST:-localhost}:8001 \
---restart unless-stopped \
-mycosoft-always-on-mycosoft-website:latest"""
-    
-    exit_code, container_id, error = ssh_exec_simple(start_cmd, timeout=30)
+    _, since, _ = ssh_exec_simple("date +%s", timeout=10)  # remote clock, before the start event fires
+    exit_code, container_id, error = ssh_exec_simple(START_COMMAND, timeout=30)
     
     if exit_code != 0:
         print("[ERROR] Container start failed")
@@ -104,18 +95,24 @@ mycosoft-always-on-mycosoft-website:latest"""
     
     # Step 5: Verify
     print("\n[STEP 5] Verify deployment")
-    time.sleep(5)
+    # Block on the container's start event instead of a fixed sleep
+    _, started, _ = ssh_exec_simple(bash(wait_for_container_start(since=since, timeout=10)), timeout=20)
+    if not started:
+        print("[WARN] No start event within 10s")
     
-    exit_code, status, _ = ssh_exec_simple("docker ps --filter name=mycosoft-website --format '{{.Status}}'", timeout=10)
-    if "Up" in status:
-        print(f"[OK] Container running: {status}")
+    exit_code, ps_out, _ = ssh_exec_simple(ps_command(), timeout=10)
+    container = find(parse_ps(ps_out))
+    if is_running(container):
+        print(f"[OK] Container running: {container['Status']}")
     else:
         print("[WARN] Container may not be healthy")
         ssh_exec_simple("docker logs mycosoft-website --tail 30", timeout=10)
         return 1
     
-    # Test HTTP
+    # Test HTTP once the HEALTHCHECK passes
     print("\n[STEP 6] Test HTTP endpoint")
+    _, health, _ = ssh_exec_simple(wait_for_healthy(), timeout=60)
+    print(f"[INFO] Container health: {health}")
     exit_code, output, _ = ssh_exec_simple("curl -s -o /dev/null -w '%{http_code}' http://localhost:3000", timeout=10)
     if output == "200":
         print("[OK] Website responding with HTTP 200")
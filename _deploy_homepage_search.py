@@ -10,42 +10,26 @@ Deploys the new HeroSearch component with:
 
 import os
 import paramiko
-import sys
-import time
 from _cloudflare_cache import purge_everything
+from _docker_build import RUN_COMMAND, build_command, sync_command
+from _docker_events import bash, wait_for_container_start, wait_for_exit
+from _ssh_session import auth_kwargs, read_streams, stream_lines, tune_transport
 
-# Load credentials from environment variables
+# Key/agent auth; VM_PASSWORD is only an optional fallback
 HOST = os.environ.get("SANDBOX_VM_HOST", "192.168.0.187")
 USER = os.environ.get("SANDBOX_VM_USER", "mycosoft")
 PASS = os.environ.get("VM_PASSWORD")
 
-if not PASS:
-    print("ERROR: VM_PASSWORD environment variable is not set.")
-    print("Please set it with: $env:VM_PASSWORD = 'your-password'")
-    sys.exit(1)
 
-def run_cmd(ssh, cmd, timeout=300, wait=True):
-    """Run command and optionally return output"""
+def run_cmd(ssh, cmd, timeout=300):
+    """Run command and return output"""
     print(f"  > {cmd[:80]}...")
     channel = ssh.get_transport().open_session()
     channel.settimeout(timeout)
     channel.exec_command(cmd)
     
-    if not wait:
-        time.sleep(1)  # Give command time to start
-        return "", "", 0
-    
-    # Wait for command to complete
-    while not channel.exit_status_ready():
-        time.sleep(0.5)
-    
-    out = ""
-    err = ""
-    while channel.recv_ready():
-        out += channel.recv(4096).decode()
-    while channel.recv_stderr_ready():
-        err += channel.recv_stderr(4096).decode()
-    
+    # Block until both pipes hit EOF instead of polling exit status; nothing is left unread
+    out, err = read_streams(channel, timeout)
     exit_code = channel.recv_exit_status()
     out = out.strip()
     err = err.strip()
@@ -67,57 +51,43 @@ def main():
     ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
     
     print("\n1. Connecting to sandbox VM...")
-    ssh.connect(HOST, username=USER, password=PASS)
+    ssh.connect(HOST, username=USER, **auth_kwargs(PASS))
+    tune_transport(ssh)
     print("   Connected!")
     
     print("\n2. Pulling latest code...")
-    run_cmd(ssh, "cd /opt/mycosoft/website && git fetch origin && git reset --hard origin/main")
+    run_cmd(ssh, sync_command())
     
     print("\n3. Checking for running build processes...")
-    out, _, _ = run_cmd(ssh, "ps aux | grep 'docker build' | grep -v grep | wc -l")
-    if out.strip() != "0":
-        print("   Build in progress, waiting...")
-        for i in range(60):
-            time.sleep(5)
-            out, _, _ = run_cmd(ssh, "ps aux | grep 'docker build' | grep -v grep | wc -l")
-            if out.strip() == "0":
-                print("   Build completed!")
-                break
-            print(f"   Still building... ({i*5}s)")
-    
-    print("\n4. Starting Docker build (background)...")
-    # Use shell to run in background - don't wait for output
-    run_cmd(ssh, "cd /opt/mycosoft/website && docker build -t mycosoft-always-on-mycosoft-website:latest --no-cache . > /tmp/docker-build.log 2>&1 &", wait=False)
-    print("   Build started in background")
-    
-    print("\n5. Waiting for build to complete...")
-    time.sleep(5)  # Give it time to start
-    for i in range(120):  # Wait up to 10 minutes
-        out, _, _ = run_cmd(ssh, "ps aux | grep 'docker build' | grep -v grep | wc -l")
-        if out.strip() == "0":
-            print(f"\n   ✓ Build completed after ~{i*5}s!")
-            break
-        if i % 12 == 0:  # Every 60 seconds
-            # Check last few lines of build log
-            out, _, _ = run_cmd(ssh, "tail -3 /tmp/docker-build.log 2>/dev/null || echo 'building...'")
-        time.sleep(5)
+    # One blocking command (tail --pid) until any running build exits, instead of polling ps every 5s
+    out, _, _ = run_cmd(ssh, bash(wait_for_exit(timeout=300)), timeout=330)
+    if out.strip() == "0":
+        print("   No build running")
     else:
-        print("   WARNING: Build may still be running, proceeding anyway...")
-    
-    print("\n6. Checking build result...")
-    run_cmd(ssh, "tail -10 /tmp/docker-build.log 2>/dev/null || echo 'No log'")
+        print(f"   {out.strip()} build process(es) still running after 5 minutes, proceeding anyway...")
+    
+    print("\n4. Building Docker image (streaming output)...")
+    # One long-lived channel for the whole build instead of polling for it
+    # No PTY (--progress=plain is line-oriented); transport keepalive holds the channel open
+    stdin, stdout, stderr = ssh.exec_command(build_command(), timeout=900)
+    stdin.channel.shutdown_write()
+    build_status, _ = stream_lines(stdout.channel, lambda line: print(f"    {line}"))
+    
+    print("\n5. Checking build result...")
+    if build_status == 0:
+        print("   ✓ Build completed!")
+    else:
+        print(f"   WARNING: Build exited with status {build_status}, proceeding anyway...")
     
-    print("\n7. Stopping old container...")
+    print("\n6. Stopping old container...")
     run_cmd(ssh, "docker stop mycosoft-website 2>/dev/null || true")
     
-    print("\n8. Removing old container...")
+    print("\n7. Removing old container...")
     run_cmd(ssh, "docker rm mycosoft-website 2>/dev/null || true")
     
-    print("\n9. Starting new container...")
-    out, err, code = run_cmd(ssh, """docker run -d --name mycosoft-website -p 3000:3000 \
-        -v /opt/mycosoft/media/website/assets:/app/public/assets:ro \
-        --restart unless-stopped \
-        mycosoft-always-on-mycosoft-website:latest""")
+    print("\n8. Starting new container...")
+    since, _, _ = run_cmd(ssh, "date +%s")
+    out, err, code = run_cmd(ssh, RUN_COMMAND)
     
     if code == 0:
         container_id = out[:12] if out else "started"
@@ -126,18 +96,21 @@ def main():
         print(f"   ERROR: {err}")
         return
     
-    print("\n10. Waiting for container to be ready...")
-    time.sleep(8)
+    print("\n9. Waiting for container to be ready...")
+    run_cmd(ssh, bash(wait_for_container_start(since=since, timeout=30)), timeout=40)
     
-    print("\n11. Testing pages...")
+    print("\n10. Testing pages...")
     pages = ["/", "/search?q=test", "/test-fluid-search"]
+    # One curl process for every page: one channel, and the connection to :3000 is reused
+    urls = " ".join(f"'http://localhost:3000{page}'" for page in pages)
+    out, _, code = run_cmd(ssh, f"curl -s -w '%{{http_code}}\\n' --retry 10 --retry-connrefused --retry-delay 1 {'-o /dev/null ' * len(pages)}{urls}")
+    codes = out.splitlines()
     all_ok = True
-    for page in pages:
-        out, _, code = run_cmd(ssh, f"curl -s -o /dev/null -w '%{{http_code}}' http://localhost:3000{page}")
-        status = "✅" if out == "200" else "❌"
-        if out != "200":
+    for page, http_code in zip(pages, codes + ["000"] * (len(pages) - len(codes))):
+        status = "✅" if http_code == "200" else "❌"
+        if http_code != "200":
             all_ok = False
-        print(f"    {status} {page}: HTTP {out}")
+        print(f"    {status} {page}: HTTP {http_code}")
     
     ssh.close()
     
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Remote command lines the deploy scripts use to sync the website checkout, `docker build` its image and run it."""
+
+from __future__ import annotations
+
+import base64
+import os
+import shlex
+from typing import Optional, Sequence, Tuple
+
+from _docker_events import WEBSITE_CONTAINER, WEBSITE_IMAGE
+
+WEBSITE_DIR = "/opt/mycosoft/website"
+BASE_IMAGE = "mycosoft-website-base"
+# Built once and pushed by _build_and_push.py; VMs pull it instead of building (REBUILD_IMAGE overrides)
+REGISTRY_IMAGE = os.environ.get("REBUILD_IMAGE", "ghcr.io/mycosoftlabs/website:production-latest")
+# FROM images of the Dockerfile stages; worth pulling while the checkout syncs
+PREFETCH_IMAGES = ("node:22-alpine",)
+ASSETS_MOUNT = "/opt/mycosoft/media/website/assets:/app/public/assets:ro"
+# Image label holding the commit an image was built from (see build_command / up_to_date_command)
+REVISION_LABEL = "org.opencontainers.image.revision"
+
+# Backend URLs as seen from the VM; ${...} is expanded by the remote shell
+MAS_ENV = ("-e MAS_API_URL=http://${MAS_VM_HOST:-localhost}:8001",)
+SERVICE_ENV = MAS_ENV + (
+    "-e MINDEX_API_URL=http://${MINDEX_VM_HOST:-localhost}:8000",
+    "-e OLLAMA_BASE_URL=http://${MAS_VM_HOST:-localhost}:11434",
+    "-e N8N_URL=http://${MAS_VM_HOST:-localhost}:5678",
+)
+
+
+def run_command(*options: str, image: str = WEBSITE_IMAGE) -> str:
+    """`docker run -d` for the website container: name, :3000, NAS assets mount and restart policy
+    every deploy shares, plus options (-e ..., --env-file ...) in between."""
+    return " ".join([
+        "docker run -d",
+        f"--name {WEBSITE_CONTAINER}",
+        "-p 3000:3000",
+        f"-v {ASSETS_MOUNT}",
+        *(option for option in options if option),
+        "--restart unless-stopped",
+        image,
+    ])
+
+
+RUN_COMMAND = run_command()
+
+
+def sync_command(website_dir: str = WEBSITE_DIR, branch: str = "main", prefetch: Sequence[str] = ()) -> str:
+    """Fetch only branch's tip commit and hard-reset the checkout to it.
+    Unlike a plain `git fetch origin` this skips every other ref and all history, so the
+    server sends (and negotiates) just the objects the new tip needs.
+    prefetch images (e.g. PREFETCH_IMAGES) are `docker pull`ed in the background meanwhile; a
+    successful sync waits for them, so the build that follows starts with them local."""
+    sync = f"cd {website_dir} && git fetch --depth=1 origin {branch} && git reset --hard FETCH_HEAD"
+    if not prefetch:
+        return sync
+    pulls = "; ".join(f"docker pull -q {image}" for image in prefetch)
+    # Pull failures are ignored: the build pulls (and reports) whatever is still missing
+    return f"{{ {pulls}; }} >/dev/null 2>&1 & {sync} && wait"
+
+
+def pull_command(image: str = REGISTRY_IMAGE, target: str = WEBSITE_IMAGE) -> str:
+    """`docker pull` image and tag it as target, the name the run/cutover commands start.
+    Only layers that changed since the last pull are downloaded."""
+    return f"docker pull -q {image} && docker tag {image} {target}"
+
+
+def ensure_image_command(target: str = WEBSITE_IMAGE, image: str = REGISTRY_IMAGE) -> str:
+    """No-op when target is already local (the usual case right after a VM build); otherwise pull_command,
+    so `docker run target` never stalls on a missing image."""
+    return f"docker image inspect {target} >/dev/null 2>&1 || {{ {pull_command(image, target)}; }}"
+
+
+def up_to_date_command(
+    website_dir: str = WEBSITE_DIR, image: str = WEBSITE_IMAGE, container: str = WEBSITE_CONTAINER
+) -> str:
+    """Exits 0 only when image was built from website_dir's HEAD (its REVISION_LABEL) and a running
+    container whose name contains container (blue/green slots included) runs exactly that image,
+    i.e. building and cutting over again would change nothing."""
+    label = shlex.quote(f'{{{{index .Config.Labels "{REVISION_LABEL}"}}}}')
+    return (
+        f"cd {website_dir} && head=$(git rev-parse HEAD) && "
+        f'[ "$(docker image inspect -f {label} {image} 2>/dev/null)" = "$head" ] && '
+        f"id=$(docker image inspect -f '{{{{.Id}}}}' {image}) && "
+        f"docker ps -q --filter name={shlex.quote(container)} | xargs -r docker inspect -f '{{{{.Image}}}}' | "
+        f'grep -qx "$id"'
+    )
+
+
+def force_rebuild_requested() -> bool:
+    """True when FORCE_REBUILD=1 asks for a clean, uncached build."""
+    return os.environ.get("FORCE_REBUILD", "").strip() == "1"
+
+
+def rebuild_base_requested() -> bool:
+    """True when REBUILD_BASE=1 asks to rebuild the dependency base image as well."""
+    return os.environ.get("REBUILD_BASE", "").strip() == "1"
+
+
+def base_command(
+    website_dir: str = WEBSITE_DIR, rebuild_base: Optional[bool] = None, options: Sequence[str] = ()
+) -> str:
+    """Make sure the dependency base image (Dockerfile `deps` stage: node + npm ci) exists and
+    leave its tag in $base. The tag hashes package.json, package-lock.json and patches/, so it is
+    rebuilt exactly when dependencies change; rebuild_base (default REBUILD_BASE=1) forces a clean rebuild.
+    options (--network host, ...) are passed to its `docker build`: npm ci does most of the fetching."""
+    if rebuild_base is None:
+        rebuild_base = rebuild_base_requested()
+    # || true: a missing file (e.g. empty patches/) must not fail the hash under `set -o pipefail`
+    tag = f"{BASE_IMAGE}:$( (cat package.json package-lock.json patches/* 2>/dev/null || true) | sha256sum | cut -c1-12)"
+    no_cache = "--no-cache " if rebuild_base else ""
+    build = (
+        f"DOCKER_BUILDKIT=1 docker build --progress=plain {no_cache}"
+        f"{''.join(f'{option} ' for option in options)}--target deps -t $base ."
+    )
+    if rebuild_base:
+        return f"cd {website_dir} && base={tag} && {build}"
+    return f"cd {website_dir} && base={tag} && {{ docker image inspect $base >/dev/null 2>&1 || {build}; }}"
+
+
+def build_command(
+    website_dir: str = WEBSITE_DIR,
+    image: str = WEBSITE_IMAGE,
+    force_rebuild: Optional[bool] = None,
+    rebuild_base: Optional[bool] = None,
+    options: Sequence[str] = (),
+) -> str:
+    """BuildKit build of the app on top of the base image (see base_command), reusing unchanged layers
+    from the current image. force_rebuild (defaults to FORCE_REBUILD=1) passes --no-cache, which
+    redoes `npm run build` but still not `npm ci`: that lives in the base image.
+    options (--network host, --build-arg ...) are passed through to both the base and the app build.
+    The image is labelled (REVISION_LABEL) with the checkout's HEAD commit.
+    --progress=plain keeps step output line-oriented for streamed/logged builds."""
+    if force_rebuild is None:
+        force_rebuild = force_rebuild_requested()
+    if force_rebuild:
+        cache_args = "--no-cache"
+    else:
+        cache_args = f"--build-arg BUILDKIT_INLINE_CACHE=1 --cache-from {image}"
+    return (
+        f"{base_command(website_dir, rebuild_base, options)} && "
+        f"DOCKER_BUILDKIT=1 docker build --progress=plain {cache_args} "
+        f"{''.join(f'{option} ' for option in options)}--label {REVISION_LABEL}=$(git rev-parse HEAD) "
+        f"--build-arg BASE_IMAGE=$base -t {image} ."
+    )
+
+
+def supabase_build_args() -> Tuple[str, Tuple[str, ...]]:
+    """Supabase NEXT_PUBLIC_* values from the environment as (exports, build options) for build_command.
+    exports is an `export ... && ` prefix that decodes them on the VM (base64 avoids shell escaping);
+    the options pass them on as --build-arg. Both are empty when neither variable is set."""
+    exports = []
+    options = []
+    for name in ("NEXT_PUBLIC_SUPABASE_URL", "NEXT_PUBLIC_SUPABASE_ANON_KEY"):
+        value = os.getenv(name, "")
+        if value:
+            exports.append(f"{name}=$(echo {base64.b64encode(value.encode()).decode()} | base64 -d)")
+            options.append(f"--build-arg {name}=${name}")
+    return ("export " + " ".join(exports) + " && " if exports else ""), tuple(options)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Run the local `docker` CLI against a VM's daemon through a `docker context` (ssh://user@host).
+
+The docker CLI manages the SSH tunnel itself (OpenSSH, so ~/.ssh/config applies), which makes
+paramiko unnecessary for commands that are pure Docker API calls. For the Sandbox-via-MAS route,
+point the context at an ~/.ssh/config host with a ProxyJump:
+
+    Host sandbox
+        HostName 192.168.0.187
+        User mycosoft
+        ProxyJump mycosoft@192.168.0.188
+
+    python deploy.py restart --docker-context          # context for mycosoft@192.168.0.187
+    SANDBOX_VM_HOST=sandbox python deploy.py restart --docker-context
+"""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from typing import Tuple
+
+SANDBOX_CONTEXT = "mycosoft-sandbox"
+
+
+def available() -> bool:
+    """True when a docker CLI is on PATH."""
+    return shutil.which("docker") is not None
+
+
+def docker(context: str, *args: str, timeout: int = 60) -> Tuple[int, str, str]:
+    """Run `docker --context context args...`. Returns (exit_code, stdout, stderr) like _ssh_cli.run."""
+    try:
+        result = subprocess.run(
+            ["docker", f"--context={context}", *args],
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return -1, "", "Command timed out"
+    return result.returncode, result.stdout.strip(), result.stderr.strip()
+
+
+def ensure_context(host: str, user: str, name: str = SANDBOX_CONTEXT) -> str:
+    """Create the ssh:// context for user@host unless a context called name already exists; returns name.
+    An existing context is left as is, so one pointed at a ProxyJump alias is kept."""
+    inspect = subprocess.run(["docker", "context", "inspect", name], capture_output=True)
+    if inspect.returncode != 0:
+        subprocess.run(
+            ["docker", "context", "create", name, "--docker", f"host=ssh://{user}@{host}"],
+            capture_output=True,
+            check=True,
+        )
+    return name
+
+
+def http_status(url: str, attempts: int = 10, interval: float = 1.0) -> str:
+    """HTTP status code of url as a string (like `curl -w '%{http_code}'`), retrying refused connections."""
+    for attempt in range(attempts):
+        try:
+            with urllib.request.urlopen(url, timeout=10) as response:
+                return str(response.status)
+        except urllib.error.HTTPError as e:
+            return str(e.code)
+        except OSError:
+            if attempt < attempts - 1:
+                time.sleep(interval)
+    return "000"
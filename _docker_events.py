@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Shell snippets that block on `docker events` instead of sleeping/polling on the remote VM."""
+
+from __future__ import annotations
+
+import json
+import shlex
+from typing import List, Sequence, Tuple
+
+WEBSITE_CONTAINER = "mycosoft-website"
+WEBSITE_IMAGE = "mycosoft-always-on-mycosoft-website:latest"
+# Pages every post-deploy smoke test checks (probe_pages, _ssh_session.http_probe)
+SMOKE_PAGES = ("/", "/test-fluid-search", "/search?q=mushroom", "/api/search/unified?q=amanita&limit=3")
+
+
+def wait_for_event(filters: Sequence[str], since: str = '"$since"', timeout: int = 30, fmt: str = "{{.Time}}") -> str:
+    """Bash snippet printing the first `docker events` line matching filters (empty line on timeout).
+
+    `since` is a remote epoch (or shell expression) captured *before* the action, so events that
+    fired before the subscription started are replayed. The reader returns on the first line;
+    piping into `head -1` instead would block until a second event or the timeout. The stream is
+    then killed ($! of the process substitution is `timeout` itself, which passes the signal on to
+    `docker events`), so it does not linger on the VM for the rest of the timeout.
+    """
+    filter_args = " ".join(f"--filter {shlex.quote(f)}" for f in filters)
+    return (
+        f"{{ read -r line < <(exec timeout {timeout} docker events --since {since} {filter_args} "
+        f"--format {shlex.quote(fmt)} 2>/dev/null </dev/null); kill $! 2>/dev/null; echo \"$line\"; }}"
+    )
+
+
+def wait_for_container_start(since: str = '"$since"', timeout: int = 30, container: str = WEBSITE_CONTAINER) -> str:
+    """Bash snippet that returns as soon as container emits its `start` event."""
+    return wait_for_event([f"container={container}", "event=start"], since=since, timeout=timeout)
+
+
+def wait_for_exit(pattern: str = "[d]ocker build", timeout: int = 900) -> str:
+    """POSIX snippet blocking (tail --pid, no polling) until every process whose command line matches
+    pattern has exited or timeout seconds pass; prints how many are still running (0 = all done).
+    The [d] bracket keeps the pattern from matching the shell running this snippet."""
+    quoted = shlex.quote(pattern)
+    return (
+        f"end=$(($(date +%s) + {timeout})); "
+        f"for pid in $(pgrep -f {quoted}); do left=$((end - $(date +%s))); "
+        f'[ "$left" -gt 0 ] && timeout "$left" tail --pid="$pid" -f /dev/null; done; '
+        f"pgrep -cf {quoted} || true"
+    )
+
+
+def wait_for_healthy(container: str = WEBSITE_CONTAINER, attempts: int = 60, interval: float = 0.5) -> str:
+    """POSIX snippet polling the container's HEALTHCHECK status until it settles; prints the last status.
+
+    Health transitions aren't reliably replayed by `docker events --since`, so this polls
+    `docker inspect` instead (attempts x interval seconds at most). Stops early on healthy/unhealthy,
+    on `none` (image built without a HEALTHCHECK) and on an empty status (container gone).
+    """
+    fmt = "{{if .State.Health}}{{.State.Health.Status}}{{else}}none{{end}}"
+    return (
+        f"for _ in $(seq {attempts}); do "
+        f"s=$(docker inspect -f {shlex.quote(fmt)} {shlex.quote(container)} 2>/dev/null); "
+        f'case "$s" in healthy|unhealthy|none|"") break ;; esac; sleep {interval}; '
+        f'done; echo "$s"'
+    )
+
+
+def http_ok(code: str) -> bool:
+    """True for a 2xx/3xx status (a redirect means the app answered); 000, 4xx and a 502/503 from a
+    proxy whose upstream is still booting are failures."""
+    return len(code) == 3 and code[0] in "23" and code.isdigit()
+
+
+def wait_for_http(url: str, timeout: int = 30, interval: float = 0.5) -> str:
+    """POSIX snippet curling url every interval seconds until it answers 2xx/3xx (see http_ok) or timeout
+    seconds pass; prints the last HTTP code (000 when nothing answered). A 5xx from an upstream that is
+    still starting is retried, and the loop returns within interval of the site coming up."""
+    return (
+        f"end=$(($(date +%s) + {timeout})); while :; do "
+        f"c=$(curl -s -o /dev/null -w '%{{http_code}}' --connect-timeout 2 --max-time 5 {shlex.quote(url)}); "
+        f'case "$c" in 2??|3??) break ;; esac; [ "$(date +%s)" -ge "$end" ] && break; sleep {interval}; '
+        f'done; echo "${{c:-000}}"'
+    )
+
+
+def probe_pages(pages: Sequence[str] = SMOKE_PAGES, base: str = "http://localhost:3000") -> str:
+    """POSIX snippet curling base+page for every page in one exec, all pages at once (background jobs), so
+    the probe takes as long as the slowest page; prints one `{"page": ..., "code": ...}` JSON line per page in
+    pages order (see parse_probes)."""
+    jobs = []
+    for i, page in enumerate(pages):
+        # The page's half of the JSON line is encoded here, so the remote side only appends the code
+        prefix = shlex.quote('{"page": %s, "code": ' % json.dumps(page))
+        jobs.append(
+            f"{{ c=$(curl -s -o /dev/null -w '%{{http_code}}' --max-time 30 {shlex.quote(base + page)}); "
+            f"printf '%s\"%s\"}}\\n' {prefix} \"$c\" > \"$t/{i}\"; }} &"
+        )
+    order = " ".join(str(i) for i in range(len(pages)))
+    return f't=$(mktemp -d); {" ".join(jobs)} wait; for j in {order}; do cat "$t/$j" 2>/dev/null; done; rm -rf "$t"'
+
+
+def parse_probes(output: str) -> List[Tuple[str, str]]:
+    """(page, code) pairs from probe_pages output, in the order probed; a page with no answer is 000.
+    Lines that are not JSON objects (ssh noise, errors) are skipped, as in _docker_ps.parse_ps."""
+    probes = []
+    for line in output.splitlines():
+        if line.startswith("{"):
+            try:
+                probe = json.loads(line)
+            except ValueError:
+                continue
+            probes.append((probe["page"], probe.get("code") or "000"))
+    return probes
+
+
+def bash(script: str) -> str:
+    """Wrap a bash-only snippet for exec_command, whose login shell may not be bash."""
+    return f"bash -c {shlex.quote(script)}"
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""`docker ps` as JSON lines: structured container state instead of matching "Up" in free-form text."""
+
+from __future__ import annotations
+
+import json
+import shlex
+from typing import Any, Dict, List
+
+from _docker_events import WEBSITE_CONTAINER
+
+JSON_FORMAT = "{{json .}}"
+
+
+def ps_command(name: str = WEBSITE_CONTAINER, all: bool = False) -> str:
+    """`docker ps` line printing one JSON object per container whose name contains name."""
+    return f"docker ps{' -a' if all else ''} --filter name={shlex.quote(name)} --format {shlex.quote(JSON_FORMAT)}"
+
+
+def parse_ps(output: str) -> List[Dict[str, Any]]:
+    """Containers from ps_command output; lines that are not JSON objects (ssh noise, errors) are skipped."""
+    containers = []
+    for line in output.splitlines():
+        if line.startswith("{"):
+            try:
+                containers.append(json.loads(line))
+            except ValueError:
+                continue
+    return containers
+
+
+def find(containers: List[Dict[str, Any]], name: str = WEBSITE_CONTAINER) -> Dict[str, Any]:
+    """The container called exactly name ({} if absent); the name filter also matches -blue/-green/-proxy."""
+    return next((c for c in containers if c.get("Names") == name), {})
+
+
+def is_running(container: Dict[str, Any]) -> bool:
+    """Running per the State field; a restarting or exited container's Status can still mention Up/health."""
+    return container.get("State") == "running" and container.get("Status", "").startswith("Up")
+
+
+def describe(containers: List[Dict[str, Any]]) -> str:
+    """One `name: status` line per container, as the old --format '{{.Names}}: {{.Status}}' printed."""
+    return "\n".join(f"{c.get('Names', '?')}: {c.get('Status', '?')}" for c in containers)
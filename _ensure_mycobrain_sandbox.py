@@ -9,35 +9,25 @@ Usage: python _ensure_mycobrain_sandbox.py
 
 import io
 import os
-import paramiko
 import sys
 import time
 from pathlib import Path
 
+from _creds import load_credentials, vm_password
+from _ssh_session import get_client
+
 sys.stdout.reconfigure(encoding="utf-8", line_buffering=True)
 
 VM_HOST = os.environ.get("SANDBOX_VM_HOST", "192.168.0.187")
 VM_USER = os.environ.get("VM_SSH_USER", "mycosoft")
-VM_PASS = os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD")
 MAS_GIT = "https://github.com/Mycosoft/mycosoft-mas.git"
 MAS_ROOT = "/opt/mycosoft/mas/mycosoft-mas"
 # Fallback if /opt requires root; mycosoft can clone here without sudo
 MAS_ROOT_FALLBACK = "/home/mycosoft/mas/mycosoft-mas"
 
 
-def load_credentials():
-    creds_file = Path(__file__).parent / ".credentials.local"
-    if creds_file.exists():
-        for line in creds_file.read_text().splitlines():
-            if line and not line.startswith("#") and "=" in line:
-                key, value = line.split("=", 1)
-                os.environ[key.strip()] = value.strip()
-        return True
-    return False
-
-
 load_credentials()
-VM_PASS = os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD")
+VM_PASS = vm_password()
 
 if not VM_PASS:
     print("ERROR: VM_PASSWORD not found. Create .credentials.local with VM_SSH_PASSWORD=...")
@@ -74,9 +64,7 @@ WantedBy=multi-user.target
 
 def main():
     print(f"Connecting to {VM_HOST}...")
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    ssh.connect(VM_HOST, username=VM_USER, password=VM_PASS, timeout=30)
+    ssh = get_client(VM_HOST, VM_USER, VM_PASS, timeout=30)
 
     def run(cmd: str, timeout: int = 60) -> tuple[int, str, str]:
         stdin, stdout, stderr = ssh.exec_command(cmd, timeout=timeout)
@@ -100,12 +88,14 @@ def main():
 
     # 1. Ensure MAS repo exists
     print("\n1. Checking MAS repo...")
-    mas_root = None
-    for candidate in [MAS_ROOT, MAS_ROOT_FALLBACK, "/opt/mycosoft/mas", "/opt/mycosoft/mycosoft-mas", "/home/mycosoft/mycosoft-mas"]:
-        code, out, _ = run(f"test -f {candidate}/services/mycobrain/mycobrain_service_standalone.py && echo {candidate}", timeout=5)
-        if candidate in out:
-            mas_root = candidate
-            break
+    candidates = [MAS_ROOT, MAS_ROOT_FALLBACK, "/opt/mycosoft/mas", "/opt/mycosoft/mycosoft-mas", "/home/mycosoft/mycosoft-mas"]
+    # All candidates in one round-trip; the first with the service script wins
+    code, out, _ = run(
+        f"for c in {' '.join(candidates)}; do "
+        "[ -f $c/services/mycobrain/mycobrain_service_standalone.py ] && echo $c && break; done; true",
+        timeout=10,
+    )
+    mas_root = out.strip() if out.strip() in candidates else None
     if not mas_root:
         # Broader search
         code, out, _ = run("find /opt /home -name mycobrain_service_standalone.py -type f 2>/dev/null | head -1", timeout=10)
@@ -173,9 +163,9 @@ def main():
     unit_content = unit_content.replace("/usr/bin/python3", python_exe)
     if "PYTHONPATH=" not in unit_content:
         unit_content = unit_content.replace("Environment=MAS_REGISTRY_URL=", f"Environment=PYTHONPATH={mas_root}\nEnvironment=MAS_REGISTRY_URL=")
+    # One SFTP session for both uploads (unit now, watchdog in step 3); putfo pipelines its writes
     sftp = ssh.open_sftp()
     sftp.putfo(io.BytesIO(unit_content.encode("utf-8")), "/tmp/mycobrain-service.service")
-    sftp.close()
     code, out, err = run_sudo(
         "sudo mv /tmp/mycobrain-service.service /etc/systemd/system/ && "
         "sudo systemctl daemon-reload && "
@@ -197,21 +187,29 @@ HTTP=$(curl -s -o /dev/null -w '%{http_code}' --connect-timeout 5 http://127.0.0
 ACTIVE=$(systemctl is-active mycobrain-service 2>/dev/null || echo "unknown")
 [ "$HTTP" != "200" ] || [ "$ACTIVE" != "active" ] && systemctl restart mycobrain-service 2>/dev/null || true
 """
-    sftp = ssh.open_sftp()
     sftp.putfo(io.BytesIO(watchdog_content.encode("utf-8")), "/tmp/mycobrain-watchdog.sh")
     sftp.close()
-    run_sudo("sudo mkdir -p /opt/mycosoft/scripts && sudo mv /tmp/mycobrain-watchdog.sh /opt/mycosoft/scripts/ && sudo chmod +x /opt/mycosoft/scripts/mycobrain-watchdog.sh", timeout=10)
-    run_sudo("""(sudo crontab -l 2>/dev/null | grep -v mycobrain-watchdog; echo '*/1 * * * * /opt/mycosoft/scripts/mycobrain-watchdog.sh') | sudo crontab -""", timeout=10)
+    # Install and schedule in one round-trip (and at most one sudo password prompt)
+    run_sudo(
+        "sudo mkdir -p /opt/mycosoft/scripts && sudo mv /tmp/mycobrain-watchdog.sh /opt/mycosoft/scripts/ && "
+        "sudo chmod +x /opt/mycosoft/scripts/mycobrain-watchdog.sh && "
+        "(sudo crontab -l 2>/dev/null | grep -v mycobrain-watchdog; echo '*/1 * * * * /opt/mycosoft/scripts/mycobrain-watchdog.sh') | sudo crontab -",
+        timeout=15,
+    )
     print("   Watchdog installed.")
 
     # 4. Verify health (retry up to 30s - service may need time to start)
     print("\n4. Verifying MycoBrain health...")
     http_code, status = "000", "unknown"
     for attempt in range(6):
-        code, out, _ = run("curl -s -o /dev/null -w '%{http_code}' --connect-timeout 2 --max-time 3 http://127.0.0.1:8003/health 2>/dev/null || echo 000", timeout=5)
-        http_code = out.strip() or "000"
-        code2, status_out, _ = run("systemctl is-active mycobrain-service 2>/dev/null || echo unknown", timeout=3)
-        status = status_out.strip()
+        # Both probes in one round-trip: "<http code> <systemd state>"
+        _, out, _ = run(
+            "echo \"$(curl -s -o /dev/null -w '%{http_code}' --connect-timeout 2 --max-time 3 http://127.0.0.1:8003/health 2>/dev/null || echo 000)"
+            " $(systemctl is-active mycobrain-service 2>/dev/null || echo unknown)\"",
+            timeout=8,
+        )
+        http_code, _, status = out.strip().partition(" ")
+        http_code, status = http_code or "000", status or "unknown"
         if http_code == "200" and "active" in status:
             break
         if attempt < 5:
@@ -5,18 +5,14 @@ import os
 import sys
 from pathlib import Path
 
-# Same credential and env loading as _rebuild_sandbox
-def load_credentials():
-    for fname in (".credentials.local", ".env.local"):
-        creds_file = Path(__file__).parent / fname
-        if creds_file.exists():
-            for line in creds_file.read_text().splitlines():
-                if line and not line.startswith("#") and "=" in line:
-                    key, value = line.split("=", 1)
-                    os.environ[key.strip()] = value.strip().strip('"\'')
-load_credentials()
-
-import paramiko
+from _creds import CREDENTIALS_FILE, ENV_FILE, load_credentials
+
+load_credentials((CREDENTIALS_FILE, ENV_FILE))
+
+from _docker_build import SERVICE_ENV, run_command
+from _docker_events import http_ok, wait_for_healthy, wait_for_http
+from _ssh_session import get_client, sftp_tail
+from _ssh_session import run as run_on
 
 VM_HOST = os.environ.get("SANDBOX_VM_HOST", "192.168.0.187")
 VM_USER = os.environ.get("SANDBOX_VM_USER", os.environ.get("VM_SSH_USER", "mycosoft"))
@@ -30,30 +26,28 @@ if not VM_PASS:
 
 
 def main():
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    ssh.connect(VM_HOST, username=VM_USER, password=VM_PASS, timeout=60)
+    ssh = get_client(VM_HOST, VM_USER, VM_PASS, timeout=60)
 
     def run(cmd, timeout=90):
-        stdin, stdout, stderr = ssh.exec_command(cmd, timeout=timeout)
-        code = stdout.channel.recv_exit_status()
-        out = stdout.read().decode().strip()
-        err = stderr.read().decode().strip()
-        return code, out, err
-
-    # 1) Check build exit
-    code, out, _ = run("test -f /tmp/rebuild_build.exit && cat /tmp/rebuild_build.exit", timeout=10)
-    if code != 0 or not (out or "").strip().isdigit():
-        _, log, _ = run("tail -80 /tmp/rebuild_build.log 2>/dev/null || echo '(no log)'", timeout=10)
+        code, out, err = run_on(ssh, cmd, timeout=timeout)
+        return code, out.strip(), err.strip()
+
+    # 1) Check build exit; exit file and log tail are plain reads on one SFTP session
+    sftp = ssh.open_sftp()
+    try:
+        out = (sftp_tail(sftp, "/tmp/rebuild_build.exit", lines=1) or "").strip()
+        log = sftp_tail(sftp, "/tmp/rebuild_build.log", lines=80) if out != "0" else None
+    finally:
+        sftp.close()
+    if not out.isdigit():
         print("Build exit file missing or invalid. Last 80 lines of build log:")
-        print(log)
+        print(log if log is not None else "(no log)")
         print("\nRun full deploy: python _rebuild_sandbox.py (allow 90+ min for build)")
         return 1
-    build_exit = int((out or "").strip())
+    build_exit = int(out)
     if build_exit != 0:
-        _, log, _ = run("tail -80 /tmp/rebuild_build.log 2>/dev/null", timeout=10)
         print(f"Build failed (exit {build_exit}). Last 80 lines:")
-        print(log)
+        print(log or "")
         return 1
 
     print("VM build succeeded. Running container restart + purge...")
@@ -73,42 +67,35 @@ def main():
     mycobrain_url = "http://host.docker.internal:8003"
     supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL", "")
     supabase_key = os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY", "")
-    supabase_env = ""
-    if supabase_url:
-        supabase_env += f' -e NEXT_PUBLIC_SUPABASE_URL="{supabase_url}"'
-    if supabase_key:
-        supabase_env += f' -e NEXT_PUBLIC_SUPABASE_ANON_KEY="{supabase_key}"'
     ec, _, _ = run(f"test -f {WEBSITE_DIR}/.env && echo ok", timeout=5)
-    env_file_opt = f" --env-file {WEBSITE_DIR}/.env" if (ec == 0) else ""
-    start_cmd = f"""docker run -d --name mycosoft-website -p 3000:3000 \
-        --add-host=host.docker.internal:host-gateway \
-        -v /opt/mycosoft/media/website/assets:/app/public/assets:ro \
-        {env_file_opt} \
-        -e NEXT_PUBLIC_BASE_URL={base_url} \
-        -e NEXTAUTH_URL={base_url} \
-        -e NEXT_PUBLIC_SITE_URL={base_url} \
-        -e MAS_API_URL=http://${MAS_VM_HOST:-localhost}:8001 \
-        -e MINDEX_API_URL=http://${MINDEX_VM_HOST:-localhost}:8000 \
-        -e OLLAMA_BASE_URL=http://${MAS_VM_HOST:-localhost}:11434 \
-        -e N8N_URL=http://${MAS_VM_HOST:-localhost}:5678 \
-        -e MYCOBRAIN_SERVICE_URL={mycobrain_url} \
-        -e MYCOBRAIN_API_URL={mycobrain_url}{supabase_env} \
-        --restart unless-stopped {IMAGE_TAG}"""
+    start_cmd = run_command(
+        "--add-host=host.docker.internal:host-gateway",
+        f"--env-file {WEBSITE_DIR}/.env" if ec == 0 else "",
+        f"-e NEXT_PUBLIC_BASE_URL={base_url}",
+        f"-e NEXTAUTH_URL={base_url}",
+        f"-e NEXT_PUBLIC_SITE_URL={base_url}",
+        *SERVICE_ENV,
+        f"-e MYCOBRAIN_SERVICE_URL={mycobrain_url}",
+        f"-e MYCOBRAIN_API_URL={mycobrain_url}",
+        f'-e NEXT_PUBLIC_SUPABASE_URL="{supabase_url}"' if supabase_url else "",
+        f'-e NEXT_PUBLIC_SUPABASE_ANON_KEY="{supabase_key}"' if supabase_key else "",
+        image=IMAGE_TAG,
+    )
     code, out, err = run(start_cmd, timeout=60)
     if code != 0:
         print("Container start failed:", err or out)
         return 1
     print("Container started:", (out or "")[:12])
 
-    # 5) Wait and test
-    import time
-    time.sleep(10)
+    # 5) Wait for the HEALTHCHECK and test
+    _, health, _ = run(wait_for_healthy(), timeout=60)
+    print("Health:", health)
     _, status, _ = run("docker ps --filter name=mycosoft-website --format '{{.Status}}'", timeout=30)
     print("Status:", status)
-    _, http_code, _ = run("curl -s -o /dev/null -w '%{http_code}' http://localhost:3000", timeout=30)
+    _, http_code, _ = run(wait_for_http("http://localhost:3000", timeout=30), timeout=60)
     print("HTTP:", http_code)
-    if http_code != "200":
-        print("Site not 200; check container logs.")
+    if not http_ok(http_code):
+        print("Site not answering 2xx/3xx; check container logs.")
     # MycoBrain ensure (same as rebuild)
     ensure_script = Path(__file__).resolve().parent / "_ensure_mycobrain_sandbox.py"
     if ensure_script.exists():
@@ -2,14 +2,11 @@
 """One-off: Install python3.12-venv and create MycoBrain venv on Sandbox."""
 import os
 import paramiko
-from pathlib import Path
 
-creds = Path(__file__).parent / ".credentials.local"
-if creds.exists():
-    for line in creds.read_text().splitlines():
-        if "=" in line and not line.startswith("#"):
-            k, v = line.split("=", 1)
-            os.environ[k.strip()] = v.strip()
+from _creds import load_credentials
+from _ssh_session import auth_kwargs, tune_transport
+
+load_credentials()
 
 p = os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD")
 if not p:
@@ -17,7 +14,8 @@ if not p:
 
 ssh = paramiko.SSHClient()
 ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-ssh.connect("192.168.0.187", username="mycosoft", password=p, timeout=30)
+ssh.connect("192.168.0.187", username="mycosoft", timeout=30, **auth_kwargs(p))
+tune_transport(ssh)
 esc = p.replace("'", "'\"'\"'").replace("\\", "\\\\").replace("\n", " ").replace("\r", "")
 
 def safe_print(s):
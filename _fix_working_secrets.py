@@ -3,13 +3,15 @@ Replace hardcoded secrets in all working-tree Python/PS files.
 Replaces literal values with os.environ.get() calls or env var references.
 Safe to run multiple times (idempotent).
 """
+import heapq
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 ROOT = Path(__file__).parent
 
-REPLACEMENTS = [
+_RAW = [
     # DB password
     (r"""password\s*=\s*['"]REDACTED_DB_PASSWORD['"]""",
      "password=os.environ.get('MINDEX_DB_PASSWORD', '')"),
@@ -17,7 +19,7 @@ REPLACEMENTS = [
      "DB_PASSWORD = os.environ.get('MINDEX_DB_PASSWORD', '')"),
     (r""""password":\s*['"]REDACTED_DB_PASSWORD['"]""",
      '"password": os.environ.get("MINDEX_DB_PASSWORD", "")'),
-    (r"""PGPASSWORD='$MINDEX_DB_PASSWORD'""",
+    (re.escape("PGPASSWORD='$MINDEX_DB_PASSWORD'"),
      "PGPASSWORD='$MINDEX_DB_PASSWORD'"),
 
     # SSH / VM password - paramiko connect calls
@@ -28,7 +30,7 @@ REPLACEMENTS = [
     (r"""VM_PASSWORD\s*=\s*['"]REDACTED_VM_SSH_PASSWORD['"]""",
      "VM_PASSWORD = os.environ.get('VM_PASSWORD', '')"),
     # PowerShell env assignments (literal string match)
-    (r"""env:VM_PASSWORD = "REDACTED_VM_SSH_PASSWORD" """,
+    (re.escape('env:VM_PASSWORD = "REDACTED_VM_SSH_PASSWORD" '),
      'env:VM_PASSWORD = $env:VM_PASSWORD '),
 
     # NCBI key
@@ -40,40 +42,99 @@ REPLACEMENTS = [
     # NGC key
     (r"""NGC_API_KEY\s*=\s*['"]nvapi-[A-Za-z0-9_\-]+['"]""",
      "NGC_API_KEY = os.environ.get('NGC_API_KEY', '')"),
-    (r"""***REDACTED_NGC_API_KEY***""",
+    (re.escape("***REDACTED_NGC_API_KEY***"),
      "***REDACTED_NGC_API_KEY***"),
 ]
+# All patterns fused into one alternation (compiled once at import; literal entries above are
+# re.escape()d), so each file is scanned once whatever the number of patterns. At any position the
+# first listed pattern that matches wins. Replacements are plain strings (no backreferences).
+FUSED = re.compile("|".join(f"(?P<g{i}>{pattern})" for i, (pattern, _) in enumerate(_RAW)))
+REPL = [replacement for _, replacement in _RAW]
+# Every pattern above contains one of these fixed tokens; keep the two lists in sync
+NEEDLES = (
+    b"REDACTED_DB_PASSWORD",
+    b"$MINDEX_DB_PASSWORD",
+    b"REDACTED_VM_SSH_PASSWORD",
+    b"REDACTED_NCBI_KEY",
+    b"nvapi-",
+    b"REDACTED_NGC_API_KEY",
+)
 
-extensions = {'.py', '.ps1', '.sh', '.md', '.txt', '.env', '.example'}
-skip_dirs = {'.git', '__pycache__', 'node_modules', '.venv', 'venv', 'venv311', '.mypy_cache'}
 
-fixed_files = []
-fixed_count = 0
+def _dispatch(match: re.Match) -> str:
+    return REPL[int(match.lastgroup[1:])]
 
-for path in ROOT.rglob('*'):
-    if any(p in path.parts for p in skip_dirs):
-        continue
-    if path.suffix.lower() not in extensions and path.name not in {'.env', '.env.example', '.env.local'}:
-        continue
-    if not path.is_file():
-        continue
+
+EXTENSIONS = frozenset({'.py', '.ps1', '.sh', '.md', '.txt', '.env', '.example'})
+SKIP_DIRS = frozenset({'.git', '__pycache__', 'node_modules', '.venv', 'venv', 'venv311', '.mypy_cache'})
+ENV_NAMES = frozenset({'.env', '.env.example', '.env.local'})
+
+
+def walk(root):
+    """Yield candidate files' DirEntry objects. SKIP_DIRS are pruned before descending, and the
+    type checks use the stat data scandir already has."""
     try:
-        text = path.read_text(encoding='utf-8', errors='ignore')
-    except Exception:
-        continue
+        with os.scandir(root) as entries:
+            for entry in entries:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in SKIP_DIRS:
+                        yield from walk(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    _, dot, suffix = name.rpartition('.')
+                    if (dot and '.' + suffix.lower() in EXTENSIONS) or name in ENV_NAMES:
+                        yield entry
+    except PermissionError:
+        pass
 
-    new_text = text
-    for pattern, replacement in REPLACEMENTS:
-        new_text = re.sub(pattern, replacement, new_text)
 
-    if new_text != text:
-        path.write_text(new_text, encoding='utf-8')
-        count = sum(1 for p, _ in REPLACEMENTS if re.search(p, text))
-        fixed_files.append(str(path.relative_to(ROOT)))
-        fixed_count += count
+def process_one(entry):
+    """Read, prescan, rewrite one file; returns (relative path, replacement count, error), count 0 if
+    unchanged. The file is opened for writing only once a rewrite is needed, so a read-only file without
+    secrets is fine; error is set when the file could not be read, or has secrets but could not be rewritten."""
+    name = str(Path(entry.path).relative_to(ROOT))
+    try:
+        with open(entry.path, 'rb') as f:
+            raw = f.read()
+    except OSError as e:
+        return name, 0, f"could not read: {e.strerror}"
+    # Cheap C-level substring prescan: most files contain no marker and never reach the regex
+    if not any(needle in raw for needle in NEEDLES):
+        return name, 0, None
+    text = raw.decode('utf-8', errors='ignore')
+
+    # subn substitutes and counts in one pass, so no second search over the original text
+    new_text, count = FUSED.subn(_dispatch, text)
+    if new_text == text:
+        return name, 0, None
+    try:
+        with open(entry.path, 'wb') as f:
+            f.write(new_text.encode('utf-8'))
+    except OSError as e:
+        return name, 0, f"{count} secret(s) NOT replaced, could not write: {e.strerror}"
+    return name, count, None
+
+
+# this script's own pattern literals would otherwise be rewritten
+candidates = [entry for entry in walk(ROOT) if entry.name != Path(__file__).name]
+
+# Files are independent; threads overlap the reads/writes (the regex itself still holds the GIL)
+with ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2) as pool:
+    results = list(pool.map(process_one, candidates))
+
+fixed = [(name, count) for name, count, _ in results if count]
+failed = [(name, error) for name, _, error in results if error]
+fixed_files = [name for name, _ in fixed]
+fixed_count = sum(count for _, count in fixed)
 
 print(f"Fixed {len(fixed_files)} files ({fixed_count} replacements):")
-for f in sorted(fixed_files)[:50]:
+for f in heapq.nsmallest(50, fixed_files):  # first 50 in order without sorting them all
     print(f"  {f}")
 if len(fixed_files) > 50:
     print(f"  ... and {len(fixed_files) - 50} more")
+
+if failed:
+    print(f"\nCould not process {len(failed)} files:")
+    for name, error in sorted(failed):
+        print(f"  {name}: {error}")
+    raise SystemExit(1)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""One-time setup: create ~/.ssh/id_ed25519 (if missing) and authorize it on the Sandbox and MAS VMs.
+
+Afterwards every script authenticates with the key (one round-trip after kex) instead of a password.
+Uses VM_PASSWORD/VM_SSH_PASSWORD from .credentials.local for this last password login.
+
+    python _install_ssh_key.py            # Sandbox (187) and MAS (188)
+    python _install_ssh_key.py 192.168.0.189
+"""
+import os
+import shlex
+import subprocess
+import sys
+
+import paramiko
+
+from _creds import load_credentials
+from _ssh_session import default_key_path, run, tune_transport
+
+load_credentials()
+VM_USER = os.environ.get("VM_SSH_USER") or os.environ.get("SANDBOX_VM_USER", "mycosoft")
+VM_PASS = os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD")
+HOSTS = sys.argv[1:] or [
+    os.environ.get("SANDBOX_VM_HOST", "192.168.0.187"),
+    os.environ.get("MAS_VM_HOST", "192.168.0.188"),
+]
+
+
+def main() -> int:
+    key_path = default_key_path()
+    pub_path = key_path.with_name(key_path.name + ".pub")
+    if not key_path.exists():
+        key_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        print(f"Generating {key_path}")
+        subprocess.run(["ssh-keygen", "-t", "ed25519", "-N", "", "-C", "mycosoft-deploy", "-f", str(key_path)], check=True)
+    pubkey = pub_path.read_text().strip()
+    if not VM_PASS:
+        print("No VM_PASSWORD in .credentials.local - needed once to install the key")
+        return 1
+
+    # Idempotent ssh-copy-id: append only if the exact key line is not there yet
+    install = (
+        "umask 077; mkdir -p ~/.ssh && touch ~/.ssh/authorized_keys && "
+        f"(grep -qxF {shlex.quote(pubkey)} ~/.ssh/authorized_keys || echo {shlex.quote(pubkey)} >> ~/.ssh/authorized_keys)"
+    )
+    failed = 0
+    for host in HOSTS:
+        ssh = paramiko.SSHClient()
+        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            ssh.connect(host, username=VM_USER, password=VM_PASS, timeout=10,
+                        look_for_keys=False, allow_agent=False)
+            rc, _, err = run(tune_transport(ssh), install, timeout=30)
+        except Exception as e:
+            rc, err = -1, str(e)
+        finally:
+            ssh.close()
+        print(f"{host}: {'key installed' if rc == 0 else 'FAILED ' + err.strip()}")
+        failed += rc != 0
+    if not failed:
+        print(f"Done. Scripts now use {key_path}; VM_SSH_PASSWORD can be removed from .credentials.local")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
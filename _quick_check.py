@@ -1,38 +1,37 @@
 #!/usr/bin/env python3
 """Quick check of Sandbox VM status"""
-import paramiko
+import os
 import sys
 
+from _ssh_session import connect, run_sections
+
 sys.stdout.reconfigure(encoding='utf-8')
 
 # Try direct connection first
 host = '192.168.0.187'
 user = 'mycosoft'
-password = 'REDACTED_VM_SSH_PASSWORD'
+mas_host = os.environ.get('MAS_VM_HOST', '192.168.0.188')
+
+# (title, command) pairs, run in one remote shell per connection
+IMAGES = ("Docker Images", 'docker images mycosoft-always-on-mycosoft-website --format "{{.Repository}}:{{.Tag}} Created: {{.CreatedSince}}"')
+CONTAINERS = ("Container Status", 'docker ps -a --filter name=mycosoft-website --format "{{.Names}} {{.Status}}"')
+GIT_COMMIT = ("Current Git Commit", 'cd /opt/mycosoft/website && git log -1 --oneline')
+
+
+def report(client, checks):
+    """Run every check in one round-trip, then print each output under its title."""
+    outputs = run_sections(client, [cmd for _, cmd in checks], timeout=60)
+    for (title, _), output in zip(checks, outputs):
+        print(f"\n--- {title} ---")
+        print(output)
+
 
 print(f"Connecting directly to {host}...")
 
 try:
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    ssh.connect(host, username=user, password=password, timeout=10)
+    ssh = connect(host, user)  # retries refusals while sshd is still coming up
     print("Connected directly!")
-    
-    # Check image creation time
-    print("\n--- Docker Images ---")
-    stdin, stdout, stderr = ssh.exec_command('docker images mycosoft-always-on-mycosoft-website --format "{{.Repository}}:{{.Tag}} Created: {{.CreatedSince}}"', timeout=30)
-    print(stdout.read().decode())
-    
-    # Check container status
-    print("\n--- Container Status ---")
-    stdin, stdout, stderr = ssh.exec_command('docker ps -a --filter name=mycosoft-website --format "{{.Names}} {{.Status}}"', timeout=30)
-    print(stdout.read().decode())
-    
-    # Check git commit
-    print("\n--- Current Git Commit ---")
-    stdin, stdout, stderr = ssh.exec_command('cd /opt/mycosoft/website && git log -1 --oneline', timeout=30)
-    print(stdout.read().decode())
-    
+    report(ssh, [IMAGES, CONTAINERS, GIT_COMMIT])
     ssh.close()
     
 except Exception as e:
@@ -40,29 +39,13 @@ except Exception as e:
     print("\nTrying via MAS jump host...")
     
     try:
-        mas_ssh = paramiko.SSHClient()
-        mas_ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        mas_ssh.connect('${MAS_VM_HOST}', username=user, password=password, timeout=10)
+        mas_ssh = connect(mas_host, user)
         print("Connected to MAS")
         
-        # Create channel to sandbox
-        transport = mas_ssh.get_transport()
-        channel = transport.open_channel("direct-tcpip", (host, 22), ('${MAS_VM_HOST}', 22))
-        
-        sandbox_ssh = paramiko.SSHClient()
-        sandbox_ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        sandbox_ssh.connect(host, username=user, password=password, sock=channel, timeout=10)
+        # Tunnel to sandbox over a direct-tcpip channel on the MAS connection
+        sandbox_ssh = connect(host, user, jump=mas_ssh)
         print("Connected to Sandbox via MAS")
-        
-        # Check container status
-        print("\n--- Container Status ---")
-        stdin, stdout, stderr = sandbox_ssh.exec_command('docker ps -a --filter name=mycosoft-website --format "{{.Names}} {{.Status}}"', timeout=30)
-        print(stdout.read().decode())
-        
-        # Check git commit
-        print("\n--- Current Git Commit ---")
-        stdin, stdout, stderr = sandbox_ssh.exec_command('cd /opt/mycosoft/website && git log -1 --oneline', timeout=30)
-        print(stdout.read().decode())
+        report(sandbox_ssh, [CONTAINERS, GIT_COMMIT])
         
         sandbox_ssh.close()
         mas_ssh.close()
@@ -12,129 +12,54 @@ import os
 import paramiko
 import sys
 import time
+from collections import deque
 from pathlib import Path
+from typing import Optional
 from _cloudflare_cache import purge_everything
+from _creds import CREDENTIALS_FILE, ENV_FILE, load_credentials, vm_password
+from _docker_build import (
+    REGISTRY_IMAGE, build_command, force_rebuild_requested, supabase_build_args, sync_command, up_to_date_command,
+)
+from _docker_events import http_ok, wait_for_http
+from _ssh_session import get_client, read_streams, run_steps, stream_exec
 
 # Ensure output flushes promptly during long SSH/build steps
 sys.stdout.reconfigure(encoding="utf-8", line_buffering=True)
 
-# Load credentials from .credentials.local file (gitignored)
-def load_credentials():
-    """Load from .credentials.local and .env.local - NEVER ASK USER FOR PASSWORD"""
-    for fname in (".credentials.local", ".env.local"):
-        creds_file = Path(__file__).parent / fname
-        if creds_file.exists():
-            for line in creds_file.read_text(encoding="utf-8", errors="replace").splitlines():
-                if line and not line.startswith("#") and "=" in line:
-                    key, value = line.split("=", 1)
-                    os.environ.setdefault(key.strip(), value.strip().strip('"\''))
-    return True
-
-# Try to load from file first
-load_credentials()
-
-
-def _build_supabase_args():
-    """Build env exports and --build-arg for Supabase (base64 avoids shell escaping).
-    Returns (exports_cmd, docker_build_args) where exports_cmd is run before docker build,
-    and docker_build_args are passed to docker build.
-    """
-    exports = []
-    args = []
-    url = os.getenv("NEXT_PUBLIC_SUPABASE_URL", "")
-    key = os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY", "")
-    if url:
-        b64 = base64.b64encode(url.encode()).decode()
-        exports.append(f"NEXT_PUBLIC_SUPABASE_URL=$(echo {b64} | base64 -d)")
-        args.append("--build-arg NEXT_PUBLIC_SUPABASE_URL=$NEXT_PUBLIC_SUPABASE_URL")
-    if key:
-        b64 = base64.b64encode(key.encode()).decode()
-        exports.append(f"NEXT_PUBLIC_SUPABASE_ANON_KEY=$(echo {b64} | base64 -d)")
-        args.append("--build-arg NEXT_PUBLIC_SUPABASE_ANON_KEY=$NEXT_PUBLIC_SUPABASE_ANON_KEY")
-    if not exports:
-        return "", ""
-    exports_cmd = "export " + " ".join(exports) + " && "
-    docker_args = " ".join(args) + " "
-    return exports_cmd, docker_args
-
-
-# Load credentials from environment variables
+# Credentials from .credentials.local/.env.local (gitignored) - NEVER ASK USER FOR PASSWORD.
+# Variables already set in the environment win.
+load_credentials((CREDENTIALS_FILE, ENV_FILE), override=False)
+
+
+# Key/agent auth; VM_PASSWORD / VM_SSH_PASSWORD are only an optional fallback
 VM_HOST = os.environ.get("SANDBOX_VM_HOST", "192.168.0.187")
 VM_USER = os.environ.get("SANDBOX_VM_USER", os.environ.get("VM_SSH_USER", "mycosoft"))
-VM_PASS = os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD")
+VM_PASS = vm_password()
 WEBSITE_DIR = "/opt/mycosoft/website"
 
-if not VM_PASS:
-    print("ERROR: VM_PASSWORD not found.")
-    print("Create .credentials.local with: VM_SSH_PASSWORD=your-password")
-    print("Or set env var: $env:VM_PASSWORD = 'your-password'")
-    sys.exit(1)
-
-
-def main():
-    parser = argparse.ArgumentParser(description="Rebuild and deploy website to Sandbox VM (187)")
-    parser.add_argument("--production", action="store_true", help="Deploy with mycosoft.com URLs (production)")
-    parser.add_argument(
-        "--branch",
-        default=os.environ.get("REBUILD_GIT_REF", "main"),
-        help="Git ref on origin to deploy (default: main or REBUILD_GIT_REF env)",
-    )
-    parser.add_argument(
-        "--require-gcs-verified",
-        action="store_true",
-        help="Abort if branch looks like Psathyrella GCS and GCS_VERIFIED is not set",
-    )
-    parser.add_argument(
-        "--skip-build",
-        action="store_true",
-        help="Skip Dockerfile fix and docker build; use existing image on VM (start container only)",
-    )
-    parser.add_argument(
-        "--local-build",
-        action="store_true",
-        help="Build on Sandbox only when no verified GHCR image is available",
-    )
-    parser.add_argument(
-        "--image",
-        default=os.environ.get("REBUILD_IMAGE", "ghcr.io/mycosoftlabs/website:production-latest"),
-        help="Verified registry image to pull and deploy (default: GHCR production-latest)",
-    )
-    parser.add_argument(
-        "--diagnose",
-        action="store_true",
-        help="Report Sandbox build capacity and stalled-build evidence without deploying",
-    )
-    args = parser.parse_args()
-
-    branch_slug = args.branch.replace("origin/", "").lower()
-    if args.require_gcs_verified or "psathyrella" in branch_slug or branch_slug == "feat/psathyrella-gcs":
-        gcs_ok = os.environ.get("GCS_VERIFIED", "").strip().lower() in ("1", "true", "yes", "verified")
-        morgan_ok = os.environ.get("MORGAN_APPROVE_GCS_DEPLOY", "").strip().lower() in ("1", "true", "yes")
-        if not gcs_ok and not morgan_ok:
-            print(
-                "ERROR: Psathyrella GCS deploy blocked. Set GCS_VERIFIED=1 after Claude 3010 smoke, "
-                "or MORGAN_APPROVE_GCS_DEPLOY=1. Use scripts/group_release_deploy.py --phase core for Earth Sim/NLM only."
-            )
-            sys.exit(2)
 
-    base_url = "https://mycosoft.com" if args.production else "https://sandbox.mycosoft.com"
-    site_label = "mycosoft.com" if args.production else "sandbox.mycosoft.com"
+def rebuild(
+    host: str = VM_HOST,
+    user: str = VM_USER,
+    password: Optional[str] = VM_PASS,
+    website_dir: str = WEBSITE_DIR,
+    branch: str = "main",
+    production: bool = False,
+    skip_build: bool = False,
+    local_build: bool = False,
+    image: str = REGISTRY_IMAGE,
+    diagnose: bool = False,
+    force_no_cache: bool = False,
+    with_mycobrain: bool = True,
+) -> None:
+    """Sync website_dir on host to origin/branch, get an image (GHCR pull, local build or the existing
+    one), cut over blue/green and verify the public site; raises RuntimeError on any failed step.
+    The options mirror main()'s flags. The env sync and MycoBrain helpers target SANDBOX_VM_HOST."""
+    base_url = "https://mycosoft.com" if production else "https://sandbox.mycosoft.com"
+    site_label = "mycosoft.com" if production else "sandbox.mycosoft.com"
     def _connect_ssh() -> paramiko.SSHClient:
-        print(f"Connecting to {VM_HOST}...")
-        client = paramiko.SSHClient()
-        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        client.connect(
-            VM_HOST,
-            username=VM_USER,
-            password=VM_PASS,
-            look_for_keys=False,
-            allow_agent=False,
-            timeout=60,
-        )
-        transport = client.get_transport()
-        if transport:
-            transport.set_keepalive(30)
-        return client
+        print(f"Connecting to {host}...")
+        return get_client(host, user, password, timeout=60)
 
     ssh = _connect_ssh()
     # This is an absolute safety cap only. The no-progress watchdog below terminates a
@@ -156,10 +81,24 @@ def main():
                 pass
             ssh = _connect_ssh()
             stdin, stdout, stderr = ssh.exec_command(cmd, timeout=timeout)
-        exit_code = stdout.channel.recv_exit_status()
-        out = stdout.read().decode(errors="replace").strip()
-        err = stderr.read().decode(errors="replace").strip()
-        return exit_code, out, err
+        out, err = read_streams(stdout.channel)  # both pipes at once: a full stderr can't stall the command
+        return stdout.channel.recv_exit_status(), out.strip(), err.strip()
+
+    def _stream(cmd: str, timeout: int = 90) -> int:
+        """Run a remote command, printing its output (stderr merged) as it arrives; returns the exit code.
+        Nothing is buffered, and timeout only trips when the command goes silent for that long."""
+        nonlocal ssh
+        echo = lambda line: print(f"   {line}")
+        try:
+            code, _ = stream_exec(ssh, cmd, timeout, echo, keep_output=False)
+        except paramiko.SSHException:
+            try:
+                ssh.close()
+            except Exception:
+                pass
+            ssh = _connect_ssh()
+            code, _ = stream_exec(ssh, cmd, timeout, echo, keep_output=False)
+        return code
 
     def _start_background_build(cmd: str) -> str:
         """Start build in background on VM; return PID. Avoids holding SSH channel for 40+ min."""
@@ -170,81 +109,117 @@ def main():
         # Clear previous run; script runs in subshell, writes log and exit code
         script_content = f"({cmd}) > {log} 2>&1; echo $? > {exit_file}"
         b64 = base64.b64encode(script_content.encode()).decode()
-        _run(f"rm -f {log} {exit_file} {pid_file} {script_file}", timeout=5)
-        # Write script via base64 (no quoting issues). Start build in subshell so SSH channel
-        # closes as soon as subshell exits; PID written to file so we don't depend on stdout.
+        # One round-trip: clear the previous run, write the script via base64 (no quoting issues),
+        # start it in a subshell so the SSH channel closes as soon as that exits, then read the PID
+        # back from its file so we don't depend on the build's stdout.
         run_cmd = (
+            f"rm -f {log} {exit_file} {pid_file} {script_file} && "
             f"echo {b64} | base64 -d > {script_file} && chmod +x {script_file} && "
-            f"( nohup setsid bash {script_file} >>{log} 2>&1 & echo $! > {pid_file} )"
+            f"( nohup setsid bash {script_file} >>{log} 2>&1 & echo $! > {pid_file} ) && "
+            f"cat {pid_file}"
         )
         code, out, err = _run(run_cmd, timeout=45)
         if code != 0:
             raise RuntimeError(f"Failed to start background build: {err or out}")
-        code2, out2, _ = _run(f"cat {pid_file}", timeout=5)
-        if code2 != 0 or not (out2 or "").strip().isdigit():
-            raise RuntimeError(f"Could not read build PID from {pid_file}: {out2!r}")
-        return (out2 or "").strip()
+        if not out.isdigit():
+            raise RuntimeError(f"Could not read build PID from {pid_file}: {out!r}")
+        return out
 
-    def _poll_build_until_done(
+    def _follow_build(
         pid: str,
-        poll_interval: int = 30,
         timeout_sec: int = 7200,
         no_progress_timeout_sec: int = 1200,
     ) -> tuple[int, str]:
-        """Poll a build and terminate its process group when its log stops changing."""
+        """Stream a background build's log as it is written; returns (exit_code, last 50 lines).
+        `tail -f --pid` follows the log until the build exits, so progress shows live and only the last
+        50 lines are kept in memory. A dropped connection resumes at the end of the log; the build's
+        process group is terminated when the log stops growing for no_progress_timeout_sec."""
+        nonlocal ssh
         log = "/tmp/rebuild_build.log"
         exit_file = "/tmp/rebuild_build.exit"
+        marker = "###BUILD-EXIT:"
+        kill_cmd = f"kill -- -{pid} 2>/dev/null || kill {pid} 2>/dev/null || true"
         deadline = time.monotonic() + timeout_sec
-        last_size = -1
-        last_progress_at = time.monotonic()
-        while time.monotonic() < deadline:
-            code, out, _ = _run(f"test -f {exit_file} && cat {exit_file}", timeout=10)
-            if code == 0 and out.strip().isdigit():
-                build_code = int(out.strip())
-                _, tail_out, _ = _run(f"tail -50 {log}", timeout=10)
-                return build_code, (tail_out or "").strip()
-            _, size_out, _ = _run(f"stat -c %s {log} 2>/dev/null || echo 0", timeout=10)
+        last_lines: deque[str] = deque(maxlen=50)
+        exit_status: list[str] = []  # the exit file's content once the follow command has finished
+
+        def on_line(line: str) -> None:
+            if line.startswith(marker):
+                exit_status.append(line[len(marker):].strip())
+                return
+            last_lines.append(line)
+            print(f"   {line}", flush=True)
+
+        start = "+1"
+        while not exit_status and time.monotonic() < deadline:
+            remaining = max(1, int(deadline - time.monotonic()))
+            follow = (
+                f"timeout {remaining} tail -n {start} -f --pid={pid} {log} 2>/dev/null; "
+                f'echo "{marker}$(cat {exit_file} 2>/dev/null)"'
+            )
             try:
-                current_size = int((size_out or "0").strip())
-            except ValueError:
-                current_size = 0
-            if current_size != last_size:
-                last_size = current_size
-                last_progress_at = time.monotonic()
-            elif time.monotonic() - last_progress_at >= no_progress_timeout_sec:
-                _, tail_out, _ = _run(f"tail -100 {log}", timeout=10)
-                _run(f"kill -- -{pid} 2>/dev/null || kill {pid} 2>/dev/null || true", timeout=10)
+                code, _ = stream_exec(ssh, follow, no_progress_timeout_sec, on_line, keep_output=False)
+            except (paramiko.SSHException, OSError, EOFError):
+                code = None
+            if exit_status:
+                break
+            transport = ssh.get_transport()
+            if code == -1 and transport is not None and transport.is_active():
+                # stream_exec gave up on a silent log while the connection itself is fine
+                _run(kill_cmd, timeout=10)
                 raise RuntimeError(
                     f"Build made no log progress for {no_progress_timeout_sec}s; "
-                    f"terminated process group {pid}. Last log lines:\n{(tail_out or '').strip()}"
+                    f"terminated process group {pid}. Last log lines:\n" + "\n".join(last_lines)
                 )
-            # Progress: show last 5 lines
-            _, progress, _ = _run(f"tail -5 {log} 2>/dev/null || true", timeout=10)
-            if progress.strip():
-                print(f"   ... {progress.strip().split(chr(10))[-1]}")
-            time.sleep(poll_interval)
-        _run(f"kill -- -{pid} 2>/dev/null || kill {pid} 2>/dev/null || true", timeout=10)
+            # Connection dropped mid-build (the build itself keeps running): reconnect, new lines only
+            try:
+                ssh.close()
+            except Exception:
+                pass
+            ssh = _connect_ssh()
+            start = "0"
+
+        if exit_status and exit_status[0].isdigit():
+            return int(exit_status[0]), "\n".join(last_lines)
+        if exit_status and time.monotonic() < deadline:
+            # The build's process is gone without writing an exit code (killed, OOM, VM reboot)
+            return -1, "\n".join(last_lines)
+        _run(kill_cmd, timeout=10)
         raise RuntimeError(f"Build did not finish within {timeout_sec}s (PID {pid} killed)")
 
+    # Fail before a VM build can exhaust disk, RAM, or compete with another build (exit 21/22/23).
+    preflight_command = (
+        "set -eu; "
+        "timeout 15 docker version >/dev/null; "
+        "free_mb=$(awk '/MemAvailable:/ {print int($2/1024)}' /proc/meminfo); "
+        "disk_mb=$(df -Pm /var/lib/docker | awk 'NR==2 {print $4}'); "
+        "if pgrep -af 'docker( |-)build|buildkitd|buildx.*build|next build' >/dev/null; then "
+        "echo 'Another Docker/Next build is already running:' >&2; "
+        "pgrep -af 'docker( |-)build|buildkitd|buildx.*build|next build' >&2; exit 21; fi; "
+        f"if [ \"$disk_mb\" -lt {min_disk_mb} ]; then echo \"Insufficient Docker disk: ${'{'}disk_mb{'}'}MB < {min_disk_mb}MB\" >&2; exit 22; fi; "
+        f"if [ \"$free_mb\" -lt {min_mem_mb} ]; then echo \"Insufficient available memory: ${'{'}free_mb{'}'}MB < {min_mem_mb}MB\" >&2; exit 23; fi; "
+        "echo \"Preflight passed: disk=${disk_mb}MB available_mem=${free_mb}MB\""
+    )
+
     def _build_preflight() -> None:
-        """Fail before a VM build can exhaust disk, RAM, or compete with another build."""
-        command = (
-            "set -eu; "
-            "timeout 15 docker version >/dev/null; "
-            "free_mb=$(awk '/MemAvailable:/ {print int($2/1024)}' /proc/meminfo); "
-            "disk_mb=$(df -Pm /var/lib/docker | awk 'NR==2 {print $4}'); "
-            "if pgrep -af 'docker( |-)build|buildkitd|buildx.*build|next build' >/dev/null; then "
-            "echo 'Another Docker/Next build is already running:' >&2; "
-            "pgrep -af 'docker( |-)build|buildkitd|buildx.*build|next build' >&2; exit 21; fi; "
-            f"if [ \"$disk_mb\" -lt {min_disk_mb} ]; then echo \"Insufficient Docker disk: ${'{'}disk_mb{'}'}MB < {min_disk_mb}MB\" >&2; exit 22; fi; "
-            f"if [ \"$free_mb\" -lt {min_mem_mb} ]; then echo \"Insufficient available memory: ${'{'}free_mb{'}'}MB < {min_mem_mb}MB\" >&2; exit 23; fi; "
-            "echo \"Preflight passed: disk=${disk_mb}MB available_mem=${free_mb}MB\""
-        )
-        code, out, err = _run(command, timeout=45)
+        code, out, err = _run(preflight_command, timeout=45)
         if code != 0:
             raise RuntimeError(f"Sandbox build preflight failed (exit {code}): {err or out}")
         print(f"   {out}")
 
+    def _run_steps(steps: list[tuple[str, str]], timeout: int = 120) -> tuple[int, list[tuple[str, str]]]:
+        """Run labelled steps in one remote bash (stopping at the first failure); see _ssh_session.run_steps."""
+        nonlocal ssh
+        try:
+            return run_steps(ssh, steps, timeout=timeout)
+        except paramiko.SSHException:
+            try:
+                ssh.close()
+            except Exception:
+                pass
+            ssh = _connect_ssh()
+            return run_steps(ssh, steps, timeout=timeout)
+
     def _diagnose_build_host() -> None:
         command = (
             "echo '=== resources ==='; df -h / /var/lib/docker; df -ih / /var/lib/docker; "
@@ -262,35 +237,40 @@ def main():
             raise RuntimeError(f"Sandbox diagnostics failed (exit {code})")
     
     # Pull latest code so build uses requested branch/ref
-    git_ref = args.branch if args.branch.startswith("origin/") else f"origin/{args.branch}"
-    print(f"\n1. Syncing repo to {git_ref}...")
-    code, out, err = _run(f"cd {WEBSITE_DIR} && git fetch origin && git reset --hard {git_ref}", timeout=180)
+    branch = branch.removeprefix("origin/")
+    print(f"\n1. Syncing repo to origin/{branch}...")
+    code = _stream(sync_command(website_dir, branch), timeout=180)
     if code != 0:
-        raise RuntimeError(f"Failed to sync repo (exit {code}): {err or out}")
-    if out:
-        print(f"   {out.split(chr(10))[-1]}")
+        raise RuntimeError(f"Failed to sync repo (exit {code}); see the git output above")
 
-    if args.diagnose:
+    if diagnose:
         _diagnose_build_host()
         ssh.close()
         return
 
     image_tag = "mycosoft-always-on-mycosoft-website:latest"
+    force_rebuild = force_no_cache or force_rebuild_requested()
+    # A local build of the commit that is already live would only rebuild and re-cut the same image
+    up_to_date = (
+        local_build and not force_rebuild and _run(up_to_date_command(website_dir, image_tag), timeout=30)[0] == 0
+    )
 
-    if args.skip_build:
+    if up_to_date:
+        print("\n2–5. Already up to date: the running image was built from this commit. Skipping build and cutover.")
+    elif skip_build:
         print("\n2–3. Skipping Dockerfile fix and image build (--skip-build).")
         print("   Tagging current :latest as :previous for rollback...")
         _run(
             f"docker image inspect {image_tag} >/dev/null 2>&1 && docker tag {image_tag} mycosoft-always-on-mycosoft-website:previous || true",
             timeout=30,
         )
-    elif not args.local_build:
-        print(f"\n2–3. Pulling pre-built GHCR image instead of building on Sandbox: {args.image}")
+    elif not local_build:
+        print(f"\n2–3. Pulling pre-built GHCR image instead of building on Sandbox: {image}")
         _build_preflight()
-        code, out, err = _run(f"timeout 900 docker pull {args.image}", timeout=930)
+        code = _stream(f"timeout 900 docker pull {image}", timeout=930)
         if code != 0:
             raise RuntimeError(
-                f"Could not pull verified GHCR image {args.image} (exit {code}): {err or out}. "
+                f"Could not pull verified GHCR image {image} (exit {code}); see the pull output above. "
                 "Refusing to fall back to a local build; rerun with --local-build only after resolving registry availability."
             )
         _run(
@@ -298,13 +278,12 @@ def main():
             "mycosoft-always-on-mycosoft-website:previous || true",
             timeout=30,
         )
-        code, out, err = _run(f"docker tag {args.image} {image_tag}", timeout=30)
+        code, out, err = _run(f"docker tag {image} {image_tag}", timeout=30)
         if code != 0:
             raise RuntimeError(f"Could not tag GHCR image for blue/green deploy: {err or out}")
         print("   GHCR image pulled and tagged for blue/green cutover.")
     else:
         # Fix Dockerfile encoding: strip BOM and convert UTF-16 to UTF-8 (VM git/encoding can cause "unknown instruction" errors)
-        print("\n2. Fixing Dockerfile encoding (BOM + UTF-16 -> UTF-8)...")
         fix_script = b"""import pathlib
 p = pathlib.Path('Dockerfile')
 b = p.read_bytes()
@@ -331,68 +310,74 @@ else:
     print('Encoding OK')
 """
         fix_b64 = base64.b64encode(fix_script).decode()
-        fix_cmd = f"cd {WEBSITE_DIR} && echo {fix_b64} | base64 -d | python3"
-        code, out, err = _run(fix_cmd, timeout=30)
-        print(f"   {out or err or 'ok'}")
+        fix_cmd = f"cd {website_dir} && echo {fix_b64} | base64 -d | python3"
 
-        print("\n3. Rebuilding Docker image (--no-cache, may take a few minutes)...")
+        print("\n2. Preparing build (Dockerfile encoding, preflight, stale builds, rollback tag)...")
         print(
             f"   Preflight thresholds: {min_disk_mb}MB Docker disk, {min_mem_mb}MB available memory; "
             f"no-progress watchdog: {progress_timeout_sec}s."
         )
-        _build_preflight()
-
-        # Kill any stale build processes so only one build runs (prevents resource contention from multiple deploys)
-        print("   Stopping any existing docker build processes on VM...")
-        _run("pkill -f 'docker build.*mycosoft-always-on-mycosoft-website' 2>/dev/null || true", timeout=15)
-        _run("pkill -f '/tmp/rebuild_build.sh' 2>/dev/null || true", timeout=10)
-        _run("rm -f /tmp/rebuild_build.log /tmp/rebuild_build.exit /tmp/rebuild_build.pid /tmp/rebuild_build.sh", timeout=5)
-        time.sleep(3)
-
-        # Build strategy:
-        # 1) Try classic builder first (DOCKER_BUILDKIT=0). If the base image is already cached, this
-        #    avoids Docker Hub metadata calls that have been timing out.
-        # 2) Fall back to BuildKit with retries in case classic builder still needs to pull.
-        exports_cmd, docker_args = _build_supabase_args()
-        public_site_args = (
-            f"--build-arg NEXT_PUBLIC_SITE_URL={base_url} "
-            f"--build-arg NEXT_PUBLIC_BASE_URL={base_url} "
-        )
-        build_cmd_legacy = f"cd {WEBSITE_DIR} && {exports_cmd}DOCKER_BUILDKIT=0 docker build {docker_args}{public_site_args}--network host --no-cache -t {image_tag} ."
-        build_cmd_buildkit = f"cd {WEBSITE_DIR} && {exports_cmd}DOCKER_BUILDKIT=1 docker build {docker_args}{public_site_args}--network host --no-cache -t {image_tag} ."
-
-        # Preserve last known-good image for rollback (Cloudflare 502 if new container dies on :3000)
-        print("   Tagging current :latest as :previous (rollback target)...")
-        _run(
-            f"docker image inspect {image_tag} >/dev/null 2>&1 && docker tag {image_tag} mycosoft-always-on-mycosoft-website:previous || true",
-            timeout=30,
+        # All four in one remote bash instead of a round-trip (and a fixed 3s sleep) each
+        code, steps = _run_steps([
+            ("encoding", f"{fix_cmd} || true"),
+            ("preflight", preflight_command),
+            # Kill any stale build processes so only one build runs (prevents resource contention from multiple deploys);
+            # the pause for them to exit is only taken when something was killed
+            ("stale", "killed=0; "
+                      "pkill -f 'docker build.*mycosoft-always-on-mycosoft-website' 2>/dev/null && killed=1; "
+                      "pkill -f '/tmp/rebuild_build.sh' 2>/dev/null && killed=1; "
+                      "rm -f /tmp/rebuild_build.log /tmp/rebuild_build.exit /tmp/rebuild_build.pid /tmp/rebuild_build.sh; "
+                      '[ "$killed" = 0 ] && echo "No stale builds" || { echo "Stopped stale builds"; sleep 3; }'),
+            # Preserve last known-good image for rollback (Cloudflare 502 if new container dies on :3000)
+            ("previous", f"docker image inspect {image_tag} >/dev/null 2>&1 && "
+                         f"docker tag {image_tag} mycosoft-always-on-mycosoft-website:previous && "
+                         "echo 'Tagged current :latest as :previous (rollback target)' || true"),
+        ])
+        for _, output in steps:
+            print(f"   {output or 'ok'}")
+        if code != 0:
+            failed, output = steps[-1] if steps else ("connect", "")
+            if failed == "preflight":
+                raise RuntimeError(f"Sandbox build preflight failed (exit {code}): {output}")
+            raise RuntimeError(f"Build setup failed at {failed} (exit {code}): {output}")
+
+        print(f"\n3. Rebuilding Docker image ({'--no-cache' if force_rebuild else 'cached layers'}, may take a few minutes)...")
+
+        # Build strategy (BuildKit only: the Dockerfile's npm cache mount needs it):
+        # 1) Cached build on the dependency base image, reusing unchanged layers of the current image.
+        # 2) Fall back to clean --no-cache builds with retries (e.g. a corrupt cached layer).
+        exports_cmd, supabase_args = supabase_build_args()
+        options = (
+            "--network host",
+            *supabase_args,
+            f"--build-arg NEXT_PUBLIC_SITE_URL={base_url}",
+            f"--build-arg NEXT_PUBLIC_BASE_URL={base_url}",
         )
+        build_cmd_cached = f"{exports_cmd}{build_command(website_dir, image_tag, force_rebuild, options=options)}"
+        build_cmd_clean = f"{exports_cmd}{build_command(website_dir, image_tag, True, options=options)}"
 
         print(
             f"   Build absolute timeout: {build_timeout_sec}s ({build_timeout_sec // 3600}h); "
             f"no-progress timeout: {progress_timeout_sec}s."
         )
-        print("   Attempt 1/2: DOCKER_BUILDKIT=0 (legacy builder)")
-        pid = _start_background_build(build_cmd_legacy)
-        code, out = _poll_build_until_done(
+        print(f"   Attempt 1/2: BuildKit ({'--no-cache' if force_rebuild else 'cached'})")
+        pid = _start_background_build(build_cmd_cached)
+        code, out = _follow_build(
             pid,
-            poll_interval=30,
             timeout_sec=build_timeout_sec,
             no_progress_timeout_sec=progress_timeout_sec,
         )
-        print(f"   Last 50 lines:\n{out}")
 
         if code != 0:
-            print(f"   Legacy build failed (exit {code}). Attempt 2/2: BuildKit (retry 2x)")
+            print(f"   Build failed (exit {code}). Attempt 2/2: clean BuildKit build (retry 2x)")
             for attempt in (1, 2):
-                pid = _start_background_build(build_cmd_buildkit)
-                code, out = _poll_build_until_done(
+                pid = _start_background_build(build_cmd_clean)
+                code, out = _follow_build(
                     pid,
-                    poll_interval=30,
                     timeout_sec=build_timeout_sec,
                     no_progress_timeout_sec=progress_timeout_sec,
                 )
-                print(f"   BuildKit attempt {attempt}/2 exit {code}\n   Last 50 lines:\n{out}")
+                print(f"   BuildKit attempt {attempt}/2 exit {code}")
                 if code == 0:
                     break
                 time.sleep(5 * attempt)
@@ -401,45 +386,36 @@ else:
                 # Do NOT stop/remove the running container if we failed to produce a new image.
                 print("\n❌ Docker image build failed. Leaving the currently running container untouched.")
                 print("   Most common cause: sandbox VM cannot reach Docker Hub (TLS handshake timeout).")
-                raise RuntimeError(f"Docker build failed (exit {code}).")
+                raise RuntimeError(f"Docker build failed (exit {code}). Last log lines:\n{out}")
 
         print("   Docker image build succeeded.")
 
-    # Sync env before any container changes (keeps public :3000 serving until candidate is proven).
-    print("\n4. Syncing env keys to VM (.env.local -> /opt/mycosoft/website/.env)...")
-    sync_script = Path(__file__).resolve().parent / "_sandbox_env_sync.py"
-    if sync_script.exists():
-        import subprocess
-        code_sync = subprocess.call(
-            [sys.executable, str(sync_script), "--no-restart"],
-            cwd=str(sync_script.parent),
-            timeout=60,
-        )
-        if code_sync != 0:
-            print("   Warning: env sync had non-zero exit; container may lack Stripe/other keys.")
-    else:
-        print("   _sandbox_env_sync.py not found; run it once to push keys to VM.")
-
-    env_file = f"{WEBSITE_DIR}/.env"
-    ec, _, _ = _run(f"test -f {env_file} && echo ok", timeout=5)
-    if ec != 0:
-        print("   Warning: VM .env missing — blue-green deploy may fail auth/env checks.")
-
-    def _wait_http(url: str, attempts: int = 60, delay_sec: int = 3) -> str:
-        """Poll curl on VM until HTTP 200 or attempts exhausted."""
-        last = "000"
-        for i in range(attempts):
-            code, out, _ = _run(
-                f"curl -s -o /dev/null -w '%{{http_code}}' --connect-timeout 5 '{url}' 2>/dev/null || echo 000",
-                timeout=25,
+    if not up_to_date:
+        # Sync env before any container changes (keeps public :3000 serving until candidate is proven).
+        print("\n4. Syncing env keys to VM (.env.local -> /opt/mycosoft/website/.env)...")
+        sync_script = Path(__file__).resolve().parent / "_sandbox_env_sync.py"
+        if sync_script.exists():
+            import subprocess
+            code_sync = subprocess.call(
+                [sys.executable, str(sync_script), "--no-restart"],
+                cwd=str(sync_script.parent),
+                timeout=60,
             )
-            last = (out or "000").strip() or "000"
-            if last == "200":
-                return last
-            if i % 5 == 0:
-                print(f"   ... health {url} attempt {i + 1}/{attempts} (code {last})")
-            time.sleep(delay_sec)
-        return last
+            if code_sync != 0:
+                print("   Warning: env sync had non-zero exit; container may lack Stripe/other keys.")
+        else:
+            print("   _sandbox_env_sync.py not found; run it once to push keys to VM.")
+
+        env_file = f"{website_dir}/.env"
+        ec, _, _ = _run(f"test -f {env_file} && echo ok", timeout=5)
+        if ec != 0:
+            print("   Warning: VM .env missing — blue-green deploy may fail auth/env checks.")
+
+    def _wait_http(url: str, timeout_sec: int = 180) -> str:
+        """Poll url from the VM every 0.5s (one SSH round-trip) until it answers 2xx/3xx or timeout_sec passes."""
+        print(f"   ... waiting up to {timeout_sec}s for {url}")
+        _, out, _ = _run(wait_for_http(url, timeout=timeout_sec), timeout=timeout_sec + 30)
+        return out.strip() or "000"
 
     def _ensure_blue_green_proxy() -> None:
         """Ensure mycosoft-website-proxy owns host :3000 — never bind app directly on :3000."""
@@ -449,19 +425,15 @@ else:
         )
         if (out or "").strip() != "yes":
             print("   Proxy missing — running scripts/blue-green-bootstrap.sh ...")
-            code, bout, berr = _run(
-                f"cd {WEBSITE_DIR} && bash scripts/blue-green-bootstrap.sh",
-                timeout=900,
-            )
+            code = _stream(f"cd {website_dir} && bash scripts/blue-green-bootstrap.sh", timeout=900)
             if code != 0:
                 raise RuntimeError(
-                    f"blue-green-bootstrap failed (exit {code}): {berr or bout}\n"
+                    f"blue-green-bootstrap failed (exit {code}); see its output above.\n"
                     "Refusing direct docker run on :3000 without nginx proxy."
                 )
-            print(f"   Bootstrap: {(bout or berr or 'ok')[-400:]}")
 
-        proxy_code = _wait_http("http://127.0.0.1:3000/healthz", attempts=40, delay_sec=2)
-        if proxy_code != "200":
+        proxy_code = _wait_http("http://127.0.0.1:3000/healthz", timeout_sec=80)
+        if not http_ok(proxy_code):
             raise RuntimeError(
                 f"mycosoft-website-proxy unhealthy on :3000/healthz (HTTP {proxy_code}). "
                 "Fix proxy before deploy — do not docker run on host :3000."
@@ -471,15 +443,12 @@ else:
     def _blue_green_cutover(img: str, public_host: str) -> None:
         """Cut over via blue-green-deploy.sh — never single-container docker run on :3000."""
         cutover = (
-            f"cd {WEBSITE_DIR} && "
+            f"cd {website_dir} && "
             f"IMAGE={img} PUBLIC_HOST={public_host} "
             f"bash scripts/blue-green-deploy.sh"
         )
         print(f"   Running: IMAGE={img} PUBLIC_HOST={public_host} blue-green-deploy.sh")
-        code, out, err = _run(cutover, timeout=1800)
-        tail = (out or err or "")[-2000:]
-        if tail:
-            print(f"   {tail}")
+        code = _stream(cutover, timeout=1800)
         if code != 0:
             raise RuntimeError(
                 f"blue-green-deploy failed (exit {code}). "
@@ -487,7 +456,7 @@ else:
             )
 
     def _verify_public_https(url: str, attempts: int = 36, delay_sec: int = 5) -> str:
-        """Verify public URL returns HTTP 200 (from dev machine after VM cutover)."""
+        """Verify public URL answers 2xx/3xx (from dev machine after VM cutover); 5xx while Cloudflare/the proxy catch up is retried."""
         import subprocess
 
         last = "000"
@@ -503,7 +472,7 @@ else:
                 last = (proc.stdout or "000").strip() or "000"
             except Exception:
                 last = "000"
-            if last == "200":
+            if http_ok(last):
                 return last
             if i % 3 == 0:
                 print(f"   ... public {url} attempt {i + 1}/{attempts} (HTTP {last})")
@@ -512,14 +481,15 @@ else:
 
     http_code = "000"
 
-    print(
-        f"\n5. Blue/green deploy ({site_label}): ensure proxy on :3000, cutover idle slot — "
-        "NEVER docker run single container on host :3000..."
-    )
-    _ensure_blue_green_proxy()
-    _blue_green_cutover(image_tag, site_label)
+    if not up_to_date:
+        print(
+            f"\n5. Blue/green deploy ({site_label}): ensure proxy on :3000, cutover idle slot — "
+            "NEVER docker run single container on host :3000..."
+        )
+        _ensure_blue_green_proxy()
+        _blue_green_cutover(image_tag, site_label)
 
-    print(f"\n6. Verifying public HTTPS {base_url} returns 200...")
+    print(f"\n6. Verifying public HTTPS {base_url} answers 2xx/3xx...")
     http_code = _verify_public_https(base_url, attempts=36, delay_sec=5)
 
     _, pub_status, _ = _run(
@@ -528,10 +498,10 @@ else:
     )
     print(f"   Proxy: {pub_status or '(unknown)'}")
 
-    if http_code != "200":
+    if not http_ok(http_code):
         ssh.close()
         raise RuntimeError(
-            f"Deploy guardrail failed: {base_url} returned HTTP {http_code} (expected 200). "
+            f"Deploy guardrail failed: {base_url} returned HTTP {http_code} (expected 2xx/3xx). "
             "Site may be down — run blue-green-bootstrap.sh on VM 187 and check docker network."
         )
 
@@ -546,9 +516,11 @@ else:
     elif spot_out and "200" not in spot_out[:200]:
         print("   WARNING: Critical MP4 did not return OK — verify container has -v /opt/mycosoft/media/website/assets:/app/public/assets:ro")
 
-    print("\n8. MycoBrain service (ensure always-on)...")
     ensure_script = Path(__file__).resolve().parent / "_ensure_mycobrain_sandbox.py"
-    if ensure_script.exists():
+    if not with_mycobrain:
+        print("\n8. MycoBrain service: skipped.")
+    elif ensure_script.exists():
+        print("\n8. MycoBrain service (ensure always-on)...")
         import subprocess
         code = subprocess.call(
             [sys.executable, str(ensure_script)],
@@ -558,17 +530,80 @@ else:
         if code != 0:
             print("   MycoBrain ensure had issues; check output above.")
     else:
-        print("   _ensure_mycobrain_sandbox.py not found; MycoBrain may need manual setup.")
+        print("\n8. MycoBrain service: _ensure_mycobrain_sandbox.py not found; MycoBrain may need manual setup.")
 
     ssh.close()
 
-    if http_code == "200":
+    if http_ok(http_code):
         print(f"\n✅ Deployment successful! Site is live at {site_label}")
         purge_everything()
     else:
         print(f"\n⚠️  Site returned {http_code} — Cloudflare purge skipped.")
 
-    print("\nNote: Cloudflare purge runs only after public HTTPS returns 200.")
+    print("\nNote: Cloudflare purge runs only after public HTTPS answers 2xx/3xx.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild and deploy website to Sandbox VM (187)")
+    parser.add_argument("--production", action="store_true", help="Deploy with mycosoft.com URLs (production)")
+    parser.add_argument(
+        "--branch",
+        default=os.environ.get("REBUILD_GIT_REF", "main"),
+        help="Git ref on origin to deploy (default: main or REBUILD_GIT_REF env)",
+    )
+    parser.add_argument(
+        "--require-gcs-verified",
+        action="store_true",
+        help="Abort if branch looks like Psathyrella GCS and GCS_VERIFIED is not set",
+    )
+    parser.add_argument(
+        "--skip-build",
+        action="store_true",
+        help="Skip Dockerfile fix and docker build; use existing image on VM (start container only)",
+    )
+    parser.add_argument(
+        "--local-build",
+        action="store_true",
+        help="Build on Sandbox only when no verified GHCR image is available",
+    )
+    parser.add_argument(
+        "--image",
+        default=REGISTRY_IMAGE,
+        help="Verified registry image to pull and deploy (default: GHCR production-latest, pushed by _build_and_push.py)",
+    )
+    parser.add_argument(
+        "--force-rebuild",
+        action="store_true",
+        help="--local-build with --no-cache instead of reusing cached layers (same as FORCE_REBUILD=1)",
+    )
+    parser.add_argument(
+        "--diagnose",
+        action="store_true",
+        help="Report Sandbox build capacity and stalled-build evidence without deploying",
+    )
+    args = parser.parse_args()
+
+    branch_slug = args.branch.replace("origin/", "").lower()
+    if args.require_gcs_verified or "psathyrella" in branch_slug or branch_slug == "feat/psathyrella-gcs":
+        gcs_ok = os.environ.get("GCS_VERIFIED", "").strip().lower() in ("1", "true", "yes", "verified")
+        morgan_ok = os.environ.get("MORGAN_APPROVE_GCS_DEPLOY", "").strip().lower() in ("1", "true", "yes")
+        if not gcs_ok and not morgan_ok:
+            print(
+                "ERROR: Psathyrella GCS deploy blocked. Set GCS_VERIFIED=1 after Claude 3010 smoke, "
+                "or MORGAN_APPROVE_GCS_DEPLOY=1. Use scripts/group_release_deploy.py --phase core for Earth Sim/NLM only."
+            )
+            sys.exit(2)
+
+    rebuild(
+        branch=args.branch,
+        production=args.production,
+        skip_build=args.skip_build,
+        local_build=args.local_build,
+        image=args.image,
+        diagnose=args.diagnose,
+        force_no_cache=args.force_rebuild,
+    )
+
 
 if __name__ == "__main__":
     main()
@@ -1,55 +1,45 @@
 import os
 import paramiko
-import time
 import sys
 
+from _ssh_session import auth_kwargs, run, tune_transport
+
 sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
 # Load credentials from environment variables
 mindex_host = os.environ.get("MINDEX_VM_HOST", "${MINDEX_VM_HOST}")
 user = os.environ.get("MINDEX_VM_USER", "mycosoft")
-passwd = os.environ.get("VM_PASSWORD")
-
-if not passwd:
-    print("ERROR: VM_PASSWORD environment variable is not set.")
-    print("Please set it with: $env:VM_PASSWORD = 'your-password'")
-    sys.exit(1)
+passwd = os.environ.get("VM_PASSWORD")  # optional fallback; key/agent auth is tried first
 
 print("Registering missing systems in MINDEX database...")
 ssh = paramiko.SSHClient()
 ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-ssh.connect(mindex_host, username=user, password=passwd, timeout=30)
+ssh.connect(mindex_host, username=user, timeout=30, **auth_kwargs(passwd))
+tune_transport(ssh)
 
-# Register missing systems
-sql = '''
--- Register PersonaPlex Bridge
-INSERT INTO registry.systems (name, type, url, description, status)
-VALUES ('PersonaPlex', 'voice', 'http://localhost:8999', 'PersonaPlex Voice Bridge - Moshi 7B Integration', 'active')
-ON CONFLICT (name) DO UPDATE SET url = EXCLUDED.url, description = EXCLUDED.description;
+# Missing systems as (name, type, url, description); ${...} in a url is expanded by the VM's shell
+SYSTEMS = [
+    ('PersonaPlex', 'voice', 'http://localhost:8999', 'PersonaPlex Voice Bridge - Moshi 7B Integration'),
+    ('Moshi', 'voice', 'http://localhost:8998', 'Moshi 7B Voice Model Server - RTX 5090'),
+    ('n8n', 'automation', 'http://${MAS_VM_HOST:-localhost}:5678', 'n8n Workflow Automation Engine'),
+    ('Proxmox', 'infrastructure', 'https://${PROXMOX_HOST:-localhost}:8006', 'Proxmox VE Hypervisor Host'),
+    ('Grafana', 'monitoring', 'http://192.168.0.187:3002', 'Grafana Metrics Dashboard'),
+    ('Prometheus', 'monitoring', 'http://192.168.0.187:9090', 'Prometheus Metrics Collection'),
+]
 
--- Register Moshi Server
-INSERT INTO registry.systems (name, type, url, description, status)
-VALUES ('Moshi', 'voice', 'http://localhost:8998', 'Moshi 7B Voice Model Server - RTX 5090', 'active')
-ON CONFLICT (name) DO UPDATE SET url = EXCLUDED.url, description = EXCLUDED.description;
 
--- Register n8n Workflow
-INSERT INTO registry.systems (name, type, url, description, status)
-VALUES ('n8n', 'automation', 'http://${MAS_VM_HOST:-localhost}:5678', 'n8n Workflow Automation Engine', 'active')
-ON CONFLICT (name) DO UPDATE SET url = EXCLUDED.url, description = EXCLUDED.description;
+def sql_literal(value):
+    return "'" + value.replace("'", "''") + "'"
 
--- Register Proxmox Host
-INSERT INTO registry.systems (name, type, url, description, status)
-VALUES ('Proxmox', 'infrastructure', 'https://${PROXMOX_HOST:-localhost}:8006', 'Proxmox VE Hypervisor Host', 'active')
-ON CONFLICT (name) DO UPDATE SET url = EXCLUDED.url, description = EXCLUDED.description;
 
--- Register Grafana
+# One multi-row upsert: planned and executed once instead of once per system
+values = ",\n".join(
+    f"({', '.join(sql_literal(v) for v in (*system, 'active'))})" for system in SYSTEMS
+)
+sql = f'''
 INSERT INTO registry.systems (name, type, url, description, status)
-VALUES ('Grafana', 'monitoring', 'http://192.168.0.187:3002', 'Grafana Metrics Dashboard', 'active')
-ON CONFLICT (name) DO UPDATE SET url = EXCLUDED.url, description = EXCLUDED.description;
-
--- Register Prometheus
-INSERT INTO registry.systems (name, type, url, description, status)
-VALUES ('Prometheus', 'monitoring', 'http://192.168.0.187:9090', 'Prometheus Metrics Collection', 'active')
+VALUES
+{values}
 ON CONFLICT (name) DO UPDATE SET url = EXCLUDED.url, description = EXCLUDED.description;
 
 -- Show all registered systems
@@ -57,10 +47,13 @@ SELECT name, type, url, status FROM registry.systems ORDER BY name;
 '''
 
 cmd = f"docker exec mindex-postgres psql -U mycosoft -d mindex -c \"{sql}\""
-stdin, stdout, stderr = ssh.exec_command(cmd)
-time.sleep(10)
-print(stdout.read().decode('utf-8', errors='replace'))
-print(stderr.read().decode('utf-8', errors='replace'))
+# Returns once psql exits rather than after a fixed wait
+exit_code, out, err = run(ssh, cmd, timeout=60)
+print(out)
+print(err)
 
 ssh.close()
+if exit_code != 0:
+    print(f"\nSystem registration failed (exit {exit_code})")
+    sys.exit(1)
 print("\nSystem registration complete!")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""One import for the check scripts: UTF-8 stdout plus the shared SSH primitives.
+
+run/run_many/run_steps/docker_exec go through the OpenSSH ControlMaster (_ssh_cli), so every check in
+every process reuses one connection per host. session() hands out the pooled, keepalive-tuned
+paramiko client (_ssh_session) for scripts that need raw channels, a PTY or streamed output.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import shlex
+import sys
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, Tuple
+
+from _ssh_cli import DEFAULT_USER, run_sections, split_steps, step_script
+from _ssh_cli import run as _run
+
+if TYPE_CHECKING:
+    import paramiko
+
+
+_utf8_stdout = False
+
+
+def utf8_stdout() -> None:
+    """Windows consoles default to cp1252; docker/psql output is UTF-8. Only the first call reconfigures
+    (and so flushes) stdout, so library entry points can call it unconditionally."""
+    global _utf8_stdout
+    if not _utf8_stdout:
+        sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+        _utf8_stdout = True
+
+
+@contextlib.contextmanager
+def session(
+    host: str,
+    user: str = DEFAULT_USER,
+    password: Optional[str] = None,
+    jump_host: Optional[str] = None,
+) -> Iterator[paramiko.SSHClient]:
+    """Pooled paramiko client for host (optionally via jump_host); it stays open after the block."""
+    from _ssh_session import get_client  # CLI-only checks never need paramiko
+
+    yield get_client(host, user, password, jump_host=jump_host)
+
+
+def run(host: str, cmd: str, timeout: int = 60, user: str = DEFAULT_USER) -> Tuple[int, str, str]:
+    """One-shot command over the multiplexed connection. Returns (exit_code, stdout, stderr)."""
+    return _run(host, cmd, timeout=timeout, user=user)
+
+
+def run_many(host: str, cmds: Sequence[str], timeout: int = 120, user: str = DEFAULT_USER) -> List[str]:
+    """Run cmds in one remote `bash -s` (one channel) and return each one's merged output."""
+    return run_sections(host, cmds, timeout=timeout, user=user)
+
+
+def run_steps(
+    host: str,
+    steps: Sequence[Tuple[str, str]],
+    timeout: int = 1200,
+    fail_fast: bool = True,
+    user: str = DEFAULT_USER,
+) -> Tuple[int, List[Tuple[str, str]]]:
+    """(label, cmd) steps in one remote `bash -s` (one channel), like _ssh_broker.run_steps. Returns
+    (exit_code, [(label, output), ...]) for the steps that started; ("connect", error) if none did."""
+    rc, out, err = _run(host, "bash -s", timeout=timeout, user=user, input=step_script(steps, fail_fast))
+    results = split_steps(out)
+    if rc != 0 and not results:
+        results = [("connect", err)]
+    return rc, results
+
+
+def docker_exec(host: str, container: str, cmd: str, timeout: int = 60, user: str = DEFAULT_USER) -> str:
+    """Output of `docker exec container cmd` (stderr merged), or the ssh error if nothing came back."""
+    _, out, err = run(host, f"docker exec {shlex.quote(container)} {cmd} 2>&1", timeout=timeout, user=user)
+    return out or err
@@ -19,9 +19,9 @@ Usage:
 import argparse
 import os
 import sys
-from pathlib import Path
 
-import paramiko
+from _creds import CREDENTIALS_FILE, ENV_FILE, load_credentials, vm_password
+from _ssh_session import get_client
 
 # Allowlist: only these vars are written to the VM .env (no SSH/VM/Cloudflare creds).
 SANDBOX_ENV_ALLOWLIST = [
@@ -72,26 +72,15 @@ SANDBOX_ENV_ALLOWLIST = [
 ]
 
 
-def load_credentials():
-    """Load from .credentials.local and .env.local - never ask user for password."""
-    for fname in (".credentials.local", ".env.local"):
-        creds_file = Path(__file__).parent / fname
-        if creds_file.exists():
-            for line in creds_file.read_text(encoding="utf-8", errors="replace").splitlines():
-                if line and not line.startswith("#") and "=" in line:
-                    key, value = line.split("=", 1)
-                    os.environ[key.strip()] = value.strip().strip('"\'')
-
-
 def main():
     parser = argparse.ArgumentParser(description="Sync .env keys to Sandbox VM")
     parser.add_argument("--no-restart", action="store_true", help="Do not restart website container after sync")
     args = parser.parse_args()
 
-    load_credentials()
+    load_credentials((CREDENTIALS_FILE, ENV_FILE))
     VM_HOST = os.environ.get("SANDBOX_VM_HOST", "192.168.0.187")
     VM_USER = os.environ.get("SANDBOX_VM_USER", os.environ.get("VM_SSH_USER", "mycosoft"))
-    VM_PASS = os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD")
+    VM_PASS = vm_password()
     WEBSITE_DIR = "/opt/mycosoft/website"
 
     if not VM_PASS:
@@ -115,9 +104,7 @@ def main():
     env_content = "\n".join(lines) + "\n"
     print(f"Syncing {len(lines)} env vars to {VM_HOST}:{WEBSITE_DIR}/.env ...")
 
-    client = paramiko.SSHClient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    client.connect(VM_HOST, username=VM_USER, password=VM_PASS, timeout=30)
+    client = get_client(VM_HOST, VM_USER, VM_PASS, timeout=30)
 
     try:
         sftp = client.open_sftp()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Short-TTL local cache for MINDEX information_schema probes (the schema rarely changes)."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from _ssh_cli import DEFAULT_USER, run
+
+CACHE_FILE = Path.home() / ".mycosoft" / "schema_cache.json"
+
+COLUMNS_QUERY = (
+    "SELECT column_name, data_type FROM information_schema.columns "
+    "WHERE table_schema = '{schema}' AND table_name = '{table}' ORDER BY ordinal_position;"
+)
+
+
+def _load() -> Dict[str, Any]:
+    try:
+        return json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(cache: Dict[str, Any]) -> None:
+    """Rewrite the cache atomically so a concurrent reader never sees a half-written file."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_FILE.with_name(f"{CACHE_FILE.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+    os.replace(tmp, CACHE_FILE)
+
+
+def get_columns(
+    host: str,
+    schema: str,
+    table: str,
+    ttl: int = 3600,
+    user: str = DEFAULT_USER,
+    bypass_cache: bool = False,
+) -> List[List[str]]:
+    """[[column_name, data_type], ...] for schema.table on host's mindex-postgres.
+    Served from CACHE_FILE while younger than ttl seconds; failed probes are not cached."""
+    key = f"{host}/{schema}.{table}"
+    cache = _load()
+    entry = cache.get(key)
+    if not bypass_cache and entry and time.time() - entry.get("fetched_at", 0) < ttl:
+        return entry["columns"]
+
+    sql = COLUMNS_QUERY.format(schema=schema, table=table)
+    rc, out, err = run(
+        host,
+        f"""docker exec mindex-postgres psql -U mycosoft -d mindex -At -F '|' -c "{sql}" """,
+        timeout=60,
+        user=user,
+    )
+    if rc != 0:
+        raise RuntimeError(f"schema probe failed for {key}: {(err or out).strip()}")
+    columns = [line.split("|", 1) for line in out.splitlines() if "|" in line]
+    if columns:
+        cache[key] = {"fetched_at": time.time(), "columns": columns}
+        _save(cache)
+    return columns
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Local SSH broker: one long-lived paramiko connection per (host, user), shared across processes.
+
+The first client spawns `python _ssh_broker.py serve` in the background; it listens on a UNIX
+socket and runs each request on a new channel of its pooled transport, so a deploy and a check
+running side by side cost sshd one connection instead of two. Protocol is JSON lines:
+{host, user, cmd, timeout, input, jump_host, stream} -> {rc, stdout, stderr}; with stream set,
+{line} messages carry the output as it arrives before the final reply. A jump_host hop is pooled
+too, so repeat deploys via MAS skip both handshakes. The broker (and every connection it holds)
+exits after IDLE_TIMEOUT seconds without requests. Without UNIX sockets, run() executes in-process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from _ssh_cli import DEFAULT_USER, section_script, split_sections, split_steps, step_script
+
+SOCKET_PATH = Path.home() / ".mycosoft" / "ssh-broker.sock"
+IDLE_TIMEOUT = 600
+SPAWN_WAIT = 5.0
+
+_BROKER_SUPPORTED = hasattr(socket, "AF_UNIX") and os.name != "nt"
+_connect_lock = threading.Lock()
+
+
+def _execute(request: Dict[str, Any], on_line: Optional[Callable[[str], None]] = None) -> Tuple[int, str, str]:
+    """Run one request on the pooled client for its (host, user).
+    With on_line, output (stderr merged) is streamed through stream_lines instead of collected."""
+    from _ssh_session import get_client, stream_lines
+    from _ssh_session import run as run_on
+
+    with _connect_lock:
+        client = get_client(
+            request["host"],
+            request.get("user", DEFAULT_USER),
+            os.environ.get("VM_PASSWORD"),
+            jump_host=request.get("jump_host"),
+        )
+    timeout = request.get("timeout", 60)
+    if on_line is None:
+        return run_on(client, request["cmd"], timeout=timeout, input=request.get("input"))
+    stdin, stdout, _ = client.exec_command(request["cmd"], timeout=timeout)
+    if request.get("input") is not None:
+        stdin.write(request["input"])
+        stdin.flush()
+    stdin.channel.shutdown_write()
+    rc, out = stream_lines(stdout.channel, on_line)
+    return rc, out, ""
+
+
+async def _stream(request: Dict[str, Any], writer: asyncio.StreamWriter) -> Tuple[int, str, str]:
+    """Execute request in a worker thread, relaying each output line to writer as a {line} message."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    future = loop.run_in_executor(
+        None, _execute, request, lambda line: loop.call_soon_threadsafe(queue.put_nowait, line)
+    )
+    # Scheduled after the lines the worker queued, so None marks the end of the output
+    future.add_done_callback(lambda _: queue.put_nowait(None))
+    while (line := await queue.get()) is not None:
+        writer.write(json.dumps({"line": line}).encode("utf-8") + b"\n")
+        await writer.drain()
+    return future.result()
+
+
+async def _serve() -> None:
+    loop = asyncio.get_running_loop()
+    last_activity = time.monotonic()
+    active = 0
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal last_activity, active
+        raw = await reader.readline()
+        if not raw:  # a _broker_alive probe: connected and hung up
+            writer.close()
+            return
+        active += 1
+        try:
+            request = json.loads(raw)
+            if request.get("stream"):
+                rc, out, err = await _stream(request, writer)
+            else:
+                rc, out, err = await loop.run_in_executor(None, _execute, request)
+            reply = {"rc": rc, "stdout": out, "stderr": err}
+        except Exception as e:
+            reply = {"rc": -1, "stdout": "", "stderr": str(e)}
+        finally:
+            active -= 1
+            last_activity = time.monotonic()
+        writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+        await writer.drain()
+        writer.close()
+
+    SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+    # Two clients that found no broker both spawn one: checked and bound under the lock, the second
+    # finds the first listening and exits instead of replacing its socket
+    with _socket_lock():
+        if _broker_alive():
+            return
+        try:
+            SOCKET_PATH.unlink()  # stale, nothing listens on it
+        except FileNotFoundError:
+            pass
+        old_umask = os.umask(0o077)  # socket is owner-only: it runs commands with our credentials
+        try:
+            server = await asyncio.start_unix_server(handle, path=str(SOCKET_PATH))
+        finally:
+            os.umask(old_umask)
+        inode = SOCKET_PATH.stat().st_ino
+    async with server:
+        while active or time.monotonic() - last_activity < IDLE_TIMEOUT:
+            await asyncio.sleep(5)
+        # Only our own socket: if another broker has replaced it, its path stays
+        with _socket_lock():
+            try:
+                if SOCKET_PATH.stat().st_ino == inode:
+                    SOCKET_PATH.unlink()
+            except FileNotFoundError:
+                pass
+
+
+@contextmanager
+def _socket_lock() -> Iterator[None]:
+    """Exclusive lock serialising brokers' checks, binds and unlinks of SOCKET_PATH."""
+    import fcntl  # POSIX only, like the broker itself
+
+    with open(SOCKET_PATH.with_suffix(".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def _broker_alive() -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.connect(str(SOCKET_PATH))
+        return True
+    except OSError:
+        return False
+
+
+def _open_socket() -> socket.socket:
+    """Connect to the broker, spawning it first if nothing is listening."""
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(str(SOCKET_PATH))
+        return sock
+    except OSError:
+        sock.close()
+    subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "serve"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + SPAWN_WAIT
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(SOCKET_PATH))
+            return sock
+        except OSError:
+            sock.close()
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def run(
+    host: str,
+    cmd: str,
+    timeout: int = 60,
+    user: str = DEFAULT_USER,
+    input: Optional[str] = None,
+    jump_host: Optional[str] = None,
+    on_line: Optional[Callable[[str], None]] = None,
+) -> Tuple[int, str, str]:
+    """Run cmd on host (optionally via jump_host) through the broker.
+    Returns (exit_code, stdout, stderr) like _ssh_cli.run; with on_line, each output line
+    (stderr merged into stdout) is handed over as it arrives."""
+    request = {
+        "host": host,
+        "user": user,
+        "cmd": cmd,
+        "timeout": timeout,
+        "input": input,
+        "jump_host": jump_host,
+        "stream": on_line is not None,
+    }
+    if not _BROKER_SUPPORTED:
+        try:
+            return _execute(request, on_line)
+        except Exception as e:
+            return -1, "", str(e)
+    try:
+        with _open_socket() as sock:
+            # A stream is bounded by the broker's no-progress watchdog rather than by timeout
+            sock.settimeout(None if on_line is not None else timeout + 30)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            reply = None
+            for raw in sock.makefile("rb"):
+                reply = json.loads(raw)
+                if "line" not in reply:
+                    break
+                on_line(reply["line"])
+                reply = None
+    except (OSError, ValueError) as e:
+        return -1, "", f"ssh broker unavailable: {e}"
+    if not reply:
+        return -1, "", "ssh broker closed the connection"
+    return reply["rc"], reply["stdout"], reply["stderr"]
+
+
+def run_sections(
+    host: str,
+    commands: Sequence[str],
+    timeout: int = 120,
+    user: str = DEFAULT_USER,
+    jump_host: Optional[str] = None,
+) -> List[str]:
+    """Run commands in one remote `bash -s` via the broker and return each command's output."""
+    _, out, _ = run(
+        host, "bash -s", timeout=timeout, user=user, input=section_script(commands), jump_host=jump_host
+    )
+    return split_sections(out, len(commands))
+
+
+def run_steps(
+    host: str,
+    steps: Sequence[Tuple[str, str]],
+    timeout: int = 1200,
+    fail_fast: bool = True,
+    user: str = DEFAULT_USER,
+    jump_host: Optional[str] = None,
+    on_line: Optional[Callable[[str], None]] = None,
+) -> Tuple[int, List[Tuple[str, str]]]:
+    """_ssh_session.run_steps through the broker. If nothing ran (connect/broker failure) the
+    result holds a single ("connect", error) entry."""
+    rc, out, err = run(
+        host,
+        "bash -s",
+        timeout=timeout,
+        user=user,
+        input=step_script(steps, fail_fast),
+        jump_host=jump_host,
+        on_line=on_line,
+    )
+    results = split_steps(out)
+    if rc != 0 and not results:
+        results = [("connect", err)]
+    return rc, results
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["serve"]:
+        asyncio.run(_serve())
+    else:
+        print(f"usage: {sys.argv[0]} serve")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""OpenSSH CLI runner with ControlMaster multiplexing for key-authenticated hosts.
+
+The first command to a host opens a master connection; later commands (in this or any other
+process) reuse its Unix socket instead of paying a fresh TCP + KEX + auth handshake.
+Paramiko cannot do this, so hosts that still require password auth stay on _ssh_session.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+DEFAULT_USER = "mycosoft"
+SOCKET_DIR = Path.home() / ".mycosoft" / "ssh-sockets"
+SECTION_DELIMITER = "---SECTION---"
+STEP_MARKER = "###STEP:"
+
+# Win32-OpenSSH has no ControlMaster support; fall back to plain ssh there.
+_MUX_SUPPORTED = os.name != "nt"
+_swept = False
+
+
+def _sweep_stale_sockets() -> None:
+    """Create SOCKET_DIR and drop control sockets whose master process is gone (once per process)."""
+    global _swept
+    if _swept:
+        return
+    _swept = True
+    SOCKET_DIR.mkdir(parents=True, exist_ok=True)
+    for entry in os.scandir(SOCKET_DIR):
+        if not entry.name.startswith("cm-"):
+            continue
+        check = subprocess.run(
+            ["ssh", "-o", f"ControlPath={entry.path}", "-O", "check", "stale-check"],
+            capture_output=True,
+            timeout=10,
+        )
+        if check.returncode != 0:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+
+def ssh_command(host: str, user: str = DEFAULT_USER) -> List[str]:
+    """Base argv for an ssh invocation that reuses (or opens) the multiplexed master for host."""
+    argv = ["ssh", "-o", "BatchMode=yes"]
+    if os.environ.get("VM_SSH_KEY"):
+        argv += ["-i", os.environ["VM_SSH_KEY"], "-o", "IdentitiesOnly=yes"]
+    if _MUX_SUPPORTED:
+        _sweep_stale_sockets()
+        # %C hashes host/port/user so the path stays well under the 108-char sun_path limit.
+        argv += [
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={SOCKET_DIR}/cm-%C",
+            "-o", "ControlPersist=10m",
+        ]
+    return argv + [f"{user}@{host}"]
+
+
+def run(
+    host: str,
+    cmd: str,
+    timeout: int = 60,
+    user: str = DEFAULT_USER,
+    input: Optional[str] = None,
+) -> Tuple[int, str, str]:
+    """Run cmd on host over the multiplexed connection. Returns (exit_code, stdout, stderr)."""
+    try:
+        result = subprocess.run(
+            ssh_command(host, user) + [cmd],
+            input=input,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=timeout,
+        )
+        return result.returncode, result.stdout, result.stderr
+    except subprocess.TimeoutExpired:
+        return -1, "", "Command timed out"
+    except Exception as e:
+        return -1, "", str(e)
+
+
+async def run_async(
+    host: str,
+    cmd: str,
+    timeout: int = 60,
+    user: str = DEFAULT_USER,
+) -> Tuple[int, str, str]:
+    """asyncio variant of run(); concurrent calls become parallel channels on the shared master."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *ssh_command(host, user),
+            cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except Exception as e:
+        return -1, "", str(e)
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return -1, "", "Command timed out"
+    return proc.returncode, out.decode("utf-8", errors="replace"), err.decode("utf-8", errors="replace")
+
+
+async def gather_runs(
+    host: str,
+    commands: Sequence[str],
+    timeout: int = 60,
+    user: str = DEFAULT_USER,
+) -> List[Tuple[int, str, str]]:
+    """Run commands concurrently on host; results come back in the order given."""
+    if _MUX_SUPPORTED:
+        # Open the master first so the concurrent ssh processes attach to it instead of each racing to become one.
+        await run_async(host, "true", timeout=timeout, user=user)
+    return list(await asyncio.gather(*(run_async(host, cmd, timeout=timeout, user=user) for cmd in commands)))
+
+
+def section_script(commands: Sequence[str]) -> str:
+    """Join commands into one bash script that prints SECTION_DELIMITER between their (merged) outputs."""
+    return f"\necho '{SECTION_DELIMITER}'\n".join(f"{{ {cmd}\n}} 2>&1" for cmd in commands) + "\n"
+
+
+def split_sections(out: str, count: int) -> List[str]:
+    """Split section_script output back into count stripped sections (padded if the script died early)."""
+    sections = [section.strip() for section in out.split(SECTION_DELIMITER)]
+    return sections + [""] * (count - len(sections))
+
+
+def step_script(steps: Sequence[Tuple[str, str]], fail_fast: bool = True) -> str:
+    """One bash script running (label, cmd) steps in order, each preceded by a STEP_MARKER line.
+    With fail_fast the script stops (set -e) at the first failing step; its label is the last marker."""
+    lines = ["set -e"] if fail_fast else []
+    for label, cmd in steps:
+        lines.append(f"echo '{STEP_MARKER}{label}'")
+        lines.append(f"{{ {cmd}\n}} 2>&1")
+    return "\n".join(lines) + "\n"
+
+
+def split_steps(out: str) -> List[Tuple[str, str]]:
+    """Parse step_script output into [(label, stripped output), ...] for the steps that started."""
+    steps: List[Tuple[str, List[str]]] = []
+    for line in out.splitlines():
+        if line.startswith(STEP_MARKER):
+            steps.append((line[len(STEP_MARKER):].strip(), []))
+        elif steps:
+            steps[-1][1].append(line)
+    return [(label, "\n".join(lines).strip()) for label, lines in steps]
+
+
+def run_sections(
+    host: str,
+    commands: Sequence[str],
+    timeout: int = 120,
+    user: str = DEFAULT_USER,
+) -> List[str]:
+    """Run commands in one remote `bash -s` and return each command's output."""
+    _, out, _ = run(host, "bash -s", timeout=timeout, user=user, input=section_script(commands))
+    return split_sections(out, len(commands))
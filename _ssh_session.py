@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""Process-wide paramiko SSH client pool shared by the check/deploy scripts."""
+
+from __future__ import annotations
+
+import atexit
+import codecs
+import functools
+import http.client
+import os
+import select
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import paramiko
+
+from _ssh_cli import section_script, split_sections, split_steps, step_script
+
+_clients: Dict[Tuple[str, str], paramiko.SSHClient] = {}
+# Stateless, so every client (and every connect retry) shares one
+_HOST_KEY_POLICY = paramiko.AutoAddPolicy()
+
+KEEPALIVE_INTERVAL = 15
+# A build that prints nothing for this long is treated as hung (OOM thrash, stalled npm fetch, ...)
+NO_PROGRESS_TIMEOUT = int(os.environ.get("BUILD_NO_PROGRESS_TIMEOUT_SECS", "1800"))
+WINDOW_SIZE = 3 * 1024 * 1024
+MAX_PACKET_SIZE = 32768
+# Kernel socket buffers sized to hold a full channel window (the kernel clamps to net.core.[rw]mem_max)
+SOCKET_BUFFER_SIZE = 4 * 1024 * 1024
+CONNECT_ATTEMPTS = 5
+
+
+def default_key_path() -> Path:
+    """Private key the scripts authenticate with: VM_SSH_KEY, else ~/.ssh/id_ed25519 (see _install_ssh_key.py)."""
+    return Path(os.environ.get("VM_SSH_KEY") or Path.home() / ".ssh" / "id_ed25519").expanduser()
+
+
+@functools.lru_cache(maxsize=None)
+def _load_key(path: Path) -> Optional[paramiko.PKey]:
+    """Parse an unencrypted ed25519 key once per process; None if missing or another type."""
+    try:
+        return paramiko.Ed25519Key.from_private_key_file(str(path))
+    except (OSError, paramiko.SSHException):
+        return None
+
+
+def auth_kwargs(password: Optional[str] = None) -> Dict[str, Any]:
+    """connect() kwargs for key auth. An ed25519 key (default_key_path) is offered first, so auth is a
+    single round-trip after kex; ssh-agent and ~/.ssh/id_* keys are only searched when it is missing.
+    A password is the last resort, offered only when passed in or VM_SSH_PASSWORD is set.
+    banner_timeout bounds the wait for sshd's banner so a wedged VM fails fast instead of hanging."""
+    path = default_key_path()
+    pkey = _load_key(path)
+    return {
+        "pkey": pkey,
+        "key_filename": str(path) if pkey is None and path.exists() else None,
+        "look_for_keys": pkey is None,
+        "allow_agent": pkey is None,
+        "auth_timeout": 5,
+        "banner_timeout": 10,
+        "password": password or os.environ.get("VM_SSH_PASSWORD") or None,
+    }
+
+
+def tune_transport(client: paramiko.SSHClient) -> paramiko.SSHClient:
+    """Keep an idle connection alive through firewalls and widen the window for channels opened after this
+    (paramiko's default window throttles bulk reads such as `docker logs --tail 1000`)."""
+    transport = client.get_transport()
+    if transport is not None:
+        transport.set_keepalive(KEEPALIVE_INTERVAL)
+        transport.default_window_size = WINDOW_SIZE
+        transport.default_max_packet_size = MAX_PACKET_SIZE
+    return client
+
+
+def open_socket(host: str, port: int = 22, timeout: Optional[float] = None) -> socket.socket:
+    """TCP connection for a transport with Nagle off, so small exec requests and replies aren't held back
+    waiting for an ACK, and socket buffers large enough for a full WINDOW_SIZE in flight."""
+    sock = socket.create_connection((host, port), timeout=timeout)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+    return sock
+
+
+def connect(
+    host: str,
+    user: str,
+    password: Optional[str] = None,
+    timeout: int = 10,
+    jump: Optional[paramiko.SSHClient] = None,
+    attempts: int = CONNECT_ATTEMPTS,
+) -> paramiko.SSHClient:
+    """New keepalive-tuned client for host, tunnelled through a direct-tcpip channel on jump if given.
+    Refused/reset connections and banner errors (sshd still starting after a reboot) are retried with
+    exponential backoff, 0.25s doubling to 2s; auth failures and timeouts are raised straight away."""
+    for attempt in range(attempts):
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(_HOST_KEY_POLICY)
+        try:
+            if jump is not None:
+                sock = jump.get_transport().open_channel("direct-tcpip", (host, 22), ("127.0.0.1", 0))
+            else:
+                sock = open_socket(host, timeout=timeout)
+            client.connect(host, username=user, timeout=timeout, sock=sock, **auth_kwargs(password))
+            return tune_transport(client)
+        except (paramiko.AuthenticationException, socket.timeout):
+            client.close()
+            raise
+        except (paramiko.SSHException, OSError, EOFError):
+            client.close()
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.25 * 2 ** attempt)
+    raise ValueError("attempts must be at least 1")
+
+
+def get_client(
+    host: str,
+    user: str,
+    password: Optional[str] = None,
+    timeout: int = 30,
+    jump_host: Optional[str] = None,
+) -> paramiko.SSHClient:
+    """Return a connected SSHClient for (host, user), reusing the pooled one while its transport is alive.
+    Authenticates with keys/agent first; see auth_kwargs for the password fallback.
+    With jump_host, tunnels through a direct-tcpip channel on the (also pooled) jump client."""
+    key = (host, user)
+    client = _clients.get(key)
+    if client is not None:
+        transport = client.get_transport()
+        if transport is not None and transport.is_active():
+            return client
+        client.close()
+
+    jump = get_client(jump_host, user, password, timeout) if jump_host is not None else None
+    client = connect(host, user, password, timeout, jump=jump)
+    _clients[key] = client
+    return client
+
+
+def read_all(stdout: paramiko.ChannelFile, timeout: Optional[float] = None) -> str:
+    """Drain a command's stdout in 64 KiB recv chunks, decoding incrementally.
+    Stays interruptible (0.1s recv timeout) and stops at EOF, exit, or after timeout seconds."""
+    channel = stdout.channel
+    channel.settimeout(0.1)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    deadline = None if timeout is None else time.monotonic() + timeout
+    parts: List[str] = []
+    while True:
+        try:
+            data = channel.recv(65536)
+        except socket.timeout:
+            if channel.exit_status_ready() and not channel.recv_ready():
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            continue
+        if not data:
+            break
+        parts.append(decoder.decode(data))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def read_streams(channel: paramiko.Channel, timeout: Optional[float] = None) -> Tuple[str, str]:
+    """Drain stdout and stderr together until exit/EOF (or timeout seconds); returns (stdout, stderr).
+    Reading one stream to the end before the other lets unread data in the other exhaust the channel
+    window, which blocks the remote command (e.g. `docker build` progress on stderr) indefinitely."""
+    out_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    err_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    deadline = None if timeout is None else time.monotonic() + timeout
+    out: List[str] = []
+    err: List[str] = []
+    while True:
+        select.select([channel], [], [], 0.1)
+        # Sampled before draining: output always precedes exit status/EOF, so nothing is left behind
+        finished = channel.exit_status_ready() or channel.eof_received
+        received = False
+        while channel.recv_ready():
+            out.append(out_decoder.decode(channel.recv(65536)))
+            received = True
+        while channel.recv_stderr_ready():
+            err.append(err_decoder.decode(channel.recv_stderr(65536)))
+            received = True
+        if received:
+            continue
+        if finished:
+            break
+        if deadline is not None and time.monotonic() > deadline:
+            break
+    out.append(out_decoder.decode(b"", final=True))
+    err.append(err_decoder.decode(b"", final=True))
+    return "".join(out), "".join(err)
+
+
+def stream_lines(
+    channel: paramiko.Channel,
+    on_line: Callable[[str], None],
+    no_progress_timeout: Optional[int] = None,
+    keep_output: bool = True,
+) -> Tuple[int, str]:
+    """Hand each output line (stdout, then any stderr) to on_line as it arrives; returns (exit_code, output).
+    If nothing arrives for no_progress_timeout seconds (default NO_PROGRESS_TIMEOUT) the channel is
+    closed, a diagnostic line is emitted and exit_code is -1. keep_output=False drops each chunk once
+    handed over (output is then ""), so a long build log is never held in memory."""
+    if no_progress_timeout is None:
+        no_progress_timeout = NO_PROGRESS_TIMEOUT
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parts: List[str] = []
+    pending = ""
+    last_progress = time.monotonic()
+    while True:
+        select.select([channel], [], [], 1.0)
+        finished = channel.exit_status_ready() or channel.eof_received
+        text = ""
+        while channel.recv_ready():
+            text += decoder.decode(channel.recv(65536))
+        while channel.recv_stderr_ready():
+            text += decoder.decode(channel.recv_stderr(65536))
+        if text:
+            last_progress = time.monotonic()
+            if keep_output:
+                parts.append(text)
+            *lines, pending = (pending + text).split("\n")
+            for line in lines:
+                on_line(line.rstrip("\r"))
+        elif finished:
+            break
+        elif time.monotonic() - last_progress > no_progress_timeout:
+            channel.close()
+            if pending:
+                on_line(pending)
+            on_line(
+                f"No output for {no_progress_timeout}s - aborting, the build looks hung. "
+                "Check `docker info` and `free -m` on the VM for memory/CPU pressure "
+                "(raise BUILD_NO_PROGRESS_TIMEOUT_SECS if it is just slow)."
+            )
+            return -1, "".join(parts)
+    if pending:
+        on_line(pending.rstrip("\r"))
+    return channel.recv_exit_status(), "".join(parts)
+
+
+def stream_exec(
+    client: paramiko.SSHClient,
+    cmd: str,
+    timeout: int = 60,
+    on_line: Optional[Callable[[str], None]] = None,
+    keep_output: bool = True,
+) -> Tuple[int, str]:
+    """Run cmd on a new channel, handing each output line (stderr merged) to on_line (default: print)
+    as it arrives instead of blocking on read(). timeout is a no-progress limit: a command silent
+    for that long is aborted with exit_code -1. Returns (exit_code, output) as stream_lines does."""
+    channel = client.get_transport().open_session()
+    channel.exec_command(cmd)
+    channel.shutdown_write()
+    if on_line is None:
+        on_line = functools.partial(print, flush=True)
+    return stream_lines(channel, on_line, no_progress_timeout=timeout, keep_output=keep_output)
+
+
+def run(
+    client: paramiko.SSHClient,
+    cmd: str,
+    timeout: int = 60,
+    input: Optional[str] = None,
+) -> Tuple[int, str, str]:
+    """Run cmd on a new channel of client's transport. Returns (exit_code, stdout, stderr) like _ssh_cli.run."""
+    stdin, stdout, stderr = client.exec_command(cmd, timeout=timeout)
+    if input is not None:
+        stdin.write(input)
+        stdin.flush()
+    stdin.channel.shutdown_write()
+    started = time.monotonic()
+    out, err = read_streams(stdout.channel, timeout)
+    # EOF can arrive before the exit status, so only a read that ran out the clock counts as a timeout.
+    if not stdout.channel.exit_status_ready() and time.monotonic() - started >= timeout:
+        stdout.channel.close()
+        return -1, out, "Command timed out"
+    return stdout.channel.recv_exit_status(), out, err
+
+
+def gather(client: paramiko.SSHClient, commands: Sequence[str], timeout: int = 60) -> List[Tuple[int, str, str]]:
+    """run() independent commands concurrently, one channel (and thread) each; results in input order.
+    N checks then cost one round-trip of latency instead of N."""
+    with ThreadPoolExecutor(max_workers=max(len(commands), 1)) as pool:
+        return list(pool.map(lambda cmd: run(client, cmd, timeout), commands))
+
+
+def run_sections(client: paramiko.SSHClient, commands: Sequence[str], timeout: int = 120) -> List[str]:
+    """Run commands in one remote `bash -s` (single channel) and return each command's output.
+    stderr is merged into each section; see _ssh_cli.section_script for the script layout."""
+    stdin, stdout, stderr = client.exec_command("bash -s", timeout=timeout)
+    stdin.write(section_script(commands))
+    stdin.flush()
+    stdin.channel.shutdown_write()
+    return split_sections(read_all(stdout, timeout), len(commands))
+
+
+def run_steps(
+    client: paramiko.SSHClient,
+    steps: Sequence[Tuple[str, str]],
+    timeout: int = 1200,
+    fail_fast: bool = True,
+    on_line: Optional[Callable[[str], None]] = None,
+) -> Tuple[int, List[Tuple[str, str]]]:
+    """Run labelled steps in one remote `bash -s` (see _ssh_cli.step_script).
+    Returns (exit_code, [(label, output), ...]); on failure the last entry is the step that failed.
+    With on_line, output (STEP_MARKER lines included) is streamed through stream_lines as it arrives."""
+    stdin, stdout, stderr = client.exec_command("bash -s", timeout=timeout)
+    stdin.write(step_script(steps, fail_fast))
+    stdin.flush()
+    stdin.channel.shutdown_write()
+    if on_line is not None:
+        exit_code, out = stream_lines(stdout.channel, on_line)
+        return exit_code, split_steps(out)
+    out = read_all(stdout, timeout)
+    return stdout.channel.recv_exit_status(), split_steps(out)
+
+
+def sftp_tail(sftp: paramiko.SFTPClient, path: str, lines: int = 50, max_bytes: int = 64 * 1024) -> Optional[str]:
+    """Last lines of a remote file read over an open SFTP session (None if it doesn't exist): one
+    prefetched read of the final max_bytes, no remote `tail` process or extra exec channel."""
+    try:
+        with sftp.open(path, "rb") as f:
+            size = f.stat().st_size
+            f.seek(max(0, size - max_bytes))
+            f.prefetch(size)
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    return "\n".join(data.decode("utf-8", errors="replace").splitlines()[-lines:])
+
+
+class ChannelHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection to host:port as seen from the VM, carried over a direct-tcpip channel of client's
+    transport: no local port forward and no remote curl. Keep-alive reuses the channel across requests."""
+
+    def __init__(self, client: paramiko.SSHClient, host: str = "127.0.0.1", port: int = 3000, timeout: float = 30):
+        super().__init__(host, port, timeout=timeout)
+        self._client = client
+
+    def connect(self) -> None:
+        self.sock = self._client.get_transport().open_channel(
+            "direct-tcpip", (self.host, self.port), ("127.0.0.1", 0), timeout=self.timeout
+        )
+        self.sock.settimeout(self.timeout)
+
+
+def http_probe(client: paramiko.SSHClient, pages: Sequence[str], port: int = 3000, timeout: float = 30) -> List[Tuple[str, str]]:
+    """(page, status code) for each GET http://127.0.0.1:port<page> on the VM, like _docker_events.parse_probes;
+    all requests share one keep-alive connection. A page that fails to answer is 000."""
+    conn = ChannelHTTPConnection(client, port=port, timeout=timeout)
+    results = []
+    try:
+        for page in pages:
+            try:
+                conn.request("GET", page)
+                response = conn.getresponse()
+                response.read()
+                results.append((page, str(response.status)))
+            except (http.client.HTTPException, paramiko.SSHException, OSError):
+                conn.close()  # the next request reconnects on a fresh channel
+                results.append((page, "000"))
+    finally:
+        conn.close()
+    return results
+
+
+def _close_all() -> None:
+    """Close every pooled client (registered with atexit)."""
+    for client in _clients.values():
+        try:
+            client.close()
+        except Exception:
+            pass
+    _clients.clear()
+
+
+atexit.register(_close_all)
@@ -1,16 +1,10 @@
 #!/usr/bin/env python3
-import os, paramiko
-from pathlib import Path
-creds = Path(__file__).parent / ".credentials.local"
-if creds.exists():
-    for line in creds.read_text().splitlines():
-        if "=" in line and not line.startswith("#"):
-            k, v = line.split("=", 1)
-            os.environ[k.strip()] = v.strip()
+import os
+from _creds import load_credentials
+from _ssh_session import get_client
+load_credentials()
 p = os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD")
-ssh = paramiko.SSHClient()
-ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-ssh.connect("192.168.0.187", username="mycosoft", password=p, timeout=15)
+ssh = get_client("192.168.0.187", "mycosoft", p, timeout=15)
 def run(c):
     i, o, e = ssh.exec_command(c, 10)
     return o.channel.recv_exit_status(), o.read().decode(), e.read().decode()
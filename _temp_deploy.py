@@ -4,19 +4,28 @@ import paramiko
 import time
 import sys
 
+from _docker_build import REGISTRY_IMAGE, RUN_COMMAND, build_command, pull_command
+from _docker_events import wait_for_healthy
+from _ssh_session import auth_kwargs, tune_transport
+
 host = '192.168.0.187'
 user = 'mycosoft'
-password = 'REDACTED_VM_SSH_PASSWORD'
 
 ssh = paramiko.SSHClient()
 ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-ssh.connect(host, username=user, password=password, timeout=30)
+ssh.connect(host, username=user, timeout=30, **auth_kwargs())
+tune_transport(ssh)
 
 print('Connected to VM 187')
 
-# Run the Docker build with background execution and polling
-print('\n>>> Starting Docker build (this may take several minutes)...')
-build_cmd = 'cd /opt/mycosoft/website && docker build -t mycosoft-always-on-mycosoft-website:latest --no-cache . 2>&1 | tail -20'
+# Pull the image _build_and_push.py pushed; --local-build builds on the VM instead (air-gapped/no registry)
+if '--local-build' in sys.argv[1:]:
+    print('\n>>> Starting Docker build (this may take several minutes)...')
+    # Cached BuildKit build (FORCE_REBUILD=1 for --no-cache)
+    build_cmd = f'{{ {build_command()}; }} 2>&1 | tail -20'
+else:
+    print(f'\n>>> Pulling {REGISTRY_IMAGE}...')
+    build_cmd = f'{pull_command()} 2>&1'
 
 # Use a channel for long-running command
 channel = ssh.get_transport().open_session()
@@ -54,10 +63,7 @@ print(stdout.read().decode())
 
 # Start new container with NAS mount
 print('\n>>> Starting new container with NAS mount...')
-run_cmd = '''docker run -d --name mycosoft-website -p 3000:3000 \
-  -v /opt/mycosoft/media/website/assets:/app/public/assets:ro \
-  --restart unless-stopped mycosoft-always-on-mycosoft-website:latest'''
-stdin, stdout, stderr = ssh.exec_command(run_cmd, timeout=60)
+stdin, stdout, stderr = ssh.exec_command(RUN_COMMAND, timeout=60)
 container_id = stdout.read().decode().strip()
 err = stderr.read().decode()
 if container_id:
@@ -65,9 +71,10 @@ if container_id:
 if err:
     print(f'Error: {err}')
 
-# Wait for container to start
-print('\nWaiting 15 seconds for container to start...')
-time.sleep(15)
+# Wait for the container's HEALTHCHECK instead of a fixed sleep
+print('\nWaiting for container health...')
+stdin, stdout, stderr = ssh.exec_command(wait_for_healthy(), timeout=60)
+print(f'Health: {stdout.read().decode().strip()}')
 
 # Test health endpoint
 print('\n>>> Testing health endpoint...')
@@ -1,26 +1,12 @@
 #!/usr/bin/env python3
-"""Test MINDEX unified search API directly"""
-import requests
+"""Test MINDEX unified search API directly
 
-try:
-    # Test MINDEX directly
-    r = requests.get(
-        "http://${MINDEX_VM_HOST:-localhost}:8000/api/mindex/unified-search",
-        params={"q": "Amanita", "limit": 5},
-        timeout=30
-    )
-    d = r.json()
-    print(f"MINDEX Status: {r.status_code}")
-    print(f"Taxa: {len(d.get('taxa', []))}")
-    print(f"Compounds: {len(d.get('compounds', []))}")
-    print(f"Genetics: {len(d.get('genetics', []))}")
-    
-    if d.get('taxa'):
-        print(f"\nTaxa sample: {d['taxa'][0]}")
-    if d.get('compounds'):
-        print(f"\nCompound sample: {d['compounds'][0]}")
-    if d.get('genetics'):
-        print(f"\nGenetics sample: {d['genetics'][0]}")
-        
-except Exception as e:
-    print(f"Error: {e}")
+Thin wrapper around `python sandbox.py test-mindex` (search terms pass through).
+"""
+
+import sys
+
+from sandbox import main
+
+if __name__ == "__main__":
+    sys.exit(main(["test-mindex", *sys.argv[1:]]))
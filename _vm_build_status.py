@@ -1,26 +1,19 @@
 """Quick VM check: build exit file and container status. Load .credentials.local then run."""
 import os
 import sys
-from pathlib import Path
+from _creds import load_credentials
 
-# Load credentials
-creds = Path(__file__).resolve().parent / ".credentials.local"
-if creds.exists():
-    for line in creds.read_text().splitlines():
-        if line and not line.startswith("#") and "=" in line:
-            k, v = line.split("=", 1)
-            os.environ[k.strip()] = v.strip()
+load_credentials()
 
-pw = os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD") or ""
-if not pw:
-    print("No VM_PASSWORD or VM_SSH_PASSWORD in .credentials.local")
-    sys.exit(1)
+pw = os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD")
 
 import paramiko
+from _ssh_session import auth_kwargs, tune_transport
 c = paramiko.SSHClient()
 c.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 try:
-    c.connect("192.168.0.187", username="mycosoft", password=pw, timeout=60)
+    c.connect("192.168.0.187", username="mycosoft", timeout=60, **auth_kwargs(pw))
+    tune_transport(c)
 except Exception as e:
     print("SSH connect failed:", e)
     sys.exit(2)
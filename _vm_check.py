@@ -1,23 +1,15 @@
 #!/usr/bin/env python3
 """One-off: check VM build exit, log tail, container status."""
 import os
-import paramiko
-from pathlib import Path
+from _creds import CREDENTIALS_FILE, ENV_FILE, load_credentials
+from _ssh_session import get_client
 
-for f in (".credentials.local", ".env.local"):
-    p = Path(__file__).parent / f
-    if p.exists():
-        for line in p.read_text().splitlines():
-            if line and not line.startswith("#") and "=" in line:
-                k, v = line.split("=", 1)
-                os.environ[k.strip()] = v.strip().strip("'\"")
+load_credentials((CREDENTIALS_FILE, ENV_FILE))
 pw = os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD")
 if not pw:
     print("No VM_PASSWORD")
     exit(1)
-c = paramiko.SSHClient()
-c.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-c.connect("192.168.0.187", username="mycosoft", password=pw, timeout=15)
+c = get_client("192.168.0.187", "mycosoft", pw, timeout=15)
 
 def run(cmd):
     i, o, e = c.exec_command(cmd, timeout=20)
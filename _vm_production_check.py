@@ -2,21 +2,14 @@
 """Quick check on VM 187: build status, container, assets path. No deploy."""
 import os
 import sys
-from pathlib import Path
-
-# Load credentials like _rebuild_sandbox.py
-for fname in (".credentials.local", ".env.local"):
-    f = Path(__file__).parent / fname
-    if f.exists():
-        for line in f.read_text().splitlines():
-            if line and not line.startswith("#") and "=" in line:
-                k, v = line.split("=", 1)
-                os.environ[k.strip()] = v.strip().strip('"\'')
+from _creds import CREDENTIALS_FILE, ENV_FILE, load_credentials
+
+load_credentials((CREDENTIALS_FILE, ENV_FILE))
 VM_PASS = os.environ.get("VM_PASSWORD") or os.environ.get("VM_SSH_PASSWORD")
 if not VM_PASS:
     print("No VM_PASSWORD in .credentials.local"); sys.exit(1)
 
-import paramiko
+from _ssh_session import get_client
 VM_HOST = "192.168.0.187"
 VM_USER = os.environ.get("VM_SSH_USER", "mycosoft")
 
@@ -25,9 +18,7 @@ def run(ssh, cmd, timeout=30):
     code = out.channel.recv_exit_status()
     return code, out.read().decode(errors="replace").strip(), err.read().decode(errors="replace").strip()
 
-client = paramiko.SSHClient()
-client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-client.connect(VM_HOST, username=VM_USER, password=VM_PASS, timeout=30)
+client = get_client(VM_HOST, VM_USER, VM_PASS, timeout=30)
 
 print("=== Build status ===")
 code, out, _ = run(client, "test -f /tmp/rebuild_build.exit && cat /tmp/rebuild_build.exit")
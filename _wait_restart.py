@@ -4,89 +4,61 @@ Feb 5, 2026
 """
 
 import os
-import paramiko
-import sys
 import time
 from _cloudflare_cache import purge_everything
+from _docker_build import RUN_COMMAND, ensure_image_command
+from _docker_events import http_ok, parse_probes, probe_pages, wait_for_exit, wait_for_healthy
+from _remote import run, run_steps
 
-# Load credentials from environment variables
+# Key auth over the shared OpenSSH ControlMaster: every step reuses one connection
 HOST = os.environ.get("SANDBOX_VM_HOST", "192.168.0.187")
 USER = os.environ.get("SANDBOX_VM_USER", "mycosoft")
-PASS = os.environ.get("VM_PASSWORD")
 
-if not PASS:
-    print("ERROR: VM_PASSWORD environment variable is not set.")
-    print("Please set it with: $env:VM_PASSWORD = 'your-password'")
-    sys.exit(1)
 
-def run_cmd(ssh, cmd):
-    """Simple command runner"""
-    channel = ssh.get_transport().open_session()
-    channel.settimeout(30)
-    channel.exec_command(cmd)
-    while not channel.exit_status_ready():
-        time.sleep(0.5)
-    out = b""
-    while channel.recv_ready():
-        out += channel.recv(4096)
-    exit_code = channel.recv_exit_status()
-    channel.close()
-    try:
-        return out.decode("utf-8", errors="replace").strip(), exit_code
-    except:
-        return str(out), exit_code
+def run_cmd(cmd, timeout=30):
+    """Run cmd over the shared ControlMaster connection; returns (output, exit_code)"""
+    code, out, _ = run(HOST, cmd, timeout=timeout, user=USER)
+    return out.strip(), code
 
 def main():
-    print("Connecting...")
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    ssh.connect(HOST, username=USER, password=PASS)
-    print("Connected!")
-    
-    # Wait for builds to finish
+    # Wait for builds to finish: tail --pid blocks on the build itself instead of polling every 5s
     print("\nWaiting for Docker builds to complete...")
-    for i in range(180):  # 15 minutes max
-        out, _ = run_cmd(ssh, "ps aux | grep 'docker build' | grep -v grep | wc -l")
-        count = out.strip()
-        if count == "0":
-            print(f"\nBuild completed! (waited ~{i*5}s)")
-            break
-        if i % 12 == 0:
-            print(f"  Building... (count={count}, {i*5}s)")
-        time.sleep(5)
+    started = time.monotonic()
+    out, _ = run_cmd(wait_for_exit(timeout=900), timeout=930)  # 15 minutes max
+    if out == "0":
+        print(f"\nBuild completed! (waited ~{time.monotonic() - started:.0f}s)")
     else:
         print("Build still running after 15 min, proceeding anyway...")
     
-    # Restart container
-    print("\nStopping old container...")
-    run_cmd(ssh, "docker stop mycosoft-website 2>/dev/null || true")
-    
-    print("Removing old container...")
-    run_cmd(ssh, "docker rm mycosoft-website 2>/dev/null || true")
-    
-    print("Starting new container...")
-    out, code = run_cmd(ssh, """docker run -d --name mycosoft-website -p 3000:3000 \
-        -v /opt/mycosoft/media/website/assets:/app/public/assets:ro \
-        --restart unless-stopped \
-        mycosoft-always-on-mycosoft-website:latest""")
-    
-    if code == 0:
-        print(f"Container started: {out[:12]}")
-    else:
-        print(f"Error: {out}")
+    # Stop, start, health and page probes as one remote script: one channel instead of one per command.
+    # Only a failed start ends it early (not set -e: the health poll expects docker inspect to fail at first).
+    print("\nRestarting container...")
+    code, steps = run_steps(HOST, [
+        # The image check (and pull, if it is missing) overlaps the stop/rm
+        ("stop", f"( {ensure_image_command()} ) >/dev/null 2>&1 & image=$!; "
+                 "docker stop mycosoft-website 2>/dev/null; docker rm mycosoft-website 2>/dev/null; "
+                 "wait $image || echo 'Image missing and could not be pulled'"),
+        ("start", f"{RUN_COMMAND} || exit $?"),
+        ("health", wait_for_healthy()),
+        ("pages", probe_pages()),
+    ], timeout=510, fail_fast=False, user=USER)
+    results = dict(steps)
+    if results.get("stop"):
+        print(f"  {results['stop']}")
+
+    if code != 0:
+        failed, out = steps[-1]
+        print(f"Error ({failed}): {out}")
         return
-    
-    # Wait and test
-    print("\nWaiting for container...")
-    time.sleep(10)
-    
+    print(f"Container started: {results.get('start', '')[:12]}")
+
+    print(f"  Health: {results.get('health', '')}")
+
     print("\nTesting pages...")
-    for page in ["/", "/test-fluid-search", "/api/search/unified?q=test"]:
-        out, _ = run_cmd(ssh, f"curl -s -o /dev/null -w '%{{http_code}}' http://localhost:3000{page}")
-        status = "OK" if out == "200" else "FAIL"
+    for page, out in parse_probes(results.get("pages", "")):
+        status = "OK" if http_ok(out) else "FAIL"
         print(f"  {status}: {page} -> HTTP {out}")
     
-    ssh.close()
     print("\nDone!")
     purge_everything()
 
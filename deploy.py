@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Deploy the website to the Sandbox VM. One entry point for the former _deploy_sandbox*.py scripts:
+
+    python deploy.py restart   # compose restart, no rebuild             (_deploy_sandbox.py)
+                               #   --docker-context: local docker CLI, no paramiko
+    python deploy.py simple    # build the VM checkout, via MAS           (_deploy_sandbox_simple.py)
+    python deploy.py rebuild   # as simple, a failed cached build retries clean (_deploy_sandbox_rebuild.py)
+    python deploy.py robust    # pull + build, straight to Sandbox        (_deploy_to_sandbox_robust.py)
+    python deploy.py via-mas   # pull + build via MAS, state shown first  (_deploy_via_mas_jump.py)
+
+Each deploy is one remote shell (labelled steps, set -e) sent through the local SSH broker, so
+this process never imports paramiko and repeat runs reuse the broker's MAS/Sandbox connections.
+Cutover is blue/green (scripts/blue-green-deploy.sh): compose starts the new image in the idle
+slot, waits for its health check, then the nginx proxy on :3000 switches over. The old slot keeps
+serving until then, so a failed build or an unhealthy image never takes the site down.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from string import Template
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from _creds import MAS_CREDENTIALS_FILE, load_credentials
+from _docker_build import (
+    PREFETCH_IMAGES, WEBSITE_DIR, build_command, force_rebuild_requested, rebuild_base_requested, sync_command,
+)
+from _docker_context import available as docker_cli_available
+from _docker_context import docker, ensure_context, http_status
+from _docker_events import WEBSITE_CONTAINER, WEBSITE_IMAGE, http_ok, wait_for_container_start
+from _docker_ps import JSON_FORMAT, describe, parse_ps, ps_command
+from _ssh_broker import run_sections, run_steps
+from _ssh_cli import STEP_MARKER
+
+PROXY_CONTAINER = "mycosoft-website-proxy"
+PUBLIC_HOST = "sandbox.mycosoft.com"
+CUTOVER_TEMPLATE = Template("cd $dir && IMAGE=$image PUBLIC_HOST=$public_host bash scripts/blue-green-deploy.sh")
+CUTOVER_COMMAND = CUTOVER_TEMPLATE.substitute(dir=WEBSITE_DIR, image=WEBSITE_IMAGE, public_host=PUBLIC_HOST)
+# First deploy on a VM still running the single container: bootstrap hands :3000 to the proxy
+PROXY_COMMAND = (
+    f"docker ps --format '{{{{.Names}}}}' | grep -qx {PROXY_CONTAINER} && echo 'Proxy running' || "
+    f"(cd {WEBSITE_DIR} && bash scripts/blue-green-bootstrap.sh)"
+)
+STATUS_COMMAND = ps_command()
+HTTP_COMMAND = (
+    "curl -s -o /dev/null -w '%{http_code}' --retry 10 --retry-connrefused --retry-delay 1 "
+    "http://localhost:3000 || true"
+)
+
+STEP_TITLES = {
+    "pull": "Pull latest code",
+    "version": "Current code version",
+    "build": "Build Docker image",
+    "proxy": "Ensure blue/green proxy on :3000",
+    "cutover": "Start idle slot, switch proxy when healthy",
+    "http": "Test website",
+}
+
+
+def deploy_steps(
+    pull: bool, force_rebuild: bool, retry_clean: bool, rebuild_base: bool = False
+) -> List[Tuple[str, str]]:
+    """The remote deploy as labelled run_steps steps."""
+    build = build_command(force_rebuild=force_rebuild, rebuild_base=rebuild_base)
+    if retry_clean and not force_rebuild:
+        retry = build_command(force_rebuild=True, rebuild_base=False)
+        build = f"{build} || {{ echo 'Cached build failed, retrying with --no-cache'; {retry}; }}"
+    steps = [("pull", sync_command(prefetch=PREFETCH_IMAGES))] if pull else []
+    return steps + [
+        ("version", f"cd {WEBSITE_DIR} && git log -1 --oneline"),
+        ("build", build),
+        ("proxy", PROXY_COMMAND),
+        ("cutover", CUTOVER_COMMAND),
+        ("http", HTTP_COMMAND),
+    ]
+
+
+def step_printer(titles: Dict[str, str]) -> Callable[[str], None]:
+    """on_line callback for run_steps: a banner per step marker, then the step's output as it streams."""
+    def on_line(line: str) -> None:
+        if line.startswith(STEP_MARKER):
+            label = line[len(STEP_MARKER):].strip()
+            print(f"\n=== {titles.get(label, label)} ===", flush=True)
+        else:
+            print(f"  {line}", flush=True)
+    return on_line
+
+
+def print_state(host: str, user: str, jump_host: Optional[str]) -> None:
+    """Code, container and image currently on the VM, fetched in one round-trip."""
+    head, running, images = run_sections(host, [
+        f"cd {WEBSITE_DIR} && git log -1 --oneline",
+        STATUS_COMMAND,
+        f"docker image ls {WEBSITE_IMAGE.split(':')[0]} --format '{{{{.Tag}}}} {{{{.ID}}}} {{{{.CreatedSince}}}}'",
+    ], timeout=30, user=user, jump_host=jump_host)
+    print("Current state:")
+    print(f"  Code:      {head.strip() or '-'}")
+    print(f"  Container: {describe(parse_ps(running)) or 'not running'}")
+    print(f"  Image:     {images.strip() or 'none'}")
+
+
+def deploy(
+    host: str,
+    user: str,
+    jump_host: Optional[str],
+    pull: bool,
+    force_rebuild: bool,
+    retry_clean: bool = False,
+    show_state: bool = False,
+    rebuild_base: bool = False,
+) -> bool:
+    route = f"{host} via {jump_host}" if jump_host else host
+    print("=" * 80)
+    print(f"DEPLOYING WEBSITE TO SANDBOX ({route})")
+    print("=" * 80)
+    if show_state:
+        print_state(host, user, jump_host)
+    if rebuild_base:
+        print("Rebuilding the base image (npm ci) too: takes 10-15 minutes")
+    elif force_rebuild:
+        print("Clean --no-cache app build on the cached base image: a few minutes")
+    else:
+        print("Cached build: only changed layers are rebuilt")
+
+    exit_code, steps = run_steps(
+        host,
+        deploy_steps(pull, force_rebuild, retry_clean, rebuild_base),
+        timeout=1200,
+        user=user,
+        jump_host=jump_host,
+        on_line=step_printer(STEP_TITLES),
+    )
+    if exit_code != 0:
+        failed, output = steps[-1]
+        print(f"\n[ERROR] Deploy failed at: {STEP_TITLES.get(failed, failed)} (exit {exit_code})")
+        if failed == "connect":
+            print(output)
+        return False
+
+    http_code = dict(steps).get("http", "")
+    print("\n" + "=" * 80)
+    if not http_ok(http_code):
+        print(f"[WARN] Deployed, but the site returned HTTP {http_code or 'nothing'} - check the logs above")
+        return False
+    print("[SUCCESS] DEPLOYMENT COMPLETE")
+    print("=" * 80)
+    print(f"Website: http://{host}:3000")
+    print(f"         https://{PUBLIC_HOST}")
+    print("\nThe old slot keeps running for the rollback window: scripts/blue-green-deploy.sh --rollback")
+    return True
+
+
+def restart_via_broker(host: str, user: str) -> Dict[str, str]:
+    """restart's steps as one remote script through the broker."""
+    # fail_fast=False: every step reports even if an earlier one failed
+    _, steps = run_steps(host, [
+        ("status", STATUS_COMMAND),
+        ("restart", f"since=$(date +%s); cd {WEBSITE_DIR} && docker compose -p mycosoft-production restart {WEBSITE_CONTAINER}"),
+        # The start event itself is the post-restart status; docker ps only if it never arrives
+        ("new_status", f"started=$({wait_for_container_start(timeout=30)}); "
+                       f'if [ -n "$started" ]; then echo "{WEBSITE_CONTAINER}: started at $(date -d @$started +%T)"; '
+                       f"else {STATUS_COMMAND}; fi"),
+        ("http", HTTP_COMMAND),
+    ], timeout=240, fail_fast=False, user=user)
+    results = dict(steps)
+    for key in ("status", "new_status"):
+        containers = parse_ps(results.get(key, ""))
+        if containers:
+            results[key] = describe(containers)
+    return results
+
+
+def restart_via_context(host: str, user: str) -> Dict[str, str]:
+    """restart's steps with the local docker CLI over a docker context; no paramiko or broker involved.
+    The HTTP check runs from this machine against host:3000."""
+    context = ensure_context(host, user)
+    ps = ("ps", "--filter", f"name={WEBSITE_CONTAINER}", "--format", JSON_FORMAT)
+    _, status, _ = docker(context, *ps)
+    rc, out, err = docker(context, "restart", WEBSITE_CONTAINER, timeout=120)
+    _, new_status, _ = docker(context, *ps)
+    return {
+        "status": describe(parse_ps(status)),
+        "restart": out if rc == 0 else err,
+        "new_status": describe(parse_ps(new_status)),
+        "http": http_status(f"http://{host}:3000"),
+    }
+
+
+def restart(host: str, user: str, use_context: bool = False) -> bool:
+    """Restart the running container to pick up new code (no rebuild): a compose restart through the
+    broker, or a plain `docker restart` over a docker context with use_context."""
+    if use_context:
+        results = restart_via_context(host, user)
+    else:
+        results = restart_via_broker(host, user)
+
+    print("\n1. Checking current container status...")
+    print(f"   Current: {results.get('status') or 'Not running'}")
+
+    print("\n2. Restarting container to pick up new code...")
+    if results.get("restart"):
+        print(f"   Output: {results['restart']}")
+
+    print("\n3. Checking container status after restart...")
+    print(f"   New status: {results.get('new_status') or 'Not running'}")
+
+    print("\n4. Testing site health...")
+    http_code = results.get("http", "")
+    print(f"   HTTP status: {http_code}")
+
+    if not http_ok(http_code):
+        print(f"\n⚠️  Site returned {http_code} - may need attention")
+        return False
+    print("\n✅ Deployment successful! Site is live at sandbox.mycosoft.com")
+    from _cloudflare_cache import purge_everything  # imports requests; only needed on success
+
+    purge_everything()
+    return True
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Deploy the website to the Sandbox VM")
+    parser.add_argument("command", choices=["restart", "simple", "rebuild", "robust", "via-mas"])
+    parser.add_argument("--force-rebuild", action="store_true",
+                        help="Build with --no-cache instead of reusing layers (same as FORCE_REBUILD=1)")
+    parser.add_argument("--docker-context", action="store_true",
+                        help="restart only: use the local docker CLI over an ssh:// docker context "
+                             "(see _docker_context.py) instead of paramiko")
+    parser.add_argument("--rebuild-base", action="store_true",
+                        help="Also rebuild the dependency base image, normally reused until package files change "
+                             "(same as REBUILD_BASE=1)")
+    args = parser.parse_args(argv)
+
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+    # This repo's .credentials.local, else the MAS repo's
+    load_credentials() or load_credentials((MAS_CREDENTIALS_FILE,))
+    # Key/agent auth; the broker falls back to VM_PASSWORD/VM_SSH_PASSWORD when set
+    sandbox_host = os.environ.get("SANDBOX_VM") or os.environ.get("SANDBOX_VM_HOST", "192.168.0.187")
+    mas_host = os.environ.get("MAS_VM") or os.environ.get("MAS_VM_HOST", "192.168.0.188")
+    user = os.environ.get("VM_SSH_USER") or os.environ.get("SANDBOX_VM_USER", "mycosoft")
+    builds = {
+        "force_rebuild": args.force_rebuild or force_rebuild_requested(),
+        "rebuild_base": args.rebuild_base or rebuild_base_requested(),
+    }
+
+    if args.docker_context and not docker_cli_available():
+        print("--docker-context needs the docker CLI on PATH")
+        return 1
+
+    if args.command == "restart":
+        ok = restart(sandbox_host, user, use_context=args.docker_context)
+    elif args.command == "simple":
+        ok = deploy(sandbox_host, user, mas_host, pull=False, **builds)
+    elif args.command == "rebuild":
+        ok = deploy(sandbox_host, user, mas_host, pull=False, retry_clean=True, **builds)
+    elif args.command == "robust":
+        ok = deploy(sandbox_host, user, None, pull=True, **builds)
+    else:
+        ok = deploy(sandbox_host, user, mas_host, pull=True, show_state=True, **builds)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
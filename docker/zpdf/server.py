@@ -14,11 +14,25 @@ Endpoints:
 
 import os
 import time
+import atexit
+import hashlib
 import logging
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+import multiprocessing
+from collections import OrderedDict
 from datetime import datetime
 
 import fitz  # PyMuPDF
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used without it
+    orjson = None
 
 # Configure logging
 logging.basicConfig(
@@ -27,28 +41,157 @@ logging.basicConfig(
 )
 logger = logging.getLogger('zpdf-service')
 
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON through orjson: results are mostly page text, which orjson encodes several times faster.
+    Same output as the default provider, except non-ASCII text is sent as UTF-8 rather than \\u escapes."""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
 
+# Page text is extracted across this many worker processes (PyMuPDF is not thread-safe)
+ZPDF_PROCESSES = int(os.environ.get('ZPDF_PROCESSES') or os.cpu_count() or 1)
+# Below this many pages one process beats reopening the document in every worker
+ZPDF_PARALLEL_MIN_PAGES = int(os.environ.get('ZPDF_PARALLEL_MIN_PAGES', 16))
+# MuPDF text flags for page text; the default (195) is what get_text("text") uses: ligatures and
+# whitespace kept as in the PDF, unknown characters as their CID. fitz.TEXT_MEDIABOX_CLIP (64) alone
+# changes the text: ligatures split into their letters (U+FB01 -> "fi"), every whitespace character
+# becomes a plain space, and characters with no Unicode mapping come out as U+FFFD
+# (0 would also pick up text lying outside the page)
+ZPDF_TEXT_FLAGS = int(os.environ.get('ZPDF_TEXT_FLAGS', fitz.TEXTFLAGS_TEXT))
+# Uploads and downloads up to this size stay in memory; larger ones are spooled to a temporary file
+ZPDF_SPOOL_SIZE = int(os.environ.get('ZPDF_SPOOL_SIZE', 8 * 1024 * 1024))
+
+# Results of successful extractions, keyed by a hash of the PDF bytes (LRU, plus one JSON file per
+# entry under ZPDF_CACHE_DIR so a restart keeps them; an empty ZPDF_CACHE_DIR disables the files)
+ZPDF_CACHE_SIZE = int(os.environ.get('ZPDF_CACHE_SIZE', 256))
+ZPDF_CACHE_DIR = os.environ.get('ZPDF_CACHE_DIR', '/tmp/zpdf-cache')
+# The files are pruned, least recently used first, once together they pass this many bytes
+ZPDF_CACHE_DIR_BYTES = int(os.environ.get('ZPDF_CACHE_DIR_BYTES', 1024 * 1024 * 1024))
+# /extract-url trusts what a URL served for this many seconds; after that it revalidates with a
+# conditional GET (ETag / Last-Modified) and only downloads the PDF again if it changed
+ZPDF_URL_TTL = int(os.environ.get('ZPDF_URL_TTL', 300))
+
+_pool = None
+_pool_lock = threading.Lock()
+_cache = OrderedDict()
+_url_keys = OrderedDict()  # /extract-url: URL -> (content key, checked at, validator headers) of what it served last
+_cache_lock = threading.Lock()
+
+
+def _get_pool():
+    """Persistent extraction pool, started on first use. Spawned rather than forked, so no worker
+    inherits a copy of the threaded server."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = multiprocessing.get_context('spawn').Pool(ZPDF_PROCESSES)
+            atexit.register(_pool.terminate)
+    return _pool
+
+
+def _page_text(page) -> str:
+    """Plain text of page through a TextPage built with ZPDF_TEXT_FLAGS (get_text("text") for the default)."""
+    return page.get_textpage(flags=ZPDF_TEXT_FLAGS).extractText()
+
 
-def extract_text_from_pdf(pdf_bytes: bytes) -> dict:
-    """Extract text and metadata from PDF bytes using PyMuPDF."""
+def _extract_pages(path: str, indices: list) -> list:
+    """Text of the pages at indices of the PDF at path; runs in a pool worker, which opens its own copy."""
+    with fitz.open(path, filetype="pdf") as doc:
+        return [_page_text(doc[i]) for i in indices]
+
+
+def _page_texts(doc, source, indices: list) -> list:
+    """Text of the pages at indices, in order: in this process for a few pages, otherwise one contiguous
+    slice of indices per pool worker, each opening the PDF file (written to a temporary one for bytes)."""
+    if ZPDF_PROCESSES < 2 or len(indices) < ZPDF_PARALLEL_MIN_PAGES:
+        return [_page_text(doc[i]) for i in indices]
+
+    step = -(-len(indices) // ZPDF_PROCESSES)
+    path = source
+    if not isinstance(source, str):
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+            tmp.write(source)
+        path = tmp.name
+    try:
+        slices = [(path, indices[start:start + step]) for start in range(0, len(indices), step)]
+        return [text for chunk in _get_pool().starmap(_extract_pages, slices) for text in chunk]
+    finally:
+        if path is not source:
+            os.unlink(path)
+
+
+class PageRangeError(ValueError):
+    """A requested page number is past the end of the document: the client's error, answered with a 400."""
+
+
+def parse_extract_args(args) -> tuple:
+    """(mode, pages) from the ?mode= and ?pages= query arguments of the extract endpoints. mode is
+    'full' (default), 'metadata' or, whenever pages=1,3,5 is given, 'pages'. Raises ValueError."""
+    mode = args.get('mode', 'full')
+    pages = args.get('pages')
+    if pages:
+        numbers = [int(n) for n in pages.split(',') if n.strip()]
+        if not numbers or min(numbers) < 1:
+            raise ValueError('pages must be a comma-separated list of page numbers from 1')
+        return 'pages', numbers
+    if mode not in ('full', 'metadata'):
+        raise ValueError("mode must be 'full' or 'metadata', or give pages=1,2,3")
+    return mode, None
+
+
+def extract_text_from_pdf(source, mode: str = 'full', pages: list = None) -> dict:
+    """Extract text and metadata using PyMuPDF from PDF bytes, or from the path of a PDF file.
+    mode 'metadata' skips text extraction; mode 'pages' extracts only the 1-based page numbers in
+    pages and returns them in page_texts without the concatenated text; PageRangeError if one is past the end."""
     start_time = time.time()
     
     try:
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        if isinstance(source, str):
+            doc = fitz.open(source, filetype="pdf")
+        else:
+            doc = fitz.open(stream=source, filetype="pdf")
         metadata = doc.metadata or {}
         
-        full_text = []
+        if mode == 'pages':
+            missing = [n for n in pages if n > len(doc)]
+            if missing:
+                error = PageRangeError(f"Page {missing[0]} out of range (document has {len(doc)} pages)")
+                doc.close()
+                raise error
+            indices = [n - 1 for n in pages]
+        elif mode == 'full':
+            indices = list(range(len(doc)))
+        else:
+            indices = []
+        
+        # One pass: the texts list is joined as is, and each length is taken once for the page and the total
+        full_text = _page_texts(doc, source, indices) if indices else []
         page_texts = []
+        char_count = 0
         
-        for page_num, page in enumerate(doc):
-            page_text = page.get_text("text")
-            full_text.append(page_text)
+        for index, page_text in zip(indices, full_text):
+            page_chars = len(page_text)
+            char_count += page_chars
             page_texts.append({
-                'page': page_num + 1,
+                'page': index + 1,
                 'text': page_text,
-                'char_count': len(page_text)
+                'char_count': page_chars
             })
         
         toc = doc.get_toc()
@@ -56,9 +199,8 @@ def extract_text_from_pdf(pdf_bytes: bytes) -> dict:
         
         result = {
             'success': True,
-            'text': '\n\n'.join(full_text),
+            'mode': mode,
             'pages': len(doc),
-            'page_texts': page_texts,
             'metadata': {
                 'title': metadata.get('title'),
                 'author': metadata.get('author'),
@@ -74,13 +216,19 @@ def extract_text_from_pdf(pdf_bytes: bytes) -> dict:
                 for item in toc
             ] if toc else [],
             'processing_time_ms': round(processing_time * 1000, 2),
-            'char_count': sum(len(t) for t in full_text),
             'method': 'pymupdf'
         }
+        if mode == 'full':
+            result['text'] = '\n\n'.join(full_text)
+        if mode != 'metadata':
+            result['page_texts'] = page_texts
+            result['char_count'] = char_count
         
         doc.close()
         return result
         
+    except PageRangeError:
+        raise
     except Exception as e:
         logger.error(f"PDF extraction failed: {e}")
         return {
@@ -91,6 +239,151 @@ def extract_text_from_pdf(pdf_bytes: bytes) -> dict:
         }
 
 
+def content_key(pdf_bytes: bytes) -> str:
+    """Cache key for a PDF: hex BLAKE2b of its bytes."""
+    return hashlib.blake2b(pdf_bytes, digest_size=32).hexdigest()
+
+
+def spool_pdf(stream):
+    """Copy a PDF from stream, hashing it on the way: (bytes, key, size) while it fits in ZPDF_SPOOL_SIZE,
+    else (path of a temporary file, key, size) so it is never held in memory whole. See discard_pdf."""
+    digest = hashlib.blake2b(digest_size=32)
+    buffer = bytearray()
+    tmp = None
+    size = 0
+    try:
+        while True:
+            chunk = stream.read(1024 * 1024)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+            if tmp is None and size > ZPDF_SPOOL_SIZE:
+                tmp = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+                tmp.write(buffer)
+                buffer = None
+            if tmp is None:
+                buffer += chunk
+            else:
+                tmp.write(chunk)
+    except BaseException:
+        if tmp is not None:
+            tmp.close()
+            os.unlink(tmp.name)
+        raise
+    if tmp is None:
+        return bytes(buffer), digest.hexdigest(), size
+    tmp.close()
+    return tmp.name, digest.hexdigest(), size
+
+
+def discard_pdf(source) -> None:
+    """Remove the temporary file spool_pdf returned, if it returned one."""
+    if isinstance(source, str):
+        try:
+            os.unlink(source)
+        except OSError:
+            pass
+
+
+def _remember(lru: OrderedDict, key, value) -> None:
+    """Insert into an LRU dict (caller holds _cache_lock), evicting the oldest entries past ZPDF_CACHE_SIZE."""
+    lru[key] = value
+    lru.move_to_end(key)
+    while len(lru) > ZPDF_CACHE_SIZE:
+        lru.popitem(last=False)
+
+
+def cache_get(key: str):
+    """Cached result for key from memory, else from ZPDF_CACHE_DIR; None on a miss."""
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return dict(_cache[key])
+    if not ZPDF_CACHE_DIR:
+        return None
+    path = os.path.join(ZPDF_CACHE_DIR, f'{key}.json')
+    try:
+        with open(path, encoding='utf-8') as f:
+            result = app.json.loads(f.read())
+        os.utime(path)  # recently used: pruned last
+    except (OSError, ValueError):
+        return None
+    with _cache_lock:
+        _remember(_cache, key, result)
+    return dict(result)
+
+
+def cache_put(key: str, result: dict) -> None:
+    """Cache a successful result in memory and, best effort, on disk (written atomically)."""
+    if not result.get('success'):
+        return
+    with _cache_lock:
+        _remember(_cache, key, result)
+    if not ZPDF_CACHE_DIR:
+        return
+    try:
+        os.makedirs(ZPDF_CACHE_DIR, exist_ok=True)
+        path = os.path.join(ZPDF_CACHE_DIR, f'{key}.json')
+        with open(f'{path}.{os.getpid()}.{threading.get_ident()}', 'w', encoding='utf-8') as f:
+            f.write(app.json.dumps(result))
+        os.replace(f.name, path)
+        _prune_cache_dir()
+    except OSError as e:
+        logger.warning(f"Could not write cache entry {key}: {e}")
+
+
+def _prune_cache_dir() -> None:
+    """Delete the least recently used ZPDF_CACHE_DIR files until the rest fit in ZPDF_CACHE_DIR_BYTES."""
+    entries = []
+    total = 0
+    with os.scandir(ZPDF_CACHE_DIR) as it:
+        for entry in it:
+            if not entry.name.endswith('.json'):
+                continue  # another worker's entry still being written
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+    if total <= ZPDF_CACHE_DIR_BYTES:
+        return
+    for _, size, path in sorted(entries):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass  # already pruned by another worker
+        total -= size
+        if total <= ZPDF_CACHE_DIR_BYTES:
+            break
+
+
+def cache_key(key: str, mode: str = 'full', pages: list = None) -> str:
+    """Cache entry for one extraction of the PDF with content key key: each mode/pages variant has its own,
+    and so does text extracted with non-default ZPDF_TEXT_FLAGS."""
+    if ZPDF_TEXT_FLAGS != fitz.TEXTFLAGS_TEXT and mode != 'metadata':
+        key = f'{key}-flags{ZPDF_TEXT_FLAGS}'
+    if mode == 'full':
+        return key
+    if mode == 'pages':
+        return f"{key}-pages-{'-'.join(map(str, pages))}"
+    return f'{key}-{mode}'
+
+
+def extract_cached(source, key: str = None, mode: str = 'full', pages: list = None) -> dict:
+    """extract_text_from_pdf, served from the cache when the same bytes were extracted the same way before.
+    key is required when source is a path (spool_pdf returns it)."""
+    entry = cache_key(key or content_key(source), mode, pages)
+    result = cache_get(entry)
+    if result is not None:
+        logger.info(f"Cache hit for {entry[:16]} ({mode})")
+        return result
+    result = extract_text_from_pdf(source, mode, pages)
+    cache_put(entry, result)
+    return dict(result)
+
+
 @app.route('/', methods=['GET'])
 def index():
     """Return API documentation."""
@@ -102,12 +395,16 @@ def index():
             'POST /extract': {
                 'description': 'Extract text from uploaded PDF',
                 'content_type': 'multipart/form-data',
-                'params': {'file': 'PDF file (required)'}
+                'params': {
+                    'file': 'PDF file (required)',
+                    'mode': "Query: 'full' (default) or 'metadata' (metadata, TOC and page count only)",
+                    'pages': 'Query: comma-separated page numbers to extract, e.g. 1,3,5 (no concatenated text)'
+                }
             },
             'POST /extract-url': {
                 'description': 'Extract text from PDF at URL',
                 'content_type': 'application/json',
-                'params': {'url': 'URL to PDF file (required)'}
+                'params': {'url': 'URL to PDF file (required)', 'mode': 'Query, as for /extract', 'pages': 'Query, as for /extract'}
             },
             'GET /health': {'description': 'Health check endpoint'}
         },
@@ -135,20 +432,39 @@ def extract():
     file = request.files['file']
     if file.filename == '':
         return jsonify({'success': False, 'error': 'No file selected'}), 400
+    try:
+        mode, pages = parse_extract_args(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     
-    pdf_bytes = file.read()
-    if len(pdf_bytes) == 0:
-        return jsonify({'success': False, 'error': 'Empty file'}), 400
-    
-    logger.info(f"Extracting text from {file.filename} ({len(pdf_bytes)} bytes)")
-    result = extract_text_from_pdf(pdf_bytes)
+    source, key, size = spool_pdf(file.stream)
+    try:
+        if size == 0:
+            return jsonify({'success': False, 'error': 'Empty file'}), 400
+        
+        logger.info(f"Extracting text from {file.filename} ({size} bytes)")
+        result = extract_cached(source, key, mode, pages)
+    except PageRangeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    finally:
+        discard_pdf(source)
     
     if result['success']:
-        logger.info(f"Extracted {result['char_count']} characters in {result['processing_time_ms']}ms")
+        logger.info(f"Extracted {result.get('char_count', 0)} characters in {result['processing_time_ms']}ms")
         return jsonify(result)
     return jsonify(result), 500
 
 
+def _validators(response) -> dict:
+    """Conditional GET headers (from response's ETag / Last-Modified) that revalidate what it served."""
+    validators = {}
+    if response.headers.get('ETag'):
+        validators['If-None-Match'] = response.headers['ETag']
+    if response.headers.get('Last-Modified'):
+        validators['If-Modified-Since'] = response.headers['Last-Modified']
+    return validators
+
+
 @app.route('/extract-url', methods=['POST'])
 def extract_url():
     """Extract text from PDF at URL."""
@@ -158,26 +474,52 @@ def extract_url():
             return jsonify({'success': False, 'error': 'URL is required'}), 400
         
         url = data['url']
+        try:
+            mode, pages = parse_extract_args(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        import urllib.request
-        logger.info(f"Fetching PDF from {url}")
-        
-        req = urllib.request.Request(url, headers={'User-Agent': 'zpdf-service/1.0'})
-        with urllib.request.urlopen(req, timeout=30) as response:
-            pdf_bytes = response.read()
-        
-        result = extract_text_from_pdf(pdf_bytes)
+        # A URL extracted before is answered from the cache: without a request within ZPDF_URL_TTL, after
+        # that with a conditional GET, so the PDF is only downloaded again if it changed
+        with _cache_lock:
+            key, checked, validators = _url_keys.get(url, (None, 0, {}))
+        result = cache_get(cache_key(key, mode, pages)) if key else None
+        if result is None or time.time() - checked > ZPDF_URL_TTL:
+            logger.info(f"Fetching PDF from {url}")
+            headers = {'User-Agent': 'zpdf-service/1.0'}
+            if result is not None:
+                headers.update(validators)
+            req = urllib.request.Request(url, headers=headers)
+            try:
+                with urllib.request.urlopen(req, timeout=30) as response:
+                    validators = _validators(response)
+                    source, key, _ = spool_pdf(response)
+            except urllib.error.HTTPError as e:
+                if e.code != 304 or result is None:
+                    raise
+                logger.info(f"{url} not modified, serving the cached extraction")
+            else:
+                try:
+                    result = extract_cached(source, key, mode, pages)
+                finally:
+                    discard_pdf(source)
+            if result['success']:
+                with _cache_lock:
+                    _remember(_url_keys, url, (key, time.time(), validators))
         if result['success']:
             result['source_url'] = url
             return jsonify(result)
         return jsonify(result), 500
             
+    except PageRangeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         logger.error(f"URL extraction failed: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 if __name__ == '__main__':
+    # Development only; the container runs gunicorn (see Dockerfile)
     port = int(os.environ.get('ZPDF_PORT', 8080))
     logger.info(f"Starting zpdf service on port {port}")
-    app.run(host='0.0.0.0', port=port, debug=True)
+    app.run(host='0.0.0.0', port=port, debug=False, threaded=False)
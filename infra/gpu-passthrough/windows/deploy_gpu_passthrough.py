@@ -14,19 +14,20 @@ import argparse
 import sys
 import os
 import time
+import socket
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 import urllib3
 
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# Try to import paramiko
 try:
     import paramiko
 except ImportError:
-    print("Installing paramiko...")
-    os.system("pip install paramiko")
-    import paramiko
+    print("ERROR: paramiko not installed. Run: pip install paramiko")
+    sys.exit(1)
 
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
@@ -47,6 +48,12 @@ PROXMOX_TOKEN = os.environ.get("PROXMOX_TOKEN", "root@pam!cursor_agent=bc1c9dc7-
 PROXMOX_USER = os.environ.get("PROXMOX_USER", "root")
 PROXMOX_PASS = VM_PASS  # Use same password
 
+# One keep-alive TLS connection to the Proxmox API for every call (verify=False: self-signed cert)
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+_session.headers["Authorization"] = f"PVEAPIToken={PROXMOX_TOKEN}"
+_session.verify = False
+
 VM_HOST = os.environ.get("SANDBOX_VM_HOST", "192.168.0.187")
 VM_USER = os.environ.get("SANDBOX_VM_USER", "mycosoft")
 VMID = os.environ.get("SANDBOX_VMID", "103")
@@ -55,6 +62,13 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROXMOX_SCRIPTS = os.path.join(SCRIPT_DIR, "..", "proxmox")
 VM_SCRIPTS = os.path.join(SCRIPT_DIR, "..", "vm")
 
+# VM GPU checks, run in one exec_command (see sections_command)
+VM_GPU_CHECKS = (
+    ("PCI", "lspci | grep -i nvidia"),
+    ("SMI", "nvidia-smi --query-gpu=name,driver_version,memory.total --format=csv 2>/dev/null || echo 'NOT AVAILABLE'"),
+    ("DOCKER", "docker run --rm --gpus all nvidia/cuda:12.8.0-base-ubuntu24.04 nvidia-smi 2>/dev/null && echo 'DOCKER_GPU_OK' || echo 'DOCKER_GPU_FAIL'"),
+)
+
 
 def print_header(text):
     print("\n" + "=" * 60)
@@ -63,13 +77,56 @@ def print_header(text):
 
 
 def ssh_connect(host, user, password, timeout=30):
-    """Create SSH connection"""
+    """Create SSH connection (compressed for the SFTP script uploads, with keepalives so it survives
+    the long driver/CUDA installs)"""
     client = paramiko.SSHClient()
     client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    client.connect(host, username=user, password=password, timeout=timeout)
+    client.connect(host, username=user, password=password, timeout=timeout, compress=True)
+    client.get_transport().set_keepalive(30)
     return client
 
 
+def port_open(host, port=22, timeout=2):
+    """True if a TCP connection to host:port succeeds"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def wait_for_reboot(host, port=22, down_timeout=60, up_timeout=180, interval=2):
+    """Wait for host:port to stop answering (the reboot has started), then to answer again.
+    Returns True as soon as it is back, False if it is not back within up_timeout."""
+    deadline = time.time() + down_timeout
+    while time.time() < deadline and port_open(host, port):
+        time.sleep(interval)
+    deadline = time.time() + up_timeout
+    while time.time() < deadline:
+        if port_open(host, port):
+            return True
+        time.sleep(interval)
+    return False
+
+
+def sections_command(sections):
+    """One shell command running each (name, cmd) in turn, its output preceded by a ---name--- line"""
+    return "; ".join(f"echo '---{name}---'; {cmd}" for name, cmd in sections)
+
+
+def split_sections(out, names):
+    """Output of a sections_command as {name: output}"""
+    results = {name: [] for name in names}
+    current = None
+    for line in out.splitlines():
+        marker = line.strip()
+        if marker.startswith("---") and marker.endswith("---") and marker[3:-3] in results:
+            current = marker[3:-3]
+        elif current:
+            results[current].append(line)
+    return {name: "\n".join(lines).strip() for name, lines in results.items()}
+
+
 def ssh_run(client, cmd, desc="", timeout=300, sudo=False):
     """Run command via SSH"""
     if desc:
@@ -110,12 +167,30 @@ def upload_script(sftp, local_path, remote_path):
     sftp.chmod(remote_path, 0o755)
 
 
+def _upload_one(client, local_path, remote_path):
+    """upload_script over an SFTP channel of its own (one SFTP client must not be shared across threads)"""
+    sftp = client.open_sftp()
+    try:
+        upload_script(sftp, local_path, remote_path)
+    finally:
+        sftp.close()
+
+
+def upload_scripts(client, local_dir, scripts, remote_dir):
+    """Upload the scripts that exist in local_dir to remote_dir, all at once on parallel SFTP channels"""
+    uploads = [(os.path.join(local_dir, script), f"{remote_dir}/{script}") for script in scripts]
+    uploads = [(local, remote) for local, remote in uploads if os.path.exists(local)]
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        futures = [ex.submit(_upload_one, client, local, remote) for local, remote in uploads]
+        for future in futures:
+            future.result()
+
+
 def proxmox_api_get(endpoint):
     """GET request to Proxmox API"""
     url = f"{PROXMOX_API}{endpoint}"
-    headers = {"Authorization": f"PVEAPIToken={PROXMOX_TOKEN}"}
     try:
-        resp = requests.get(url, headers=headers, verify=False, timeout=10)
+        resp = _session.get(url, timeout=10)
         if resp.status_code == 200:
             return resp.json().get("data")
         print(f"API Error: {resp.status_code}")
@@ -161,17 +236,12 @@ def check_vm_gpu():
     try:
         client = ssh_connect(VM_HOST, VM_USER, VM_PASS)
         
-        # Check PCI
-        code, out, _ = ssh_run(client, "lspci | grep -i nvidia", "Checking PCI devices")
-        has_pci = bool(out.strip())
-        
-        # Check nvidia-smi
-        code, out, _ = ssh_run(client, "nvidia-smi --query-gpu=name,driver_version,memory.total --format=csv 2>/dev/null || echo 'NOT AVAILABLE'", "Checking nvidia-smi")
-        has_driver = "NOT AVAILABLE" not in out
-        
-        # Check Docker GPU
-        code, out, _ = ssh_run(client, "docker run --rm --gpus all nvidia/cuda:12.8.0-base-ubuntu24.04 nvidia-smi 2>/dev/null && echo 'DOCKER_GPU_OK' || echo 'DOCKER_GPU_FAIL'", "Checking Docker GPU")
-        has_docker_gpu = "DOCKER_GPU_OK" in out
+        # PCI devices, nvidia-smi and Docker GPU in one round trip
+        code, out, _ = ssh_run(client, sections_command(VM_GPU_CHECKS), "Checking PCI devices, nvidia-smi and Docker GPU")
+        checks = split_sections(out, [name for name, _ in VM_GPU_CHECKS])
+        has_pci = bool(checks["PCI"])
+        has_driver = "NOT AVAILABLE" not in checks["SMI"]
+        has_docker_gpu = "DOCKER_GPU_OK" in checks["DOCKER"]
         
         client.close()
         
@@ -193,19 +263,15 @@ def configure_proxmox():
     
     try:
         client = ssh_connect(PROXMOX_HOST, PROXMOX_USER, PROXMOX_PASS)
-        sftp = client.open_sftp()
         
         # Create temp directory
         ssh_run(client, "mkdir -p /tmp/gpu-passthrough")
         
         # Upload scripts
         print("\n>>> Uploading scripts...")
-        for script in ["01_check_iommu.sh", "02_configure_vfio.sh", "03_attach_gpu_to_vm.sh"]:
-            local = os.path.join(PROXMOX_SCRIPTS, script)
-            if os.path.exists(local):
-                upload_script(sftp, local, f"/tmp/gpu-passthrough/{script}")
-        
-        sftp.close()
+        upload_scripts(client, PROXMOX_SCRIPTS,
+                       ["01_check_iommu.sh", "02_configure_vfio.sh", "03_attach_gpu_to_vm.sh"],
+                       "/tmp/gpu-passthrough")
         
         # Run check script
         ssh_run(client, "/tmp/gpu-passthrough/01_check_iommu.sh", "Running IOMMU check")
@@ -262,7 +328,6 @@ def configure_vm():
     
     try:
         client = ssh_connect(VM_HOST, VM_USER, VM_PASS)
-        sftp = client.open_sftp()
         
         # Create temp directory
         ssh_run(client, "mkdir -p /tmp/gpu-setup", sudo=True)
@@ -270,13 +335,10 @@ def configure_vm():
         
         # Upload scripts
         print("\n>>> Uploading scripts...")
-        for script in ["01_install_nvidia_driver.sh", "02_install_cuda.sh", 
-                       "03_install_container_toolkit.sh", "04_verify_gpu.sh"]:
-            local = os.path.join(VM_SCRIPTS, script)
-            if os.path.exists(local):
-                upload_script(sftp, local, f"/tmp/gpu-setup/{script}")
-        
-        sftp.close()
+        upload_scripts(client, VM_SCRIPTS,
+                       ["01_install_nvidia_driver.sh", "02_install_cuda.sh",
+                        "03_install_container_toolkit.sh", "04_verify_gpu.sh"],
+                       "/tmp/gpu-setup")
         
         # Check if GPU is visible
         code, out, _ = ssh_run(client, "lspci | grep -i nvidia", "Checking for GPU")
@@ -297,11 +359,13 @@ def configure_vm():
         ssh_run(client, "reboot", sudo=True)
         client.close()
         
-        # Wait for VM to come back
-        print("\nWaiting for VM to reboot (60 seconds)...")
-        time.sleep(60)
+        # Wait for VM to come back: SSH port probed every 2s instead of a fixed 60s sleep
+        print("\nWaiting for VM to reboot...")
+        if not wait_for_reboot(VM_HOST):
+            print("[ERROR] VM did not come back within 3 minutes")
+            return False
         
-        # Reconnect
+        # Reconnect; sshd can accept TCP a moment before it serves logins
         print("Reconnecting...")
         for attempt in range(5):
             try:
@@ -309,7 +373,7 @@ def configure_vm():
                 break
             except:
                 print(f"  Attempt {attempt+1}/5 - VM not ready, waiting...")
-                time.sleep(15)
+                time.sleep(3)
         else:
             print("[ERROR] Could not reconnect to VM after reboot")
             return False
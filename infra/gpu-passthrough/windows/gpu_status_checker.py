@@ -3,18 +3,22 @@
 GPU Status Checker - Quick check of GPU status across all systems
 """
 
+import io
 import sys
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
 import urllib3
+from requests.adapters import HTTPAdapter
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 try:
     import paramiko
 except ImportError:
-    os.system("pip install paramiko")
-    import paramiko
+    print("ERROR: paramiko not installed. Run: pip install paramiko")
+    sys.exit(1)
 
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
@@ -33,12 +37,41 @@ PROXMOX_HOST = os.environ.get("PROXMOX_HOST", "${PROXMOX_HOST}")
 PROXMOX_API = f"https://{PROXMOX_HOST}:8006/api2/json"
 PROXMOX_TOKEN = os.environ.get("PROXMOX_TOKEN", "root@pam!cursor_agent=bc1c9dc7-6fca-4e89-8a1d-557a9d117a3e")
 
+# One keep-alive TLS connection to the Proxmox API for every call (verify=False: self-signed cert)
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+_session.headers["Authorization"] = f"PVEAPIToken={PROXMOX_TOKEN}"
+_session.verify = False
+
 VM_HOST = os.environ.get("SANDBOX_VM_HOST", "192.168.0.187")
 VM_USER = os.environ.get("SANDBOX_VM_USER", "mycosoft")
 
 WINDOWS_LOCAL = True  # We're running on Windows
 
 
+class _PerThreadStdout:
+    """sys.stdout stand-in while the checks run concurrently: a thread inside capture() writes to its
+    own buffer, so each check's lines can be printed together afterwards"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def write(self, text):
+        return getattr(self._local, 'buffer', self._stream).write(text)
+
+    def flush(self):
+        getattr(self._local, 'buffer', self._stream).flush()
+
+    def capture(self, check):
+        """Run check with its output buffered: (result, output)"""
+        self._local.buffer = io.StringIO()
+        try:
+            return check(), self._local.buffer.getvalue()
+        finally:
+            del self._local.buffer
+
+
 def check_local_gpu():
     """Check GPU on local Windows machine"""
     print("\n>>> Local Windows GPU")
@@ -65,8 +98,7 @@ def check_proxmox_gpu():
     print("\n>>> Proxmox Host (${PROXMOX_HOST})")
     try:
         url = f"{PROXMOX_API}/nodes"
-        headers = {"Authorization": f"PVEAPIToken={PROXMOX_TOKEN}"}
-        resp = requests.get(url, headers=headers, verify=False, timeout=10)
+        resp = _session.get(url, timeout=10)
         
         if resp.status_code != 200:
             print(f"  [ERROR] API returned {resp.status_code}")
@@ -81,7 +113,7 @@ def check_proxmox_gpu():
         
         # Get PCI devices
         pci_url = f"{PROXMOX_API}/nodes/{node}/hardware/pci"
-        pci_resp = requests.get(pci_url, headers=headers, verify=False, timeout=10)
+        pci_resp = _session.get(pci_url, timeout=10)
         
         if pci_resp.status_code == 200:
             pci = pci_resp.json().get("data", [])
@@ -111,17 +143,16 @@ def check_vm_gpu():
         client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         client.connect(VM_HOST, username=VM_USER, password=VM_PASS, timeout=10)
         
-        # Check PCI
-        stdin, stdout, stderr = client.exec_command("lspci | grep -i nvidia", timeout=10)
-        pci_out = stdout.read().decode('utf-8', errors='replace').strip()
-        has_pci = bool(pci_out)
-        
-        # Check nvidia-smi
+        # PCI and nvidia-smi in one exec_command, split on the marker line
         stdin, stdout, stderr = client.exec_command(
+            "lspci | grep -i nvidia; echo '---SMI---'; "
             "nvidia-smi --query-gpu=name,memory.total,driver_version --format=csv,noheader 2>/dev/null || echo 'FAIL'",
             timeout=10
         )
-        smi_out = stdout.read().decode('utf-8', errors='replace').strip()
+        out = stdout.read().decode('utf-8', errors='replace')
+        pci_out, _, smi_out = out.partition('---SMI---')
+        pci_out, smi_out = pci_out.strip(), smi_out.strip()
+        has_pci = bool(pci_out)
         has_driver = smi_out != 'FAIL' and smi_out != ''
         
         client.close()
@@ -148,16 +179,20 @@ def main():
     print("  GPU Status Check - All Systems")
     print("=" * 60)
     
-    results = {}
-    
-    # Check local Windows
-    results['windows'] = check_local_gpu()
-    
-    # Check Proxmox
-    results['proxmox'] = check_proxmox_gpu()
+    # Local Windows, Proxmox and VM checks run at once; each one's output is printed in this order after
+    checks = {'windows': check_local_gpu, 'proxmox': check_proxmox_gpu, 'vm': check_vm_gpu}
+    stdout = sys.stdout
+    sys.stdout = proxy = _PerThreadStdout(stdout)
+    try:
+        with ThreadPoolExecutor(max_workers=len(checks)) as ex:
+            futures = {name: ex.submit(proxy.capture, check) for name, check in checks.items()}
+    finally:
+        sys.stdout = stdout
     
-    # Check VM
-    results['vm'] = check_vm_gpu()
+    results = {}
+    for name, future in futures.items():
+        results[name], output = future.result()
+        print(output, end='')
     
     # Summary
     print("\n" + "=" * 60)
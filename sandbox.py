@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Sandbox VM checks in one entry point for the former test/check scripts:
+
+    python sandbox.py test-pages        # smoke pages over a tunnel to :3000    (_test_sandbox_pages.py)
+    python sandbox.py test-mindex [q]   # MINDEX unified-search API             (_test_mindex.py)
+    python sandbox.py test-search [q]   # local website unified-search API      (_test_search.py)
+    python sandbox.py wait-restart      # wait for the build, restart, probe    (_wait_and_restart.py)
+    python sandbox.py check             # container, MAS health, readiness      (check_sandbox_website_FEB09_2026.py)
+    python sandbox.py all [q]           # check, test-pages, test-search, test-mindex in one process
+
+Heavy modules (paramiko, requests) are imported inside the subcommand that needs them, so a run
+pays for each import once however many checks it chains.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+from typing import Optional, Sequence
+
+from _creds import CREDENTIALS_FILE, ENV_FILE, load_credentials, vm_password
+from _docker_events import SMOKE_PAGES, http_ok
+from _remote import utf8_stdout
+
+MINDEX_URL = f"http://{os.environ.get('MINDEX_VM_HOST', 'localhost')}:8000/api/mindex/unified-search"
+SEARCH_URL = "http://localhost:3010/api/search/unified"
+DEFAULT_QUERIES = ("Amanita",)
+
+STATUS_COMMAND = "docker ps --filter name=mycosoft-website --format '{{.Names}}\\t{{.Status}}\\t{{.Ports}}'"
+MAS_HEALTH_COMMAND = "curl -s -o /dev/null -w '%{http_code}' http://${MAS_VM_HOST:-localhost}:8001/health"
+# All 10 attempts in one remote loop, one code per line, stopping at the first 2xx/3xx (a 502 from a
+# booting upstream is retried, not counted as up)
+READY_COMMAND = (
+    "for i in 1 2 3 4 5 6 7 8 9 10; do "
+    "c=$(curl -s -o /dev/null -w '%{http_code}' --max-time 10 http://localhost:3000); echo \"$c\"; "
+    'case "$c" in 2??|3??) break;; esac; [ "$i" = 10 ] || sleep 3; done'
+)
+
+_session = None
+
+
+def _get_session():
+    """Shared keep-alive requests session: every query of every search subcommand pays the TCP handshake once."""
+    global _session
+    if _session is None:
+        import atexit
+
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(
+            pool_connections=4, pool_maxsize=8, max_retries=Retry(total=2, backoff_factor=0.1),
+        ))
+        session.headers["Connection"] = "keep-alive"
+        atexit.register(session.close)
+        _session = session
+    return _session
+
+
+def test_pages(host: str, user: str) -> bool:
+    """HTTP status of SMOKE_PAGES, fetched over a direct-tcpip channel to the VM's :3000."""
+    utf8_stdout()
+    from _ssh_session import get_client, http_probe
+
+    ssh = get_client(host, user, vm_password())
+    print("Testing sandbox pages:\n")
+    ok = True
+    # One keep-alive connection for every page
+    for page, code in http_probe(ssh, SMOKE_PAGES):
+        ok = ok and http_ok(code)
+        print(f"  {'✅' if http_ok(code) else '❌'} {page}: HTTP {code}")
+    print("\n Done!")
+    return ok
+
+
+def test_mindex(queries: Sequence[str] = DEFAULT_QUERIES) -> bool:
+    """Result counts and a sample of each kind from MINDEX's unified search, per query."""
+    utf8_stdout()
+    ok = True
+    for query in queries:
+        try:
+            r = _get_session().get(MINDEX_URL, params={"q": query, "limit": 5}, timeout=30)
+            d = r.json()
+            print(f"MINDEX Status ({query}): {r.status_code}")
+            print(f"Taxa: {len(d.get('taxa', []))}")
+            print(f"Compounds: {len(d.get('compounds', []))}")
+            print(f"Genetics: {len(d.get('genetics', []))}")
+
+            if d.get('taxa'):
+                print(f"\nTaxa sample: {d['taxa'][0]}")
+            if d.get('compounds'):
+                print(f"\nCompound sample: {d['compounds'][0]}")
+            if d.get('genetics'):
+                print(f"\nGenetics sample: {d['genetics'][0]}")
+            ok = ok and r.ok
+        except Exception as e:
+            print(f"Error: {e}")
+            ok = False
+    return ok
+
+
+def test_search(queries: Sequence[str] = DEFAULT_QUERIES) -> bool:
+    """Result counts from the website's unified search API, per query."""
+    utf8_stdout()
+    ok = True
+    for query in queries:
+        try:
+            r = _get_session().get(SEARCH_URL, params={"q": query, "limit": 5}, timeout=30)
+            d = r.json()
+            print(f"Status ({query}): {r.status_code}")
+            print(f"Species: {len(d.get('species', []))}")
+            print(f"Compounds: {len(d.get('compounds', []))}")
+            print(f"Genetics: {len(d.get('genetics', []))}")
+            print(f"Research: {len(d.get('research', []))}")
+            print(f"Live Results: {len(d.get('live_results', []))}")
+
+            if d.get('compounds'):
+                print("\nCompound sample:", d['compounds'][0].get('name', 'N/A'))
+            else:
+                print("\nNo compounds found in response")
+            ok = ok and r.ok
+        except Exception as e:
+            print(f"Error: {e}")
+            ok = False
+    return ok
+
+
+def wait_restart(host: str, user: str, max_wait: int = 300) -> bool:
+    """Wait for the VM's docker build, recreate the container from the image, probe the pages; the CDN purge
+    runs alongside the probes."""
+    utf8_stdout()
+    from _cloudflare_cache import purge_everything
+    from _docker_build import RUN_COMMAND, ensure_image_command
+    from _docker_events import parse_probes, probe_pages, wait_for_exit, wait_for_healthy
+    from _remote import run, run_many
+
+    # Key auth over the shared OpenSSH ControlMaster: every step reuses one connection
+    # Wait for build to complete: one blocking command (tail --pid) instead of polling ps every 10s
+    print("1. Waiting for Docker build to complete...")
+    count, log = run_many(host, [
+        wait_for_exit(timeout=max_wait),
+        "tail -5 /tmp/docker_build.log 2>/dev/null",
+    ], timeout=max_wait + 30, user=user)
+    if count.strip() == "0":
+        print("   Build completed!")
+    else:
+        print(f"   Build still running after {max_wait // 60} minutes, proceeding anyway...")
+
+    # Check build log for success
+    print("\n2. Checking build result...")
+    print(f"   {log.strip()}")
+
+    # Stop and remove current container, making sure the image is local (pulling it if not) at the same time
+    print("\n3. Stopping current container...")
+    _, out, _ = run(
+        host,
+        f"( {ensure_image_command()} ) >/dev/null 2>&1 & image=$!; "
+        "docker stop mycosoft-website 2>/dev/null; docker rm mycosoft-website 2>/dev/null; echo 'Done'; "
+        "wait $image || echo 'Image missing and could not be pulled'",
+        timeout=330,
+        user=user,
+    )
+    print(f"   {out.strip()}")
+
+    # Start new container
+    print("\n4. Starting new container with fresh image...")
+    _, out, err = run(host, RUN_COMMAND, timeout=60, user=user)
+    # The Cloudflare purge only waits on api.cloudflare.com: run it while the VM-side health and page checks do
+    purge = threading.Thread(target=purge_everything, daemon=True)
+    purge.start()
+    container_id = out.strip()[:12]
+    err = err.strip()
+    if container_id:
+        print(f"   Started: {container_id}")
+    if err:
+        print(f"   Error: {err}")
+
+    # Wait for the container's HEALTHCHECK instead of a fixed sleep
+    _, health, _ = run(host, wait_for_healthy(), timeout=60, user=user)
+    print(f"   Health: {health.strip()}")
+
+    # Test pages
+    print("\n5. Testing pages...")
+    _, out, _ = run(host, probe_pages(), timeout=60, user=user)
+    for page, code in parse_probes(out):
+        status = "✅" if http_ok(code) else "❌"
+        print(f"   {status} {page}: HTTP {code}")
+
+    print("\n✅ Deployment complete!")
+    purge.join()
+    return True
+
+
+def check(host: str, user: str) -> bool:
+    """Container status, MAS health from the VM and up to 10 readiness attempts against :3000."""
+    utf8_stdout()
+    from _ssh_cli import gather_runs
+
+    # The three checks are independent: concurrent channels on the one ControlMaster connection
+    status, mas, codes = (out.strip() for _, out, _ in asyncio.run(gather_runs(
+        host, [STATUS_COMMAND, MAS_HEALTH_COMMAND, READY_COMMAND], timeout=150, user=user,
+    )))
+    print(status)
+    print("MAS health from sandbox VM:", mas)
+    attempts = codes.splitlines()
+    for i, code in enumerate(attempts):
+        print(f"Attempt {i+1}/10: HTTP {code}")
+    return bool(attempts) and http_ok(attempts[-1])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check or restart the website on the Sandbox VM")
+    parser.add_argument("command", choices=["test-pages", "test-mindex", "test-search", "wait-restart", "check", "all"])
+    parser.add_argument("queries", nargs="*", default=list(DEFAULT_QUERIES),
+                        help="Search terms for test-mindex/test-search/all (default: Amanita)")
+    args = parser.parse_args(argv)
+
+    load_credentials((CREDENTIALS_FILE, ENV_FILE), override=False)
+    # Key/agent auth; VM_PASSWORD is only an optional fallback for test-pages
+    host = os.environ.get("SANDBOX_VM_HOST", "192.168.0.187")
+    user = os.environ.get("SANDBOX_VM_USER", os.environ.get("VM_SSH_USER", "mycosoft"))
+
+    if args.command == "test-pages":
+        ok = test_pages(host, user)
+    elif args.command == "test-mindex":
+        ok = test_mindex(args.queries)
+    elif args.command == "test-search":
+        ok = test_search(args.queries)
+    elif args.command == "wait-restart":
+        ok = wait_restart(host, user)
+    elif args.command == "check":
+        ok = check(host, user)
+    else:
+        # Every check runs even after a failure; none of them changes the VM
+        results = [check(host, user), test_pages(host, user), test_search(args.queries), test_mindex(args.queries)]
+        ok = all(results)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
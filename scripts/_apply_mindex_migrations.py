@@ -7,11 +7,15 @@ Apply compounds and genetics migrations to MINDEX VM via SSH.
 
 import paramiko
 import sys
+from pathlib import Path
 import time
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from _creds import vm_password
+from _ssh_session import auth_kwargs
+
 VM_HOST = "${MINDEX_VM_HOST}"
 VM_USER = "mycosoft"
-VM_PASSWORD = "REDACTED_VM_SSH_PASSWORD"
 
 def ssh_exec(ssh, command, description=""):
     """Execute SSH command and return output."""
@@ -37,7 +41,7 @@ def main():
         print(f"[*] Connecting to MINDEX VM ({VM_HOST})...")
         ssh = paramiko.SSHClient()
         ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(VM_HOST, username=VM_USER, password=VM_PASSWORD, timeout=15)
+        ssh.connect(VM_HOST, username=VM_USER, timeout=15, **auth_kwargs(vm_password()))
         
         # Check current migrations
         ssh_exec(ssh, "cd /opt/mindex && ls -la migrations/*.sql | tail -5", "Checking migration files")
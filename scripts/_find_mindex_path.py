@@ -2,16 +2,20 @@
 """Find MINDEX path on VM and apply migrations."""
 import paramiko
 import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from _creds import vm_password
+from _ssh_session import auth_kwargs
 
 VM_HOST = "${MINDEX_VM_HOST}"
 VM_USER = "mycosoft"
-VM_PASSWORD = "REDACTED_VM_SSH_PASSWORD"
 
 def main():
     try:
         ssh = paramiko.SSHClient()
         ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(VM_HOST, username=VM_USER, password=VM_PASSWORD, timeout=15)
+        ssh.connect(VM_HOST, username=VM_USER, timeout=15, **auth_kwargs(vm_password()))
         
         # Find where mindex code is
         print("[*] Finding MINDEX code location...")
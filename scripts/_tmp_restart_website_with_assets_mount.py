@@ -5,10 +5,14 @@ Ensures /opt/mycosoft/media/website/assets is mounted to /app/public/assets
 so team images and other media are served.
 """
 import os
+import sys
 from pathlib import Path
 
 import paramiko
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from _docker_events import wait_for_healthy
+
 VM_HOST = "192.168.0.187"
 VM_USER = "mycosoft"
 CONTAINER = "mycosoft-website"
@@ -45,7 +49,7 @@ def main() -> None:
         f'docker run -d --name {CONTAINER} -p 3000:3000 '
         f'-v /opt/mycosoft/media/website/assets:/app/public/assets:ro '
         f'--restart unless-stopped {IMAGE}',
-        "sleep 5",
+        wait_for_healthy(),
         "docker ps | grep mycosoft-website",
         "curl -s -o /dev/null -w '%{http_code}' http://localhost:3000",
     ]
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 import os
+import sys
 from pathlib import Path
 
 import paramiko
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from _docker_events import wait_for_healthy
+
 
 def load_credentials() -> None:
     creds_path = Path(__file__).resolve().parent.parent / ".credentials.local"
@@ -55,7 +59,7 @@ def main() -> None:
         "--restart unless-stopped mycosoft-always-on-mycosoft-website:latest",
         password,
     ))
-    print(run(ssh, "sleep 10 && docker ps --format '{{.Names}} {{.Status}}' | grep mycosoft-website", password))
+    print(run(ssh, f"{wait_for_healthy()}; docker ps --format '{{{{.Names}}}} {{{{.Status}}}}' | grep mycosoft-website", password))
     print(run(ssh, "curl -s -o /dev/null -w '%{http_code}' http://localhost:3000", password))
     ssh.close()
 
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 import os
+import sys
 from pathlib import Path
 
 import paramiko
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from _docker_events import wait_for_healthy
+
 
 def load_credentials() -> None:
     creds_path = Path(__file__).resolve().parent.parent / ".credentials.local"
@@ -45,7 +49,7 @@ def main() -> None:
         "-e NEXT_PUBLIC_MINDEX_API_BASE_URL=http://${MINDEX_VM_HOST:-localhost}:8000 "
         "-v /opt/mycosoft/media/website/assets:/app/public/assets:ro "
         "--restart unless-stopped mycosoft-always-on-mycosoft-website:latest",
-        "sleep 10",
+        wait_for_healthy(),
         "docker ps --format '{{.Names}} {{.Status}}' | grep mycosoft-website || true",
         "curl -s -o /dev/null -w '%{http_code}' http://localhost:3000",
     ]